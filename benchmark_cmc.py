@@ -0,0 +1,167 @@
+# benchmark_cmc.py
+"""
+BoT-SORT camera motion compensation benchmark: BoxMOT's full-frame modes vs ours (modules/motion.py).
+
+Every mode sees the same frames and the same SCRFD detections (computed once). Reported per mode:
+  cmc ms   : mean time of the cmc.apply call alone (inside tracker.update)
+  update ms: mean / p95 of the whole tracker.update
+  ids      : distinct track ids created (fragmentation, lower is better for a fixed scene)
+  switches : a box overlapping (IoU > 0.5) the previous frame's box of one id but carrying another id
+  err px   : mean displacement error of the frame center under the estimated warp, against the known shake
+             with --jitter, otherwise against BoxMOT's stock ORB
+
+--jitter N adds a seeded random-walk camera shake of up to N px (translation + a little rotation) on top of the clip,
+so the true warp of every frame is known. "none" (identity warp, what skipping on a still mount returns) is the floor.
+
+Usage:
+  python benchmark_cmc.py --source clip.mp4 [--frames 300] [--jitter 12]
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+import config
+from modules.association import iou_matrix
+from modules.detector import SCRFDDetector
+from modules.motion import create_cmc
+from modules.tracker import BoTSORTTracker
+
+MODES = ("orb", "sof", "fast_orb", "flow", "none")
+
+
+class IdentityCMC:
+    """ No compensation at all """
+
+    def apply(self, img, dets=None):
+        return np.eye(2, 3, dtype=np.float32)
+
+
+def shake(frames, amplitude, seed=0):
+    """ Random-walk (dx, dy, angle) shake state per frame, clipped to amplitude px / 1 degree """
+    rng = np.random.default_rng(seed)
+    state, warps = np.zeros(3), []
+    for _ in range(frames):
+        state = np.clip(state + rng.normal(0, [amplitude / 4, amplitude / 4, 0.2]), [-amplitude, -amplitude, -1], [amplitude, amplitude, 1])
+        warps.append(state.copy())
+    return warps
+
+
+def shaken_frames(source, max_frames, jitter):
+    """ Frames of the clip, each moved by its shake state when jitter > 0. Yields (frame, (dx, dy, angle) or None) """
+    cap = cv2.VideoCapture(source)
+    states = shake(max_frames, jitter) if jitter > 0 else [None] * max_frames
+    for state in states:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        if state is not None:
+            h, w = frame.shape[:2]
+            m = cv2.getRotationMatrix2D((w / 2, h / 2), state[2], 1.0)
+            m[:, 2] += state[:2]
+            frame = cv2.warpAffine(frame, m, (w, h), borderMode=cv2.BORDER_REFLECT)
+        yield frame, state
+    cap.release()
+
+
+def true_warp(prev_state, state, shape):
+    """ Warp taking frame t-1 to frame t under the synthetic shake """
+    h, w = shape[:2]
+    def full(s):
+        m = cv2.getRotationMatrix2D((w / 2, h / 2), s[2], 1.0)
+        m[:, 2] += s[:2]
+        return np.vstack([m, [0, 0, 1]])
+    return (full(state) @ np.linalg.inv(full(prev_state)))[:2]
+
+
+def center_error(warp, reference, shape):
+    center = np.array([shape[1] / 2, shape[0] / 2, 1.0])
+    return float(np.linalg.norm(warp @ center - reference @ center))
+
+
+def run_mode(mode, args, detections, reference):
+    """ reference: {frame index: 2x3 warp} to score against (stock ORB warps), unused with --jitter. Returns (stats, warps) """
+    cmc = IdentityCMC() if mode == "none" else create_cmc(mode)
+    if cmc is None:
+        config.CMC_METHOD = mode # one of BoxMOT's own modes
+    tracker = BoTSORTTracker(cmc=cmc)
+
+    # Time the cmc call on its own and keep the warp of every frame
+    inner_apply, cmc_ms, warps, frame_index = tracker.tracker.cmc.apply, [], {}, [0]
+    def timed_apply(img, dets=None):
+        start = time.perf_counter()
+        warp = inner_apply(img, dets)
+        cmc_ms.append((time.perf_counter() - start) * 1000)
+        warps[frame_index[0]] = np.asarray(warp, dtype=float)[:2]
+        return warp
+    tracker.tracker.cmc.apply = timed_apply
+
+    update_ms, all_ids, switches, errors = [], set(), 0, []
+    prev_boxes, prev_ids, prev_state = np.empty((0, 4)), np.empty(0, dtype=int), None
+
+    for i, (frame, state) in enumerate(shaken_frames(args.source, len(detections), args.jitter)):
+        frame_index[0] = i
+        raw_boxes, landmarks = detections[i]
+
+        start = time.perf_counter()
+        tracks = tracker.update(raw_boxes, frame, landmarks)
+        update_ms.append((time.perf_counter() - start) * 1000)
+
+        # Warp quality against the known shake, or against stock ORB
+        truth = true_warp(prev_state, state, frame.shape) if state is not None and prev_state is not None else reference.get(i)
+        if i in warps and truth is not None:
+            errors.append(center_error(warps[i], truth, frame.shape))
+        prev_state = state
+
+        boxes, ids = tracks["box"].astype(float), tracks["id"]
+        all_ids.update(ids.tolist())
+        if len(boxes) and len(prev_boxes):
+            ious = iou_matrix(boxes, prev_boxes)
+            best = ious.argmax(axis=1)
+            continued = ious[np.arange(len(boxes)), best] > 0.5
+            switches += int(np.sum(continued & (ids != prev_ids[best])))
+        prev_boxes, prev_ids = boxes, ids
+
+    stats = {
+        "cmc_ms": float(np.mean(cmc_ms)) if cmc_ms else 0.0,
+        "mean_ms": float(np.mean(update_ms)) if update_ms else 0.0,
+        "p95_ms": float(np.percentile(update_ms, 95)) if update_ms else 0.0,
+        "ids": len(all_ids),
+        "switches": switches,
+        "err_px": float(np.mean(errors)) if errors else float("nan"),
+    }
+    return stats, warps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BoxMOT CMC vs downscaled / masked / optical-flow CMC")
+    parser.add_argument("--source", required=True, help="Video file")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--jitter", type=float, default=0.0, help="Synthetic camera shake in px, 0 = clip as is")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    args = parser.parse_args()
+
+    # Detections once, every mode tracks the same boxes
+    detector = SCRFDDetector()
+    detections = []
+    for frame, _ in shaken_frames(args.source, args.frames, args.jitter):
+        raw_boxes, landmarks, _ = detector.detect(frame)
+        detections.append((raw_boxes, landmarks))
+    print(f"{len(detections)} frames, jitter {args.jitter:.0f} px, CMC_SCALE {config.CMC_SCALE}, "
+          f"error vs {'known shake' if args.jitter > 0 else 'stock orb'}")
+
+    # Stock ORB first, it is the reference when there is no synthetic shake
+    modes = sorted(args.modes, key=lambda m: m != "orb")
+    reference = {}
+    print(f"{'mode':<10}{'cmc ms':>9}{'update ms':>11}{'p95 ms':>9}{'ids':>6}{'switches':>10}{'err px':>9}")
+    for mode in modes:
+        stats, warps = run_mode(mode, args, detections, reference)
+        if mode == "orb" and args.jitter <= 0:
+            reference = warps
+        print(f"{mode:<10}{stats['cmc_ms']:>9.2f}{stats['mean_ms']:>11.2f}{stats['p95_ms']:>9.2f}"
+              f"{stats['ids']:>6}{stats['switches']:>10}{stats['err_px']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmark_detector.py
+"""
+Detector microbenchmark: per-call latency of each detector on the same frames, plus how far its
+boxes / landmarks are from the reference (first detector in the list).
+--startup also measures, in a fresh interpreter per detector, the import time of its stack,
+model load time and resident memory after the first inference.
+
+Usage:
+  python benchmark_detector.py --source clip.mp4 [--frames 200] [--detectors scrfd scrfd_onnx]
+  python benchmark_detector.py --source clip.mp4 --detectors yolo yolo_onnx --startup
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from modules.association import associate
+from modules.detector import SCRFDDetector, ONNXSCRFDDetector, YOLODetector, ONNXYOLODetector
+
+DETECTORS = {
+    "scrfd": SCRFDDetector,            # insightface SCRFD.detect
+    "scrfd_onnx": ONNXSCRFDDetector,   # own session, cached anchors, preallocated tensors
+    "yolo": YOLODetector,              # ultralytics YOLO.predict (torch)
+    "yolo_onnx": ONNXYOLODetector,     # export_yolo_onnx.py model on onnxruntime
+}
+
+# Run in a fresh interpreter: heavy imports are only paid once per process
+STARTUP_PROBE = """
+import json, sys, time
+import numpy as np, psutil
+t0 = time.perf_counter()
+import modules.detector as d
+t1 = time.perf_counter()
+det = getattr(d, sys.argv[1])()
+t2 = time.perf_counter()
+det.detect(np.zeros((480, 640, 3), dtype=np.uint8))
+print(json.dumps({"import_s": t1 - t0, "load_s": t2 - t1,
+                  "rss_mb": psutil.Process().memory_info().rss / 2**20,
+                  "torch": "torch" in sys.modules}))
+"""
+
+
+def load_frames(source, max_frames):
+    cap = cv2.VideoCapture(source)
+    frames = []
+    while len(frames) < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def run(detector, frames, warmup=5):
+    for frame in frames[:warmup]:
+        detector.detect(frame)
+
+    timings, outputs = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        out = detector.detect(frame)
+        timings.append((time.perf_counter() - start) * 1000)
+        outputs.append(out if isinstance(out, tuple) else (out, None, None))   # YOLO has no landmarks
+    return np.array(timings), outputs
+
+
+def startup_cost(name):
+    """ Import / load seconds, RSS (MB) and whether torch got loaded, for one detector in a clean process """
+    result = subprocess.run([sys.executable, "-c", STARTUP_PROBE, DETECTORS[name].__name__],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def max_deviation(outputs, reference):
+    """ Largest box / landmark coordinate gap (px) after matching boxes one-to-one, and the face count mismatch """
+    box_dev, lm_dev, count_diff = 0.0, 0.0, 0
+    for (boxes, lms, _), (ref_boxes, ref_lms, _) in zip(outputs, reference):
+        count_diff += abs(len(boxes) - len(ref_boxes))
+        idx = associate(ref_boxes[:, :4], boxes[:, :4], method="iou")
+        hit = idx >= 0
+        if hit.any():
+            box_dev = max(box_dev, float(np.abs(ref_boxes[hit, :4] - boxes[idx[hit], :4]).max()))
+            if lms is not None and ref_lms is not None:
+                lm_dev = max(lm_dev, float(np.abs(ref_lms[hit] - lms[idx[hit]]).max()))
+    return box_dev, lm_dev, count_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detector latency / output agreement")
+    parser.add_argument("--source", required=True, help="Video file (or camera index)")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--detectors", nargs="+", default=["scrfd", "scrfd_onnx"], choices=list(DETECTORS))
+    parser.add_argument("--startup", action="store_true", help="Also measure import time / load time / memory")
+    args = parser.parse_args()
+
+    if args.startup:
+        print(f"{'detector':<14}{'import s':>10}{'load s':>10}{'RSS MB':>10}{'torch':>8}")
+        for name in args.detectors:
+            cost = startup_cost(name)
+            print(f"{name:<14}{cost['import_s']:>10.2f}{cost['load_s']:>10.2f}{cost['rss_mb']:>10.0f}"
+                  f"{'yes' if cost['torch'] else 'no':>8}")
+        print()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    frames = load_frames(source, args.frames)
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}")
+
+    print(f"{'detector':<14}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'box dev':>10}{'lm dev':>10}{'count':>8}")
+    reference = None
+    for name in args.detectors:
+        timings, outputs = run(DETECTORS[name](), frames)
+        if reference is None:
+            reference = outputs
+        box_dev, lm_dev, count_diff = max_deviation(outputs, reference)
+        print(f"{name:<14}{timings.mean():>10.2f}{np.percentile(timings, 50):>10.2f}{np.percentile(timings, 95):>10.2f}"
+              f"{box_dev:>10.3f}{lm_dev:>10.3f}{count_diff:>8}")
+
+
+if __name__ == "__main__":
+    main()
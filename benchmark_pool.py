@@ -0,0 +1,97 @@
+# benchmark_pool.py
+"""
+Throughput of the InferencePool backend vs worker count.
+
+  detect : frames/s of SCRFD over the clip, keeping 2 frames per worker in flight
+  embed  : faces/s of ArcFace on batches of --faces aligned faces (crops of the clip frames)
+
+"0" is the in-process baseline (ONNXSCRFDDetector / TurretRecognizer on this thread).
+
+Usage:
+  python benchmark_pool.py --source clip.mp4 [--frames 200] [--workers 0 1 2 4 8] [--faces 4]
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from benchmark_detector import load_frames
+from modules.detector import ONNXSCRFDDetector
+from modules.recognizer import TurretRecognizer
+from modules.inference_pool import InferencePool
+
+
+def face_batches(frames, batch):
+    """ Fake aligned batches (center crops resized to 112), enough to load ArcFace like the real thing """
+    batches = []
+    for frame in frames:
+        h, w = frame.shape[:2]
+        crop = cv2.resize(frame[h // 4:3 * h // 4, w // 4:3 * w // 4], (112, 112))
+        batches.append(np.repeat(crop[None], batch, axis=0))
+    return batches
+
+
+def pipelined(submit, result, items, depth):
+    """ Keeps up to depth jobs queued, returns items/s """
+    start = time.perf_counter()
+    inflight = []
+    for item in items:
+        inflight.append(submit(item))
+        if len(inflight) >= depth:
+            result(inflight.pop(0))
+    for job in inflight:
+        result(job)
+    return len(items) / (time.perf_counter() - start)
+
+
+def baseline(frames, batches):
+    detector, recognizer = ONNXSCRFDDetector(), TurretRecognizer()
+    detector.detect(frames[0])
+
+    start = time.perf_counter()
+    for frame in frames:
+        detector.detect(frame)
+    detect_fps = len(frames) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for faces in batches:
+        recognizer.embed_aligned(faces)
+    embed_fps = len(batches) / (time.perf_counter() - start)
+
+    return detect_fps, embed_fps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="InferencePool scaling")
+    parser.add_argument("--source", required=True, help="Video file (or camera index)")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4, 8])
+    parser.add_argument("--faces", type=int, default=4, help="Faces per ArcFace batch")
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    frames = load_frames(source, args.frames)
+    batches = face_batches(frames, args.faces)
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}, {args.faces} faces per batch")
+
+    print(f"{'workers':<10}{'detect fps':>12}{'speedup':>10}{'faces/s':>12}{'speedup':>10}")
+    ref = None
+    for workers in args.workers:
+        if workers == 0:
+            detect_fps, embed_fps = baseline(frames, batches)
+        else:
+            with InferencePool(workers, frame_shape=frames[0].shape, max_faces=args.faces) as pool:
+                # ArcFace loads lazily, get it into every worker before timing
+                for job in [pool.submit_embed(batches[0]) for _ in range(workers)]:
+                    pool.result(job)
+                detect_fps = pipelined(pool.submit_detect, pool.result, frames, 2 * workers)
+                embed_fps = pipelined(pool.submit_embed, pool.result, batches, 2 * workers)
+
+        embed_fps *= args.faces
+        ref = ref or (detect_fps, embed_fps)
+        print(f"{workers:<10}{detect_fps:>12.1f}{detect_fps / ref[0]:>10.2f}x{embed_fps:>11.1f}{embed_fps / ref[1]:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
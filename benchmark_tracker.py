@@ -0,0 +1,86 @@
+# benchmark_tracker.py
+"""
+BoT-SORT appearance benchmark: OSNet ReID (stock) vs cached ArcFace embeddings.
+
+Both modes see the same SCRFD detections of the same clip. Only tracker.update (which includes
+the appearance feature extraction) is timed. There is no ground truth, so ID quality is reported as:
+  ids      : distinct track ids created (fragmentation, lower is better for a fixed scene)
+  switches : a box overlapping (IoU > 0.5) the previous frame's box of one id but carrying another id
+
+Usage:
+  python benchmark_tracker.py --source clip.mp4 [--frames 600]
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from modules.association import iou_matrix
+from modules.appearance import ArcFaceEmbeddingProvider
+from modules.detector import SCRFDDetector
+from modules.recognizer import TurretRecognizer
+from modules.tracker import BoTSORTTracker
+
+
+def run_mode(mode, source, max_frames, detector, recognizer):
+    provider = ArcFaceEmbeddingProvider(recognizer) if mode == "arcface" else None
+    tracker = BoTSORTTracker(embedding_provider=provider)
+
+    cap = cv2.VideoCapture(source)
+    timings, all_ids, switches = [], set(), 0
+    prev_boxes, prev_ids = np.empty((0, 4)), np.empty(0, dtype=int)
+
+    while len(timings) < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+
+        raw_boxes, landmarks, _ = detector.detect(frame)
+
+        start = time.perf_counter()
+        tracks = tracker.update(raw_boxes, frame, landmarks)
+        timings.append((time.perf_counter() - start) * 1000)
+
+        boxes, ids = tracks["box"].astype(float), tracks["id"]
+        all_ids.update(ids.tolist())
+
+        if len(boxes) and len(prev_boxes):
+            ious = iou_matrix(boxes, prev_boxes)
+            best = ious.argmax(axis=1)
+            continued = ious[np.arange(len(boxes)), best] > 0.5
+            switches += int(np.sum(continued & (ids != prev_ids[best])))
+
+        prev_boxes, prev_ids = boxes, ids
+
+    cap.release()
+    timings = np.array(timings)
+    return {
+        "frames": len(timings),
+        "mean_ms": timings.mean() if len(timings) else 0.0,
+        "p95_ms": np.percentile(timings, 95) if len(timings) else 0.0,
+        "ids": len(all_ids),
+        "switches": switches,
+        "arcface_passes": provider.computed_ if provider else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OSNet vs ArcFace appearance for BoT-SORT")
+    parser.add_argument("--source", required=True, help="Video file (or camera index)")
+    parser.add_argument("--frames", type=int, default=600)
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    detector = SCRFDDetector()
+    recognizer = TurretRecognizer()
+
+    print(f"{'mode':<10}{'frames':>8}{'mean ms':>10}{'p95 ms':>10}{'ids':>6}{'switches':>10}{'arcface':>10}")
+    for mode in ("osnet", "arcface"):
+        r = run_mode(mode, source, args.frames, detector, recognizer)
+        print(f"{mode:<10}{r['frames']:>8}{r['mean_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+              f"{r['ids']:>6}{r['switches']:>10}{r['arcface_passes']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# compact_gallery.py
+"""
+Gallery maintenance: drops near-duplicate enrollment shots per identity and optionally stores the
+result compressed (float16 or product quantization). Prints a before / after report:
+
+  faces     : gallery entries
+  KB        : memory of the searchable data
+  query ms  : median gallery search time for a batch of --batch probes
+  accuracy  : probes identified as their own identity (leave-one-out, noisy copies of enrolled faces)
+  agreement : probes that get the same answer as the original float32 gallery
+
+Usage:
+  python compact_gallery.py [--threshold 0.9] [--storage float16] [--write]
+"""
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+
+import config
+from modules.gallery import Gallery, PQ_MIN_ROWS, STORAGES, compact_entries
+from modules.utils import log
+
+EMBEDDINGS_DIR = os.path.join("assets", "faces", "embeddings")
+
+
+def make_probes(gallery_embeddings, noise, seed=0):
+    """ One probe per enrolled face: the embedding plus a random perturbation of relative size noise, renormalized """
+    rng = np.random.default_rng(seed)
+    jitter = rng.standard_normal(gallery_embeddings.shape).astype(np.float32)
+    jitter *= noise / np.linalg.norm(jitter, axis=1, keepdims=True)
+    probes = gallery_embeddings + jitter
+    return probes / np.linalg.norm(probes, axis=1, keepdims=True)
+
+
+def identify(gallery, probes, probe_origins, threshold):
+    """ Leave-one-out identification: a probe never matches the entry it was made from """
+    distances = gallery.distances(probes)
+    origins = np.array(gallery.origins)
+    distances[np.asarray(probe_origins)[:, None] == origins[None]] = np.inf
+
+    best = distances.argmin(axis=1) if distances.shape[1] else np.zeros(len(probes), dtype=int)
+    names = np.array(gallery.names + ["Unknown"])
+    best_dist = distances[np.arange(len(probes)), best] if distances.shape[1] else np.full(len(probes), np.inf)
+    return np.where(best_dist <= threshold, names[best], "Unknown")
+
+
+def query_ms(gallery, probes, batch, repeats=50):
+    timings = []
+    for r in range(repeats):
+        start = (r * batch) % max(1, len(probes) - batch)
+        chunk = probes[start:start + batch]
+        t0 = time.perf_counter()
+        gallery.distances(chunk)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gallery compaction / compression")
+    parser.add_argument("--model", default="w600k_r50")
+    parser.add_argument("--threshold", type=float, default=0.9, help="Drop shots more cosine-similar than this to a kept one")
+    parser.add_argument("--storage", default="float32", choices=STORAGES, help="Storage written with --write")
+    parser.add_argument("--pq-subspaces", type=int, default=64)
+    parser.add_argument("--noise", type=float, default=0.5, help="Relative probe perturbation")
+    parser.add_argument("--batch", type=int, default=8, help="Probes per timed search")
+    parser.add_argument("--write", action="store_true", help=f"Save as {EMBEDDINGS_DIR}/<model>_gallery.npz")
+    args = parser.parse_args()
+
+    with open(os.path.join(EMBEDDINGS_DIR, f"{args.model}_encodings.pkl"), "rb") as f:
+        entries = pickle.load(f)
+
+    original = Gallery.from_entries(entries)
+    embeddings = np.stack([e["embedding"].flatten() for e in entries]).astype(np.float32)
+    probes = make_probes(embeddings, args.noise)
+    truth = np.array(original.names)
+    reference = identify(original, probes, original.origins, config.REG_CONF_THRESHOLD)
+
+    keep = compact_entries(original.names, embeddings, args.threshold)
+    storages = STORAGES
+    if len(keep) < PQ_MIN_ROWS:
+        log(f"{len(keep)} faces are too few for PQ (needs {PQ_MIN_ROWS}), float16 is used instead", "WARNING")
+        storages = tuple(s for s in STORAGES if s != "pq")
+        if args.storage == "pq":
+            args.storage = "float16"
+
+    variants = {"original": original}
+    for storage in storages:
+        variants[f"compact/{storage}"] = Gallery([original.names[i] for i in keep], [original.origins[i] for i in keep],
+                                                 embeddings[keep], storage, pq_subspaces=args.pq_subspaces,
+                                                 sources=original.origins) # pruned shots are not new enrollments
+
+    print(f"{len(set(original.names))} identities, {len(original)} faces, {len(original) - len(keep)} near-duplicates "
+          f"(similarity >= {args.threshold})")
+    print(f"{'gallery':<18}{'faces':>8}{'KB':>10}{'query ms':>10}{'accuracy':>10}{'agreement':>11}")
+    for label, gallery in variants.items():
+        answers = identify(gallery, probes, original.origins, config.REG_CONF_THRESHOLD)
+        print(f"{label:<18}{len(gallery):>8}{gallery.nbytes / 1024:>10.1f}{query_ms(gallery, probes, args.batch):>10.3f}"
+              f"{(answers == truth).mean():>10.3f}{(answers == reference).mean():>11.3f}")
+
+    if args.write:
+        path = os.path.join(EMBEDDINGS_DIR, f"{args.model}_gallery.npz")
+        variants[f"compact/{args.storage}"].save(path)
+        log(f"Compact gallery written: {path}", "INFO")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,23 @@
 
 # --- SYSTEM SETTINGS ---
 DEBUG_MODE = True               # Show video window for debugging
+LOG_LEVEL = "INFO"              # Lowest level printed: "DEBUG", "INFO", "WARNING", "ERROR"
+LOG_JSONL = ""                  # Also append every log line as JSON to this file, "" = off
+LOG_RATE_BURST = 5              # Same message at most this many times ...
+LOG_RATE_WINDOW = 1.0           # ... per this many seconds, the rest is counted and summarized
+HUD_HISTORY_MAX_LINES = 5000    # SentryHUD detection history keeps the newest lines only, 0 = unbounded
+PROFILE_DIR = "profiles"        # Sampling profiler captures (HUD PROFILE button, SIGUSR1, headless --profile)
+PROFILE_SECONDS = 10.0          # Length of one capture
+PROFILE_INTERVAL_MS = 5         # Stack sampling period, lower = more detail, more overhead while capturing
 
 # --- CAMERA SETTINGS ---
 CAMERA_INDEX = 0                # USB Webcam index for pixels
+CAMERA_BACKEND = "auto"         # "auto" (MSMF on Windows, V4L2 on Linux, AVFoundation on macOS), "msmf", "dshow", "v4l2", "any"
+CAMERA_BUFFER_SIZE = 1          # Driver-side frame queue, the grab thread keeps it drained anyway
 FRAME_WIDTH = 1280              # Logitech C270 specs
 FRAME_HEIGHT = 720
 FPS = 30                        # Target framerate
+DETECT_SCALE = 0.5              # Detection + tracking run on the frame scaled by this, recognition crops from full res (1.0 = off)
 FOCAL_LENGTH = 150 * 65.29 / 6.3   # Focal distance of the cam from live calibration
 
 # --- DETECTOR SETTINGS ---
@@ -15,6 +26,62 @@ RUN_ON_GPU = True               # Toggle GPU usage
 DET_CONF_THRESHOLD = 0.25       # How sure the detector machine should be
 REG_CONF_THRESHOLD = 0.45       # How sure the recognizer machine should be, but reversed and between 0-2
 RETRY_INTERVAL = 10.0           # Seconds to wait before re-identifying an Unknown
+GALLERY_WATCH_INTERVAL = 2.0    # Seconds between checks for new enrollments (hot-reload), 0 = load once at start
+ORT_INTRA_OP_THREADS = 0        # onnxruntime threads per session we own, 0 = library default
+INFERENCE_WORKERS = 0           # >0: detection + ArcFace run in this many worker processes (CPU-only nodes)
+DET_AUTOTUNE = False            # Pick the SCRFD input size per frame from face size + latency budget (single process only)
+DET_AUTOTUNE_SIZES = (320, 480, 640)  # Square input sizes to choose from
+DET_LATENCY_BUDGET_MS = 25.0    # Detection ms per frame the autotuner aims to stay under
+DET_MIN_FACE_INPUT_PX = 24      # Smallest tracked face must span this many pixels at the network input (SCRFD anchors start at 16)
+DET_AUTOTUNE_WINDOW = 30        # Frames between checks for a smaller size (bigger sizes switch immediately)
+DET_AUTOTUNE_PROBE_EVERY = 15   # Every N-th frame runs the largest affordable size to find new small faces
+
+# --- LOAD SHEDDING ---
+SHED_POLICY = ("defer_recognition", "lower_resolution", "skip_candidates", "skip_detection")  # Steps in the order they kick in under overload, () = off
+SHED_BUDGET_MS = 0.0            # Frame budget, 0 = 1000 / FPS (headless / soak: from --rate, off when flat out)
+SHED_OVERLOAD_FRAMES = 10       # Frames with the frame-time average over budget before the next step
+SHED_RECOVER_FRAMES = 60        # Frames the last step would no longer be needed before it is undone
+SHED_HEADROOM = 0.85            # ... "no longer needed" = predicted frame time without it under this share of the budget
+SHED_MAX_RECOGNITIONS = 1       # defer_recognition: faces identified per frame, the rest wait for a later frame
+SHED_DET_INPUT_SIZE = 320       # lower_resolution: SCRFD input size (autotuning: largest size allowed)
+SHED_DETECT_EVERY = 2           # skip_detection: detect + track on every N-th frame, tracks keep their boxes in between
+
+# --- SESSION RECORDING ---
+RECORD_DIR = ""                 # GUI: record every session under this folder (timestamped subfolder), "" = off
+RECORD_QUEUE_SIZE = 64          # Frames waiting for the encoder thread before the drop policy kicks in
+RECORD_DROP_POLICY = "drop_new" # Disk too slow: "drop_new" skips incoming frames, "drop_old" evicts the oldest queued
+
+# --- TRACKING SETTINGS ---
+ASSOCIATION_METHOD = "iou"      # Track -> raw detection matching: "iou" or "center"
+ASSOCIATION_MIN_IOU = 0.3       # Gate for "iou", pairs below this never match
+ASSOCIATION_MAX_CENTER_DIST = 80.0  # Gate for "center", in pixels
+TRACK_CAPACITY = 64             # Preallocated TrackTable slots (grows if exceeded)
+CMC_METHOD = "orb"              # BoT-SORT camera motion: BoxMOT's "orb" / "sof" / "ecc" (full frame), or ours: "fast_orb", "flow"
+CMC_SCALE = 0.25                # fast_orb / flow: estimate at this fraction of full resolution, faces masked out
+CMC_MAX_FEATURES = 300          # fast_orb / flow: keypoints per frame
+CMC_SKIP_WHEN_STILL = True      # fast_orb / flow: identity warp while the turret has no motion command
+CMC_STILL_FRAMES = 5            # Updates without a pan / tilt command before the mount counts as still
+REID_SOURCE = "osnet"           # BoT-SORT appearance: "osnet" (torch ReID net) or "arcface" (shared face embeddings)
+REID_REFRESH_FRAMES = 5         # arcface: recompute a track's embedding every N frames, reuse the cached one in between
+ID_MEMORY_SIZE = 32             # Recently lost identities kept for re-attaching to new track ids
+ID_MEMORY_TTL = 3.0             # Seconds a lost identity can be inherited
+ID_MEMORY_RADIUS = 120.0        # Pixels between where it was lost and where the new track appears
+ID_MEMORY_MAX_EMB_DIST = 0.4    # Cosine distance gate when an embedding is available on both sides
+
+# --- FACE QUALITY GATE (before recognition) ---
+QUALITY_MIN_FACE_PX = 48        # Shorter box side, smaller faces wait until they come closer
+QUALITY_MIN_DET_SCORE = 0.55    # SCRFD confidence
+QUALITY_MAX_YAW = 0.3           # Nose offset / eye distance, ~0.5 is full profile
+QUALITY_MAX_ROLL = 30.0         # Degrees of head tilt
+QUALITY_MIN_SHARPNESS = 60.0    # Laplacian variance of the 64x64 gray crop, lower = blurrier
+
+# --- BOX SMOOTHING SETTINGS ---
+BOX_SMOOTHER = "moving_average" # "moving_average", "ema" or "one_euro"
+BOX_WINDOW_SIZE = 6             # moving_average: Higher = Smoother, but more lag
+BOX_EMA_ALPHA = 0.2             # ema: 0.1 = very smooth/slow, 0.9 = jerky/fast
+ONE_EURO_MIN_CUTOFF = 1.0       # one_euro: Hz, lower = smoother when the face is still
+ONE_EURO_BETA = 0.05            # one_euro: speed coefficient, higher = less lag when moving
+ONE_EURO_D_CUTOFF = 1.0         # one_euro: Hz, cutoff for the speed estimate
 
 
 # --- DATABASE SETTINGS ---
@@ -0,0 +1,200 @@
+# diagnose_capture.py
+"""
+Capture diagnostics: sweeps backend x resolution x FOURCC x buffer size for one source and measures what
+the camera really delivers, to pick config.FRAME_WIDTH / FRAME_HEIGHT / FPS / CAMERA_BACKEND / CAMERA_BUFFER_SIZE per site.
+
+Per configuration (after a short warm-up):
+  actual    : resolution / FOURCC / FPS the driver reports after our set() calls (cameras silently ignore some)
+  fps       : sustained frames per second over --seconds
+  grab ms   : mean time waiting for the next frame (grab)
+  decode ms : mean retrieve() time, the per-frame decode cost
+  jitter ms : std / p95 of the frame-to-frame interval
+  dup %     : frames identical to the previous one (driver re-sending a stale buffer)
+  latency ms: with --latency, screen-to-capture delay from a flashing window the camera must see (includes display lag)
+
+Usage:
+  python diagnose_capture.py --source 0
+  python diagnose_capture.py --source 0 --resolutions 1280x720 1920x1080 --fourccs MJPG YUYV --buffers 1 4 --latency 10
+  python diagnose_capture.py --source clip.mp4          # decode cost of a recorded source
+"""
+import argparse
+import itertools
+import time
+
+import cv2
+import numpy as np
+
+import config
+from modules.camera import BACKENDS, camera_backend
+
+WARMUP_S = 1.0
+
+
+def fourcc_str(value):
+    value = int(value)
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00") or "-"
+
+
+def thumbnail(frame):
+    """ Cheap fingerprint for duplicate detection: every 16th pixel """
+    return frame[::16, ::16].copy()
+
+
+def open_capture(source, backend, resolution, fourcc, buffer_size):
+    cap = cv2.VideoCapture(source, BACKENDS[backend])
+    if not cap.isOpened():
+        return None
+    if isinstance(source, int): # files ignore these anyway
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+        cap.set(cv2.CAP_PROP_FPS, config.FPS)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return cap
+
+
+def measure(cap, seconds, live=True):
+    """ grab / retrieve loop, returns the throughput numbers of one configuration. Files are not warmed up and rewind at the end """
+    deadline = time.perf_counter() + (WARMUP_S if live else 0.0)
+    while time.perf_counter() < deadline and cap.grab():
+        pass
+
+    stamps, grab_ms, decode_ms, dups = [], [], [], 0
+    previous = None
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        t0 = time.perf_counter()
+        if not cap.grab():
+            if live or not cap.set(cv2.CAP_PROP_POS_FRAMES, 0) or not cap.grab():
+                break
+        t1 = time.perf_counter()
+        ok, frame = cap.retrieve()
+        t2 = time.perf_counter()
+        if not ok:
+            break
+
+        grab_ms.append((t1 - t0) * 1000)
+        decode_ms.append((t2 - t1) * 1000)
+        stamps.append(t1)
+
+        thumb = thumbnail(frame)
+        if previous is not None and np.array_equal(thumb, previous):
+            dups += 1
+        previous = thumb
+
+    if len(stamps) < 2:
+        return None
+
+    intervals = np.diff(stamps) * 1000
+    return {
+        "frames": len(stamps),
+        "fps": (len(stamps) - 1) / (stamps[-1] - stamps[0]),
+        "grab_ms": float(np.mean(grab_ms)),
+        "decode_ms": float(np.mean(decode_ms)),
+        "jitter_ms": float(np.std(intervals)),
+        "p95_interval_ms": float(np.percentile(intervals, 95)),
+        "dup_pct": 100.0 * dups / len(stamps),
+    }
+
+
+def measure_latency(cap, trials, window="capture latency"):
+    """
+    Flash test: a full-screen window goes black -> white, we time until the captured center turns bright.
+    The camera has to look at the screen. Returns the median ms, or None if no flash was ever seen
+    """
+    cv2.namedWindow(window, cv2.WINDOW_NORMAL)
+    cv2.setWindowProperty(window, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+    black, white = np.zeros((720, 1280, 3), np.uint8), np.full((720, 1280, 3), 255, np.uint8)
+
+    def center_level():
+        ok, frame = cap.read()
+        if not ok:
+            return None
+        h, w = frame.shape[:2]
+        return float(frame[h // 3:2 * h // 3, w // 3:2 * w // 3].mean())
+
+    latencies = []
+    for _ in range(trials):
+        cv2.imshow(window, black)
+        cv2.waitKey(1)
+        settle = time.perf_counter() + 0.7
+        dark = None
+        while time.perf_counter() < settle:
+            dark = center_level()
+            cv2.waitKey(1)
+
+        cv2.imshow(window, white)
+        cv2.waitKey(1)
+        flashed = time.perf_counter()
+
+        # Bright once the center is clearly above the dark level, give up after a second
+        while time.perf_counter() - flashed < 1.0:
+            level = center_level()
+            if level is not None and dark is not None and level > dark + 40:
+                latencies.append((time.perf_counter() - flashed) * 1000)
+                break
+
+    cv2.destroyWindow(window)
+    return float(np.median(latencies)) if latencies else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Camera capture diagnostics")
+    parser.add_argument("--source", default=str(config.CAMERA_INDEX), help="Camera index or video file")
+    parser.add_argument("--backends", nargs="+", default=["auto", "any"], help=f"auto or any of {list(BACKENDS)}")
+    parser.add_argument("--resolutions", nargs="+", default=[f"{config.FRAME_WIDTH}x{config.FRAME_HEIGHT}", "640x480"])
+    parser.add_argument("--fourccs", nargs="+", default=["MJPG", "YUYV"])
+    parser.add_argument("--buffers", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--seconds", type=float, default=5.0, help="Measurement time per configuration")
+    parser.add_argument("--latency", type=int, default=0, help="Flash trials per configuration for end-to-end latency, 0 = skip")
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    backends = list(dict.fromkeys(
+        next(name for name, api in BACKENDS.items() if api == camera_backend(b)) if b == "auto" else b for b in args.backends))
+    resolutions = [tuple(int(v) for v in r.lower().split("x")) for r in args.resolutions]
+    if not isinstance(source, int): # a file has one resolution / format, only the backend matters
+        resolutions, fourccs, buffers = [(0, 0)], ["-"], [0]
+    else:
+        fourccs, buffers = args.fourccs, args.buffers
+
+    header = (f"{'backend':<13}{'asked':>11}{'fourcc':>7}{'buf':>4} | {'actual':>11}{'fourcc':>7}{'drv fps':>8} | "
+              f"{'fps':>6}{'grab ms':>8}{'decode ms':>10}{'jitter':>7}{'p95 int':>8}{'dup %':>6}{'lat ms':>7}")
+    print(header)
+    print("-" * len(header))
+
+    results = []
+    for backend, resolution, fourcc, buffer_size in itertools.product(backends, resolutions, fourccs, buffers):
+        cap = open_capture(source, backend, resolution, fourcc, buffer_size)
+        asked = f"{resolution[0]}x{resolution[1]}" if resolution[0] else "file"
+        if cap is None:
+            print(f"{backend:<13}{asked:>11}{fourcc:>7}{buffer_size:>4} | not available")
+            continue
+
+        actual = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        actual_fourcc, driver_fps = fourcc_str(cap.get(cv2.CAP_PROP_FOURCC)), cap.get(cv2.CAP_PROP_FPS)
+        r = measure(cap, args.seconds, live=isinstance(source, int))
+        latency = measure_latency(cap, args.latency) if args.latency and r is not None else None
+        cap.release()
+
+        if r is None:
+            print(f"{backend:<13}{asked:>11}{fourcc:>7}{buffer_size:>4} | no frames")
+            continue
+
+        lat = f"{latency:>7.0f}" if latency is not None else f"{'-':>7}"
+        print(f"{backend:<13}{asked:>11}{fourcc:>7}{buffer_size:>4} | {actual[0]:>5}x{actual[1]:<5}{actual_fourcc:>7}{driver_fps:>8.1f} | "
+              f"{r['fps']:>6.1f}{r['grab_ms']:>8.2f}{r['decode_ms']:>10.2f}{r['jitter_ms']:>7.1f}{r['p95_interval_ms']:>8.1f}"
+              f"{r['dup_pct']:>6.1f}{lat}")
+        results.append((backend, actual, buffer_size, r))
+
+    # Suggestion: the most pixels that still sustain the target FPS, cheapest decode among those
+    if results and isinstance(source, int):
+        sustained = [x for x in results if x[3]["fps"] >= 0.95 * config.FPS] or results
+        backend, actual, buffer_size, r = max(sustained, key=lambda x: (x[1][0] * x[1][1], x[3]["fps"], -x[3]["decode_ms"]))
+        fps = config.FPS if r["fps"] >= 0.95 * config.FPS else int(r["fps"])
+        print(f"\nSuggested config: CAMERA_BACKEND = \"{backend}\", FRAME_WIDTH = {actual[0]}, FRAME_HEIGHT = {actual[1]}, "
+              f"FPS = {fps}, CAMERA_BUFFER_SIZE = {buffer_size}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# export_yolo_onnx.py
+"""
+One-off export of the ultralytics face model to ONNX for ONNXYOLODetector.
+Static 640x640 input, batch 1, NMS left out of the graph (the detector does it in numpy).
+
+Usage:
+  python export_yolo_onnx.py [--weights assets/models/yolov8n-face-lindevs.pt] [--imgsz 640]
+"""
+import argparse
+import os
+
+from ultralytics import YOLO
+
+from modules.utils import log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export yolov8n-face-lindevs to ONNX")
+    parser.add_argument("--weights", default=os.path.join("assets", "models", "yolov8n-face-lindevs.pt"))
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.weights):
+        log(f"{args.weights} not found", "ERROR")
+        return
+
+    # Writes <weights>.onnx next to the .pt, with the class names in the model metadata
+    out_path = YOLO(args.weights).export(format="onnx", imgsz=args.imgsz, opset=args.opset,
+                                         dynamic=False, simplify=True, nms=False)
+    log(f"Exported {out_path}", "INFO")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 # face_embeddings.py
 import os, pickle, cv2, numpy as np
 from insightface.model_zoo import get_model
-from insightface.utils import face_align
 from modules.utils import log
+from modules.alignment import FaceAligner
 
 # --- CONFIG ---
 RAW_IMAGES_PATH = "assets/faces/raw_images"
@@ -16,6 +16,7 @@ def update_embeddings():
     det_model.prepare(ctx_id=0, input_size=(640, 640))
     rec_model = get_model(REC_MODEL_PATH, providers=['CUDAExecutionProvider'])
     rec_model.prepare(ctx_id=0)
+    aligner = FaceAligner()
 
     known_data = []
     if os.path.exists(EMBEDDINGS_FILE):
@@ -32,6 +33,7 @@ def update_embeddings():
         # Prepare debug subdir for this person
         person_debug_dir = os.path.join(DEBUG_PATH, person_name)
         os.makedirs(person_debug_dir, exist_ok=True)
+        person_entries = 0
 
         for image_name in os.listdir(person_dir):
             if image_name in existing_origins: continue
@@ -53,7 +55,7 @@ def update_embeddings():
 
             if bboxes is not None and bboxes.shape[0] > 0:
                 # 1. Align the face
-                aligned_face = face_align.norm_crop(source_to_use, landmark=kpss[0])
+                aligned_face = aligner.align(source_to_use, kpss[:1])[0]
                 
                 # 2. SAVE FOR DEBUGGING
                 # This lets you see exactly what is being sent to the recognizer
@@ -70,15 +72,23 @@ def update_embeddings():
                     "origin": image_name
                 })
                 new_entries += 1
-                print(f"[+] Encoded & Saved Debug: {person_name} ({image_name})")
+                person_entries += 1
+                log("[+] Encoded & Saved Debug: %s (%s)", "INFO", person_name, image_name)
             else:
-                print(f"[!] FAILED: {image_name} - No face found even with padding.")
+                log("[!] FAILED: %s - No face found even with padding.", "WARNING", image_name)
+
+        # Per-image lines past LOG_RATE_BURST a second get summarized by the logger, this one always shows
+        if person_entries:
+            log("[+] %s: %d new image(s) enrolled", "INFO", person_name, person_entries)
 
     if new_entries > 0:
         os.makedirs(os.path.dirname(EMBEDDINGS_FILE), exist_ok=True)
-        with open(EMBEDDINGS_FILE, "wb") as f:
+        # Write aside and swap in, a running recognizer hot-reloads this file and must never see half of it
+        tmp_file = EMBEDDINGS_FILE + ".tmp"
+        with open(tmp_file, "wb") as f:
             pickle.dump(known_data, f)
-        print(f"Success. Total Database size: {len(known_data)}")
+        os.replace(tmp_file, EMBEDDINGS_FILE)
+        log(f"Success. {new_entries} new, total Database size: {len(known_data)}", "INFO")
 
 if __name__ == "__main__":
     update_embeddings()
\ No newline at end of file
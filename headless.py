@@ -0,0 +1,118 @@
+# headless.py
+"""
+Headless sentry: the same detect / track / recognize / lock stack as the GUI, no Qt and no drawing.
+Runs as fast as the models allow (--rate 0) or paced to a target FPS, and publishes one report per frame
+(tracks, identities, lock state, stage timings) for other processes. Doubles as an end-to-end benchmark.
+Paced runs shed load (modules/scheduler.py) when frames keep overrunning 1000 / rate ms, flat-out runs never do.
+
+Usage:
+  python headless.py --source 0                                   # live camera, 30 FPS
+  python headless.py --source clip.mp4 --rate 0                   # every frame, flat out
+  python headless.py --source 0 --publish udp://127.0.0.1:5555    # JSON datagram per frame
+  python headless.py --source 0 --publish shm://sentry            # latest report in shared memory
+  python headless.py --source 0 --record sessions/run1            # capture frames + reports
+  python headless.py --source sessions/run1 --rate 0              # replay a recorded session
+  python headless.py --source 0 --profile 10                      # 10 s sampling profile (also: kill -USR1 <pid>)
+"""
+import argparse
+import time
+from collections import deque
+
+import config
+from modules.utils import log
+from modules.pipeline import SentryPipeline
+from modules.sources import open_source
+from modules.publisher import create_publisher
+from modules.recorder import SessionRecorder
+from modules.telemetry import summarize_timings
+from modules.profiler import PROFILER, install_signal_toggle
+
+SUMMARY_FRAMES = 10000 # stage timings kept for the exit summary (newest), a service run would grow them forever
+
+
+def print_summary(timings, frames, elapsed, shed_events, deferred):
+    print(f"\n{frames} frames in {elapsed:.1f}s, {frames / max(elapsed, 1e-9):.1f} FPS")
+    print(f"{'stage':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}" + (f"  (last {len(timings)} frames)" if len(timings) < frames else ""))
+    for stage, (mean, p50, p95) in summarize_timings(timings).items():
+        print(f"{stage:<12}{mean:>10.2f}{p50:>10.2f}{p95:>10.2f}")
+
+    print(f"\nRecognitions deferred: {deferred['quality']} by the quality gate, {deferred['shed']} by load shedding")
+    if shed_events:
+        print(f"\nLoad shedding: {len(shed_events)} changes")
+        for e in shed_events:
+            print(f"  {e['action']:<8}{e['step']:<20} level {e['level']}  {e['frame_ms']:.1f} / {e['budget_ms']:.1f} ms  ({e['reason']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless sentry pipeline")
+    parser.add_argument("--source", default=str(config.CAMERA_INDEX), help="Camera index, video file or image directory")
+    parser.add_argument("--rate", type=float, default=config.FPS, help="Target FPS, 0 = as fast as possible")
+    parser.add_argument("--frames", type=int, default=0, help="Stop after N frames, 0 = until the source ends")
+    parser.add_argument("--loop", action="store_true", help="Restart file / folder sources at the end")
+    parser.add_argument("--publish", default="", help="udp://host:port or shm://name")
+    parser.add_argument("--record", default="", help="Record frames + reports into this session folder")
+    parser.add_argument("--lock", action="store_true", help="Start with target locking enabled")
+    parser.add_argument("--profile", type=float, default=0.0, help="Sample stacks for this many seconds from the start, 0 = off")
+    parser.add_argument("--report-every", type=float, default=5.0, help="Seconds between FPS log lines")
+    args = parser.parse_args()
+
+    source = open_source(args.source, loop=args.loop)
+    publisher = create_publisher(args.publish)
+    pipeline = SentryPipeline()
+    pipeline.scheduler.set_budget(1000.0 / args.rate if args.rate > 0 else 0) # flat out has no deadline to shed for
+    if args.record:
+        pipeline.attach_recorder(SessionRecorder(args.record, fps=args.rate or config.FPS))
+    if args.lock:
+        pipeline.toggle_lock()
+
+    install_signal_toggle(PROFILER)
+    if args.profile > 0:
+        PROFILER.start(args.profile)
+
+    period = 1.0 / args.rate if args.rate > 0 else 0.0
+    timings, frames = deque(maxlen=SUMMARY_FRAMES), 0
+    start = last_report = time.perf_counter()
+
+    try:
+        while not args.frames or frames < args.frames:
+            loop_start = time.perf_counter()
+
+            frame = source.read()
+            if frame is None:
+                break
+
+            _, _, report = pipeline.process(frame, draw=False)
+            if publisher is not None:
+                publisher.publish(report)
+
+            timings.append(report["timings"])
+            frames += 1
+
+            now = time.perf_counter()
+            if now - last_report >= args.report_every:
+                log(f"{frames} frames, {frames / (now - start):.1f} FPS, {len(report['tracks'])} tracks", "INFO")
+                last_report = now
+
+            # Pace to the target rate, flat out when period is 0
+            remaining = period - (time.perf_counter() - loop_start)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    except KeyboardInterrupt:
+        log("Interrupted", "INFO")
+
+    finally:
+        elapsed = time.perf_counter() - start
+        if PROFILER.running:
+            PROFILER.stop()
+        pipeline.close()
+        source.release()
+        if publisher is not None:
+            publisher.close()
+
+    deferred = {"quality": pipeline.quality_deferred, "shed": pipeline.shed_deferred}
+    print_summary(timings, frames, elapsed, list(pipeline.scheduler.events), deferred)
+
+
+if __name__ == "__main__":
+    main()
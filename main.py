@@ -84,7 +84,7 @@ def main():
                         stabilized_boxes[track_id] = [rx1, ry1, rx2, ry2]
                     
                     # (0.1 = very smooth/slow, 0.9 = jerky/fast)
-                    alpha = 0.2 
+                    alpha = config.BOX_EMA_ALPHA
                     old_box = stabilized_boxes[track_id]
                     
                     # Calculate new smooth coordinates
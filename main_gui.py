@@ -15,12 +15,14 @@ import sys
 
 # Third Party Libraries
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
 
 # Modules
 from modules.camera import CameraStream
 from modules.interface import SentryHUD
 from modules.visionworker import VisionWorker
 from modules.utils import log
+from modules.profiler import PROFILER, install_signal_toggle
 
 ###################################################################################
 
@@ -49,6 +51,14 @@ def main():
 
     log("Starting Sentry Subsystem...", "INFO")
     worker.start()
+
+    # 3.1. Profiler: PROFILE button, `kill -USR1 <pid>`, or --profile to capture right from the start
+    if install_signal_toggle(PROFILER):
+        wake_timer = QTimer() # Python signal handlers only run when the interpreter gets control back from Qt
+        wake_timer.timeout.connect(lambda: None)
+        wake_timer.start(250)
+    if "--profile" in sys.argv:
+        PROFILER.start()
     
     # 4. Kill
     sys.exit(app.exec()) 
@@ -0,0 +1,76 @@
+# modules/alignment.py
+
+##################################### Imports #####################################
+# Libraries
+import cv2
+import numpy as np
+
+###################################################################################
+
+# ArcFace 112x112 reference landmarks (same template insightface's norm_crop uses)
+ARCFACE_DST = np.array([
+    [38.2946, 51.6963],
+    [73.5318, 51.5014],
+    [56.0252, 71.7366],
+    [41.5493, 92.3655],
+    [70.7299, 92.2041]], dtype=np.float64)
+
+
+def estimate_similarity_batch(landmarks, dst=ARCFACE_DST):
+    """
+    Closed-form Umeyama similarity (rotation + uniform scale + translation) for N landmark sets at once.
+    (N, 5, 2) -> (N, 2, 3) affine matrices mapping each set onto dst.
+    Same estimate as skimage's SimilarityTransform.estimate, without the per-face object overhead.
+    """
+    src = np.asarray(landmarks, dtype=np.float64)
+    n, k = src.shape[0], src.shape[1]
+
+    src_mean = src.mean(axis=1, keepdims=True)              # (N, 1, 2)
+    dst_mean = dst.mean(axis=0)                             # (2,)
+    src_demean = src - src_mean
+    dst_demean = dst - dst_mean
+
+    # Cross-covariance per set, (N, 2, 2)
+    A = np.einsum("ki,nkj->nij", dst_demean, src_demean) / k
+
+    # Reflection guard: flip the last singular direction when det(A) < 0
+    d = np.ones((n, 2))
+    d[np.linalg.det(A) < 0, 1] = -1.0
+
+    U, S, Vt = np.linalg.svd(A)
+    R = U @ (d[:, :, None] * Vt)                            # U @ diag(d) @ Vt
+
+    src_var = src_demean.var(axis=1).sum(axis=1)            # (N,)
+    scale = (S * d).sum(axis=1) / src_var
+
+    M = np.empty((n, 2, 3))
+    M[:, :, :2] = R * scale[:, None, None]
+    M[:, :, 2] = dst_mean - np.einsum("nij,nj->ni", M[:, :, :2], src_mean[:, 0])
+    return M
+
+
+class FaceAligner:
+    """
+    Batched ArcFace alignment: one vectorized transform estimate for every face of the frame,
+    each face warped straight into a reusable (N, 112, 112, 3) buffer that feeds batched ArcFace.
+    """
+
+    def __init__(self, image_size=112, capacity=8):
+        self.image_size_ = image_size
+        self.dst_ = ARCFACE_DST * (image_size / 112.0)
+        self.buffer_ = np.zeros((capacity, image_size, image_size, 3), dtype=np.uint8)
+
+    def align(self, frame, landmarks):
+        """
+        (N, 5, 2) landmarks -> (N, 112, 112, 3) aligned faces.
+        Returns a view into the shared buffer, valid until the next call; copy anything you keep.
+        """
+        n = len(landmarks)
+        if n > len(self.buffer_):
+            self.buffer_ = np.zeros((max(n, 2 * len(self.buffer_)),) + self.buffer_.shape[1:], dtype=np.uint8)
+
+        size = (self.image_size_, self.image_size_)
+        for face, M in zip(self.buffer_[:n], estimate_similarity_batch(landmarks, self.dst_)):
+            cv2.warpAffine(frame, M, size, dst=face, borderValue=0.0)
+
+        return self.buffer_[:n]
@@ -0,0 +1,89 @@
+# modules/appearance.py
+
+##################################### Imports #####################################
+# Libraries
+import numpy as np
+
+# Modules
+import config
+from modules.utils import log
+from modules.association import associate
+
+###################################################################################
+
+class ArcFaceEmbeddingProvider:
+    """
+    Appearance features for BoT-SORT taken from the ArcFace model we already run for recognition,
+    instead of a separate OSNet ReID network on every detection every frame.
+
+    Embeddings are cached per track: a detection that overlaps a track from the previous frame reuses
+    that track's embedding until it is refresh_interval frames old. Only new faces and stale
+    entries pay for alignment + ArcFace, and they are embedded in one batch.
+    """
+
+    EMBEDDING_DIM = 512 # w600k_r50 output size
+
+    def __init__(self, recognizer, refresh_interval=config.REID_REFRESH_FRAMES, min_score=0.0):
+        self.recognizer = recognizer
+        self.refresh_interval_ = refresh_interval
+        self.min_score_ = min_score     # BoT-SORT ignores features below its high threshold, skip those
+
+        # Previous frame's tracks (filled by observe)
+        self.track_ids_ = np.empty(0, dtype=np.int64)
+        self.track_boxes_ = np.empty((0, 4), dtype=float)
+        self.track_embs_ = np.empty((0, self.EMBEDDING_DIM), dtype=np.float32)
+        self.track_age_ = np.empty(0, dtype=np.intp)
+
+        # Current frame's per-detection features (filled by features)
+        self.det_embs_ = np.empty((0, self.EMBEDDING_DIM), dtype=np.float32)
+        self.det_age_ = np.empty(0, dtype=np.intp)
+
+        self.computed_ = 0  # ArcFace passes, for benchmarking
+        log("Appearance: ArcFace embedding provider initialized.", "INFO")
+
+    def features(self, frame, raw_detections, landmarks):
+        """ (N, 6) detections + (N, 5, 2) landmarks -> (N, D) unit embeddings, row-aligned with the detections """
+        n = len(raw_detections)
+
+        # 1. Which detections continue a cached track?
+        prev_idx = associate(raw_detections[:, :4], self.track_boxes_, method="iou")
+        reuse = prev_idx >= 0
+        reuse[reuse] = self.track_age_[prev_idx[reuse]] + 1 < self.refresh_interval_
+
+        # 2. Batch-embed the rest (confident ones only)
+        compute = ~reuse & (raw_detections[:, 4] >= self.min_score_)
+        embs = np.zeros((n, self.EMBEDDING_DIM), dtype=np.float32)
+        age = np.full(n, self.refresh_interval_, dtype=np.intp) # skipped rows stay stale -> recomputed once confident
+
+        if reuse.any():
+            embs[reuse] = self.track_embs_[prev_idx[reuse]]
+            age[reuse] = self.track_age_[prev_idx[reuse]] + 1
+        if compute.any():
+            embs[compute] = self.recognizer.embed(frame, landmarks[compute])
+            age[compute] = 0
+            self.computed_ += int(compute.sum())
+
+        self.det_embs_, self.det_age_ = embs, age
+        return embs
+
+    def observe(self, tracks):
+        """ Binds the embeddings of this frame to track ids, BoxMOT Output: [x1, y1, x2, y2, id, conf, cls, ind] """
+        if len(tracks) == 0 or len(self.det_embs_) == 0:
+            self.track_ids_ = np.empty(0, dtype=np.int64)
+            self.track_boxes_ = np.empty((0, 4), dtype=float)
+            self.track_embs_ = np.empty((0, self.EMBEDDING_DIM), dtype=np.float32)
+            self.track_age_ = np.empty(0, dtype=np.intp)
+            return
+
+        det_ind = tracks[:, 7].astype(np.intp)
+        self.track_ids_ = tracks[:, 4].astype(np.int64)
+        self.track_boxes_ = tracks[:, :4].astype(float)
+        self.track_embs_ = self.det_embs_[det_ind]
+        self.track_age_ = self.det_age_[det_ind]
+
+    def embedding_for(self, track_id):
+        """ Current appearance embedding of a track, None if it has none (not confident enough yet) """
+        hit = np.flatnonzero(self.track_ids_ == track_id)
+        if len(hit) == 0 or self.track_age_[hit[0]] >= self.refresh_interval_:
+            return None
+        return self.track_embs_[hit[0]]
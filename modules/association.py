@@ -0,0 +1,105 @@
+# modules/association.py
+
+##################################### Imports #####################################
+# Libraries
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# Modules
+import config
+
+###################################################################################
+
+##################################################################################
+#                               Box Geometry
+##################################################################################
+
+def box_centers(boxes):
+    """ (N, 4+) boxes -> (N, 2) centers """
+    boxes = np.asarray(boxes, dtype=float)
+    return (boxes[:, 0:2] + boxes[:, 2:4]) * 0.5
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """ Pairwise IoU between (A, 4) and (B, 4) boxes, returns an (A, B) matrix """
+    a = np.asarray(boxes_a, dtype=float)[:, None, :4]
+    b = np.asarray(boxes_b, dtype=float)[None, :, :4]
+
+    ix1 = np.maximum(a[..., 0], b[..., 0])
+    iy1 = np.maximum(a[..., 1], b[..., 1])
+    ix2 = np.minimum(a[..., 2], b[..., 2])
+    iy2 = np.minimum(a[..., 3], b[..., 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def center_distance_matrix(boxes_a, boxes_b):
+    """ Pairwise euclidean distance (pixels) between box centers, (A, B) matrix """
+    ca = box_centers(boxes_a)
+    cb = box_centers(boxes_b)
+    return np.linalg.norm(ca[:, None, :] - cb[None, :, :], axis=2)
+
+
+##################################################################################
+#                               Track <-> Detection
+##################################################################################
+
+def associate(track_boxes, det_boxes, method=None):
+    """
+    One-to-one assignment of tracker boxes to raw detector boxes.
+    Returns det_idx: (T,) int array, det_idx[i] is the detection row of track i or -1 if unmatched.
+    method: "iou" (maximise overlap) or "center" (minimise center distance), defaults to config.
+    """
+    method = method or config.ASSOCIATION_METHOD
+    n_tracks, n_dets = len(track_boxes), len(det_boxes)
+    det_idx = np.full(n_tracks, -1, dtype=np.intp)
+
+    if n_tracks == 0 or n_dets == 0:
+        return det_idx
+
+    # Cost matrix + gate: pairs outside the gate can never be assigned
+    if method == "center":
+        cost = center_distance_matrix(track_boxes, det_boxes)
+        valid = cost <= config.ASSOCIATION_MAX_CENTER_DIST
+    else:
+        cost = -iou_matrix(track_boxes, det_boxes)
+        valid = -cost >= config.ASSOCIATION_MIN_IOU
+
+    # Trivial 1x1 case is the common one (single face in view), skip the solver
+    if n_tracks == 1 and n_dets == 1:
+        if valid[0, 0]:
+            det_idx[0] = 0
+        return det_idx
+
+    rows, cols = linear_sum_assignment(np.where(valid, cost, 1e6))
+    keep = valid[rows, cols]
+    det_idx[rows[keep]] = cols[keep]
+
+    return det_idx
+
+
+def gather_by_index(det_idx, landmarks, distances):
+    """
+    Picks the per-track sensor data out of the raw detector outputs.
+    Returns (T, 5, 2) landmarks and (T,) distances, NaN rows for unmatched tracks.
+    """
+    n_tracks = len(det_idx)
+    track_landmarks = np.full((n_tracks, 5, 2), np.nan, dtype=np.float32)
+    track_distances = np.full(n_tracks, np.nan, dtype=float)
+
+    matched = det_idx >= 0
+    if not matched.any():
+        return track_landmarks, track_distances
+
+    # Detector reports None for faces where the IPD math failed
+    dist_arr = np.array([np.nan if d is None else d for d in distances], dtype=float)
+
+    track_landmarks[matched] = np.asarray(landmarks, dtype=np.float32)[det_idx[matched]]
+    track_distances[matched] = dist_arr[det_idx[matched]]
+
+    return track_landmarks, track_distances
@@ -0,0 +1,160 @@
+# modules/autoscale.py
+
+##################################### Imports #####################################
+# Libraries
+import time
+import numpy as np
+
+# Modules
+import config
+from modules.utils import log
+from modules.detector import BaseDetector
+
+###################################################################################
+
+FACE_WIDTH_CM = 14.0 # Average face width, turns a calculate_distance() estimate back into pixels
+
+class AutoScaleDetector(BaseDetector):
+    """
+    Wraps a detector with set_input_size() (SCRFDDetector, ONNXSCRFDDetector) and picks the network input
+    resolution from a fixed ladder (config.DET_AUTOTUNE_SIZES, square, buffers prepared once per size):
+
+      needed  : smallest size at which the smallest tracked face still spans DET_MIN_FACE_INPUT_PX after
+                the letterbox. Face size = min(box short side, FACE_WIDTH_CM at the estimated distance)
+      budget  : the largest size whose measured latency (EMA of detect() ms) fits DET_LATENCY_BUDGET_MS
+
+    Bigger faces -> smaller input, at a fraction of the cost. Needing more resolution switches up at once,
+    switching down waits for the end of a DET_AUTOTUNE_WINDOW frame window so the size does not flap.
+    With no tracks, and on every DET_AUTOTUNE_PROBE_EVERY-th frame, the largest size within budget runs,
+    so new faces that are too small for the current size still get found.
+    """
+
+    def __init__(self, detector, sizes=config.DET_AUTOTUNE_SIZES, budget_ms=config.DET_LATENCY_BUDGET_MS,
+                 min_face_px=config.DET_MIN_FACE_INPUT_PX, window=config.DET_AUTOTUNE_WINDOW,
+                 probe_every=config.DET_AUTOTUNE_PROBE_EVERY):
+        if not hasattr(detector, "set_input_size"):
+            raise TypeError(f"{type(detector).__name__} has a fixed input size, autotuning needs set_input_size()")
+
+        self.detector = detector
+        self.all_sizes_ = self.sizes_ = sorted(sizes)
+        self.budget_ms_ = budget_ms
+        self.min_face_px_ = min_face_px
+        self.window_ = window
+        self.probe_every_ = probe_every
+        self.focal_length_ = getattr(detector, "focal_length", config.FOCAL_LENGTH)
+
+        self.latency_ = {}          # {size: EMA ms}, a size's first run (allocation, warm-up) is not counted
+        self.seen_ = set()
+        self.needed_ = None          # input size the smallest tracked face needs, None = nothing tracked
+        self.face_px_ = 0.0
+        self.window_needed_ = self.sizes_[0] # largest need inside the current window
+        self.frame_count_ = 0
+
+        self.current_ = None
+        self._switch(self.sizes_[-1], "start")
+        log(f"Detector autotuning over {self.sizes_}, budget {budget_ms:.0f} ms", "INFO")
+
+    def __str__(self):
+        return f"AutoScale({self.detector}, input {self.current_})"
+
+    ###################################################################################
+    #                                 HELPER METHODS
+    ###################################################################################
+
+    def _estimate_ms(self, size):
+        """ Measured EMA, or extrapolated by input area from the closest measured size """
+        if size in self.latency_:
+            return self.latency_[size]
+        if not self.latency_:
+            return 0.0
+        ref = min(self.latency_, key=lambda s: abs(s - size))
+        return self.latency_[ref] * (size / ref) ** 2
+
+    def _largest_in_budget(self):
+        fitting = [s for s in self.sizes_ if self._estimate_ms(s) <= self.budget_ms_]
+        return fitting[-1] if fitting else self.sizes_[0]
+
+    def _switch(self, size, reason):
+        if size == self.current_:
+            return
+        if self.current_ is not None:
+            log(f"Detector input {self.current_} -> {size} ({reason}; "
+                + ", ".join(f"{s}: {ms:.1f} ms" for s, ms in sorted(self.latency_.items())) + ")", "INFO")
+        self.detector.set_input_size((size, size))
+        self.current_ = size
+
+    ###################################################################################
+    #                                 MAIN LOGIC
+    ###################################################################################
+
+    def cap_input_size(self, size):
+        """ Load shedding: only ladder sizes up to size from now on (at least the smallest), None lifts the cap """
+        self.sizes_ = [s for s in self.all_sizes_ if size is None or s <= size] or self.all_sizes_[:1]
+        self.window_needed_ = min(self.window_needed_, self.sizes_[-1])
+        if self.current_ not in self.sizes_:
+            self._switch(self.sizes_[-1], f"capped at {size}")
+
+    def observe(self, boxes, distances, frame_shape):
+        """
+        Called with the tracked (N, 4) boxes and their distance estimates (cm, NaN = unknown) after tracking.
+        Works out the input size the smallest face needs at this frame size
+        """
+        if len(boxes) == 0:
+            self.needed_ = None
+            return
+
+        boxes = np.asarray(boxes, dtype=float)
+        face_px = np.minimum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]).min()
+        distances = np.asarray(distances, dtype=float)
+        if np.isfinite(distances).any():
+            face_px = min(face_px, FACE_WIDTH_CM * self.focal_length_ / np.nanmax(distances))
+
+        # Square input, letterbox scale = size / longer frame side
+        longer = max(frame_shape[:2])
+        needed = next((s for s in self.sizes_ if face_px * s / longer >= self.min_face_px_), self.sizes_[-1])
+        self.needed_ = needed
+        self.window_needed_ = max(self.window_needed_, needed)
+        self.face_px_ = face_px
+
+    def _choose(self):
+        """ (input size for the coming frame, reason for a switch, temporary: probe only, back to the current size afterwards) """
+        self.frame_count_ += 1
+        in_budget = self._largest_in_budget()
+
+        # Nothing tracked: look with the most resolution we can afford
+        if self.needed_ is None:
+            return in_budget, "no tracks", False
+
+        # Periodic probe so faces too small for the current size are still found
+        if self.frame_count_ % self.probe_every_ == 0:
+            return in_budget, None, True
+
+        target = min(self.needed_, in_budget)
+        reason = f"smallest face {self.face_px_:.0f} px" + ("" if target == self.needed_ else f", {self.needed_} over budget")
+        if target > self.current_:
+            return target, reason, False # faces shrank, do not wait for the window
+
+        if self.frame_count_ % self.window_ == 0:
+            target = min(self.window_needed_, in_budget)
+            self.window_needed_ = self.sizes_[0]
+            return target, reason, False
+        return self.current_, None, False
+
+    def detect(self, frame):
+        size, reason, temporary = self._choose()
+        if temporary:
+            self.detector.set_input_size((size, size))
+        else:
+            self._switch(size, reason)
+
+        start = time.perf_counter()
+        result = self.detector.detect(frame)
+        ms = (time.perf_counter() - start) * 1000.0
+
+        if size in self.seen_:
+            self.latency_[size] = 0.9 * self.latency_[size] + 0.1 * ms if size in self.latency_ else ms
+        self.seen_.add(size)
+
+        if temporary:
+            self.detector.set_input_size((self.current_, self.current_))
+        return result
@@ -3,6 +3,8 @@
 ##################################### Imports #####################################
 # Libraries
 import cv2
+import sys
+import time
 import threading
 
 # Modules
@@ -11,26 +13,68 @@ from modules.utils import log
 
 ###################################################################################
 
+BACKENDS = {
+    "any": cv2.CAP_ANY,
+    "msmf": cv2.CAP_MSMF,         # Windows Media Foundation, better USB bus handling than DirectShow
+    "dshow": cv2.CAP_DSHOW,
+    "v4l2": cv2.CAP_V4L2,         # Linux
+    "avfoundation": cv2.CAP_AVFOUNDATION, # macOS
+}
+
+def camera_backend(name=config.CAMERA_BACKEND):
+    """ config name -> cv2 API preference, "auto" picks the native one of this platform """
+    if name == "auto":
+        if sys.platform.startswith("win"):
+            name = "msmf"
+        elif sys.platform.startswith("linux"):
+            name = "v4l2"
+        elif sys.platform == "darwin":
+            name = "avfoundation"
+        else:
+            name = "any"
+    return BACKENDS[name]
+
+
 class CameraStream:
-    """ Handles visual stream from the webcam """
+    """
+    Handles visual stream from the webcam.
+    A background thread grab()s continuously, which keeps the driver queue drained so the newest frame
+    is always the next one. Only that thread touches the capture: read() flags that it wants a frame and
+    the thread retrieve()s (decodes the MJPG) right after its next grab, handing it over through a Condition.
+    Frames nobody asked for are never decoded, they are counted as dropped.
+    """
 
     def __init__(self, src=config.CAMERA_INDEX):
         """ Specs are hardcoded in config, constructor sets and tries the connection """
         self.src_ = src
         self.width_ = config.FRAME_WIDTH
         self.height_ = config.FRAME_HEIGHT
+        self.backend_ = camera_backend()
 
-        self.stream_ = cv2.VideoCapture(self.src_, cv2.CAP_MSMF) # init with better usb bus protocol
+        self.stream_ = cv2.VideoCapture(self.src_, self.backend_)
 
         self.stream_.set(cv2.CAP_PROP_FRAME_WIDTH, self.width_)
         self.stream_.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height_)
         self.stream_.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
-        
-        (self.grabbed_, self.frame_) = self.stream_.read()
-        
-        log("Camera initialized", "INFO")
-        
+        self.stream_.set(cv2.CAP_PROP_BUFFERSIZE, config.CAMERA_BUFFER_SIZE) # not every backend honors it, grabbing keeps it short anyway
+
+        self.ready_ = threading.Condition() # decoded frame hand-over, never held during grab() / retrieve()
+        self.decode_wanted_ = threading.Event() # read() is waiting, decode the next grabbed frame
+        self.grab_seq_ = 0      # frames grabbed so far
+        self.read_seq_ = 0      # grab_seq_ of the frame that was decoded last
+        self.grab_failures_ = 0
+        self.decoded_ = 0
+        self.decode_ms_ = 0.0   # total, for the mean in stats()
+
         self.stopped_ = False
+        self.thread_ = None
+
+        self.grabbed_ = self.stream_.grab()
+        self.grab_seq_ = int(self.grabbed_)
+        self.frame_ = None
+        self.read()
+
+        log(f"Camera initialized ({self.stream_.getBackendName() if self.stream_.isOpened() else 'not opened'})", "INFO")
 
     def __str__(self):
         """ Overwrites the print(class) behavior. """
@@ -39,23 +83,75 @@ class CameraStream:
 
     def start(self):
         """ Starts the async video stream """
-        threading.Thread(target=self.update, args=(), daemon=True).start()
+        self.thread_ = threading.Thread(target=self.update, args=(), name="CameraGrabber", daemon=True)
+        self.thread_.start()
         log("Video stream started", "INFO")
         return self
 
     def update(self):
-        """ Pulls the last frame from the feed """
-        while True:
-            if self.stopped_:
-                return
-            
-            (self.grabbed_, self.frame_) = self.stream_.read()
+        """ Grabs frames as fast as the camera delivers them, decodes one only when read() asked for it """
+        while not self.stopped_:
+            self.grabbed_ = self.stream_.grab()
+            if not self.grabbed_:
+                self.grab_failures_ += 1
+                time.sleep(0.01) # unplugged / not ready, do not spin
+                continue
 
-    def read(self):
-        """ To be populated, for now just grabs the frame """
-        return self.frame_
+            self.grab_seq_ += 1
+            if self.decode_wanted_.is_set():
+                self.decode_wanted_.clear()
+                self._retrieve()
+
+        with self.ready_:
+            self.ready_.notify_all() # nobody waits on a stopped stream
+
+    def _retrieve(self):
+        """ Decodes the last grabbed frame. Grab thread only, or the constructor before it starts """
+        start = time.perf_counter()
+        ok, frame = self.stream_.retrieve()
+        ms = (time.perf_counter() - start) * 1000.0
+
+        with self.ready_:
+            self.decode_ms_ += ms
+            if ok:
+                self.frame_ = frame
+                self.read_seq_ = self.grab_seq_
+                self.decoded_ += 1
+            self.ready_.notify_all()
+
+    def read(self, timeout=0.25):
+        """
+        Newest frame: waits (at most one frame period normally) for the grab thread to decode the next one.
+        The last frame again when nothing arrives within timeout (camera stalled or stopped)
+        """
+        if self.thread_ is None:
+            if self.grab_seq_ != self.read_seq_:
+                self._retrieve()
+            return self.frame_
+
+        with self.ready_:
+            seq = self.read_seq_
+            self.decode_wanted_.set()
+            self.ready_.wait_for(lambda: self.read_seq_ != seq or self.stopped_, timeout=timeout)
+            return self.frame_
+
+    def stats(self):
+        """ grabbed / decoded frame counts, frames grabbed but never decoded, mean decode ms, failed grabs """
+        return {
+            "grabbed": self.grab_seq_,
+            "decoded": self.decoded_,
+            "dropped": self.grab_seq_ - self.decoded_,
+            "decode_ms": self.decode_ms_ / self.decoded_ if self.decoded_ else 0.0,
+            "grab_failures": self.grab_failures_,
+        }
 
     def stop(self):
         """ Kills the async stream, detaching hardware """
-        self.stopped = True
-        self.stream_.release()
\ No newline at end of file
+        self.stopped_ = True
+        if self.thread_ is not None:
+            self.thread_.join(timeout=1.0) # no grab() may be running while the capture is released
+        self.stream_.release()
+
+        s = self.stats()
+        log(f"Camera stopped: {s['grabbed']} grabbed, {s['decoded']} decoded ({s['decode_ms']:.1f} ms each), "
+            f"{s['dropped']} dropped undecoded, {s['grab_failures']} failed grabs", "INFO")
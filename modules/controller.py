@@ -5,6 +5,7 @@
 from pycomm3 import LogixDriver
 
 # Modules
+import config
 from modules.utils import log
 
 ###################################################################################
@@ -14,6 +15,7 @@ class TurretController:
         self.is_sim = simulation
         self.connected = False
         self.deadzone = 0.05
+        self.still_frames = 0 # consecutive updates without a pan / tilt command, see is_still
         
         # 1. Use the IP and Tag names your colleagues define in Sysmac Studio
         self.PLC_IP = "192.168.0.10" 
@@ -29,6 +31,11 @@ class TurretController:
         else:
             self.connect_to_plc()
 
+    @property
+    def is_still(self):
+        """ True once the mount has had no motion command for config.CMC_STILL_FRAMES updates (servos settled) """
+        return self.still_frames >= config.CMC_STILL_FRAMES
+
     def connect_to_plc(self):
         """Initializes the EtherNet/IP Driver"""
         log(f"Initializing CIP Driver for Omron at {self.PLC_IP}...", "INFO")
@@ -46,6 +53,7 @@ class TurretController:
         # 1. Apply Deadzone
         if abs(pan_error) < self.deadzone: pan_error = 0
         if abs(tilt_error) < self.deadzone: tilt_error = 0
+        self.still_frames = self.still_frames + 1 if pan_error == 0 and tilt_error == 0 else 0
 
        # Omron NX1P2 handles 'REAL' (float) types natively. 
         # We don't even need to convert to INT unless your friends prefer it!
@@ -2,18 +2,20 @@
 
 ##################################### Imports #####################################
 # Libraries
-from ultralytics import YOLO
 from insightface.model_zoo import get_model
 
 from scipy.spatial import distance as dist
 
 import os
+import ast
+import cv2
 import numpy as np
 from abc import ABC, abstractmethod
 
 # Modules
 import config
 from modules.utils import log
+from modules.runtime import create_session, nms
 
 ###################################################################################
 
@@ -33,6 +35,8 @@ class BaseDetector(ABC):
 class YOLODetector(BaseDetector):
     def __init__(self, threshold=config.DET_CONF_THRESHOLD):
         """ Get the boxing model from local directory, move it to GPU if we can """
+        # Imported here so the ONNX detectors never pull torch / ultralytics into the process
+        from ultralytics import YOLO
 
         self.model_name_ = "yolov8n-face-lindevs.pt"
         model_path = os.path.join("assets", "models", self.model_name_)
@@ -71,11 +75,107 @@ class YOLODetector(BaseDetector):
         
         # Add a dummy class column (0 for face)
         # Result: [x1, y1, x2, y2, confidence, class_id]
-        detections = []
-        for box, conf in zip(boxes, confs):
-            detections.append([*box, conf, 0]) 
+        detections = np.zeros((len(boxes), 6))
+        detections[:, :4] = boxes
+        detections[:, 4] = confs
             
-        return np.array(detections)
+        return detections
+    
+    
+##################################################################################
+#                               YOLOv8-Lindevs DETECTOR (ONNX Runtime)
+##################################################################################
+
+class ONNXYOLODetector(BaseDetector):
+    """
+    yolov8n-face-lindevs exported to ONNX (see export_yolo_onnx.py) and run on the shared onnxruntime setup,
+    so neither torch nor ultralytics is imported. Letterbox, decoding and NMS are plain vectorized numpy.
+    Returns the same [x1, y1, x2, y2, conf, cls] rows as YOLODetector.
+    """
+
+    IOU_THRESH = 0.7    # ultralytics predict default
+    MAX_DET = 300
+    PAD_VALUE = 114     # ultralytics LetterBox gray
+
+    def __init__(self, threshold=config.DET_CONF_THRESHOLD):
+        self.model_name_ = "yolov8n-face-lindevs.onnx"
+        model_path = os.path.join("assets", "models", self.model_name_)
+        self.threshold_ = threshold
+
+        if not os.path.exists(model_path):
+            log(f"{self.model_name_} not found in assets. Run export_yolo_onnx.py first", "ERROR")
+            raise FileNotFoundError(model_path)
+
+        self.session = create_session(model_path)
+        model_input = self.session.get_inputs()[0]
+        self.input_name_ = model_input.name
+        self.output_names_ = [o.name for o in self.session.get_outputs()]
+
+        # Static export: (1, 3, H, W); fall back to 640 if the export was dynamic
+        in_h, in_w = [d if isinstance(d, int) else 640 for d in model_input.shape[2:]]
+        self.input_size_ = (in_w, in_h)
+
+        # Class count from the ultralytics export metadata, e.g. "{0: 'face'}", else from the (1, 4 + nc, anchors) output
+        try:
+            self.num_classes_ = max(1, len(ast.literal_eval(self.session.get_modelmeta().custom_metadata_map["names"])))
+        except (KeyError, ValueError, SyntaxError, TypeError):
+            channels = self.session.get_outputs()[0].shape[1]
+            self.num_classes_ = channels - 4 if isinstance(channels, int) and channels > 4 else 1
+
+        self.canvas_ = np.full((in_h, in_w, 3), self.PAD_VALUE, dtype=np.uint8)
+        self.blob_ = np.zeros((1, 3, in_h, in_w), dtype=np.float32)
+        self.frame_shape_ = None
+
+        log(f"YOLOv8 ONNX Detector initialized ({in_w}x{in_h}).", "INFO")
+
+    def __str__(self):
+        return f"ONNXYOLODetector(Model: {self.model_name_}), Conf_Threshold: %{self.threshold_ * 100}"
+
+    def _letterbox(self, frame):
+        """ Centered letterbox into the preallocated canvas (same geometry as ultralytics LetterBox) """
+        if frame.shape[:2] != self.frame_shape_:
+            in_w, in_h = self.input_size_
+            h, w = frame.shape[:2]
+            r = min(in_h / h, in_w / w)
+            new_w, new_h = int(round(w * r)), int(round(h * r))
+            left, top = int(round((in_w - new_w) / 2 - 0.1)), int(round((in_h - new_h) / 2 - 0.1))
+
+            self.scale_, self.pad_ = r, np.array([left, top, left, top], dtype=np.float32)
+            self.roi_ = (slice(top, top + new_h), slice(left, left + new_w))
+            self.new_size_ = (new_w, new_h)
+            self.canvas_[:] = self.PAD_VALUE
+            self.frame_shape_ = frame.shape[:2]
+
+        self.canvas_[self.roi_] = cv2.resize(frame, self.new_size_, interpolation=cv2.INTER_LINEAR)
+
+        # BGR HWC uint8 -> RGB CHW float [0, 1], written in place
+        np.multiply(self.canvas_.transpose(2, 0, 1)[::-1], 1.0 / 255.0, out=self.blob_[0], casting="unsafe")
+
+    def detect(self, frame):
+        """Pure detection: returns [ [x1, y1, x2, y2, conf, cls], ... ]"""
+        self._letterbox(frame)
+        preds = self.session.run(self.output_names_, {self.input_name_: self.blob_})[0][0] # (4 + nc, anchors)
+
+        class_scores = preds[4:4 + self.num_classes_]
+        confs = class_scores.max(axis=0)
+        keep = np.flatnonzero(confs > self.threshold_)
+        if len(keep) == 0:
+            return np.empty((0, 6))
+
+        # cx, cy, w, h (letterbox space) -> x1, y1, x2, y2 (frame space)
+        cx, cy, bw, bh = preds[:4, keep]
+        boxes = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+        boxes = (boxes - self.pad_) / self.scale_
+        h, w = self.frame_shape_
+        np.clip(boxes, 0, [w, h, w, h], out=boxes)
+
+        detections = np.zeros((len(keep), 6))
+        detections[:, :4] = boxes
+        detections[:, 4] = confs[keep]
+        detections[:, 5] = class_scores[:, keep].argmax(axis=0)
+
+        order = nms(detections, self.IOU_THRESH, offset=0.0)[:self.MAX_DET]
+        return detections[order]
     
     
 ##################################################################################
@@ -138,6 +238,10 @@ class SCRFDDetector(BaseDetector):
     def __str__(self):
         return f"SCRFD Detector (Model: {self.model_path}), Conf_Threshold: %{self.threshold_ * 100}"
 
+    def set_input_size(self, input_size):
+        """ (width, height) insightface letterboxes to from the next detect() on """
+        self.model.input_size = tuple(input_size)
+
     def calculate_distance(self, landmarks):
         """ Internal helper for IPD math, returns the calculated distance """
         if landmarks is None or len(landmarks) < 2:
@@ -173,4 +277,139 @@ class SCRFDDetector(BaseDetector):
         # Calculate distance for every detected face
         distances = [self.calculate_distance(k) for k in kpss]
         
-        return detections, kpss, distances
\ No newline at end of file
+        return detections, kpss, distances
+
+
+##################################################################################
+#                               SCRFD DETECTOR (Own ONNX Session)
+##################################################################################
+
+class ONNXSCRFDDetector(SCRFDDetector):
+    """
+    Same model and outputs as SCRFDDetector, but we own the onnxruntime session instead of going
+    through insightface's SCRFD.detect, which re-letterboxes into a new blob, rebuilds the anchor
+    grids and runs a Python NMS on every call.
+    Here the letterbox canvas and the input tensor are preallocated, anchor centers are cached per
+    input size, and box/keypoint decoding runs once over all strides.
+    """
+
+    STRIDES = (8, 16, 32)
+    NUM_ANCHORS = 2
+    NMS_THRESH = 0.4 # insightface default
+
+    def __init__(self, threshold=config.DET_CONF_THRESHOLD, input_size=(640, 640)):
+        self.model_path_ = os.path.join("assets", "models", "scrfd_10g_bnkps.onnx")
+        self.threshold_ = threshold
+
+        self.focal_length = config.FOCAL_LENGTH # calibration
+        self.real_ipd = 6.3 # Average human eye distance in cm
+
+        self.session = create_session(self.model_path_)
+        self.input_name_ = self.session.get_inputs()[0].name
+        self.output_names_ = [o.name for o in self.session.get_outputs()]
+
+        self.anchor_cache_ = {}     # {(in_h, in_w): (anchor_centers (A, 2), anchor_strides (A,))}
+        self.buffers_ = {}          # {(in_w, in_h): (letterbox canvas, input blob)}
+        self.frame_shape_ = None    # letterbox geometry is rebuilt only when the frame size changes
+        self.set_input_size(input_size)
+
+        log("SCRFD Detector (own ONNX session) initialized.", "INFO")
+
+    def set_input_size(self, input_size):
+        """
+        (width, height) of the network input. Canvas and blob are kept per size, so switching
+        back and forth (AutoScaleDetector) costs one dict lookup after the first time
+        """
+        input_size = tuple(input_size)
+        if input_size == getattr(self, "input_size_", None):
+            return
+
+        self.input_size_ = input_size
+        in_w, in_h = input_size
+        if input_size not in self.buffers_:
+            self.buffers_[input_size] = (np.zeros((in_h, in_w, 3), dtype=np.uint8), np.zeros((1, 3, in_h, in_w), dtype=np.float32))
+        self.canvas_, self.blob_ = self.buffers_[input_size]
+        self.frame_shape_ = None # letterbox geometry (and canvas padding) redone on the next frame
+        self._anchors(in_h, in_w)
+
+    def _anchors(self, in_h, in_w):
+        """ Anchor centers and their stride for every output row, all strides concatenated """
+        key = (in_h, in_w)
+        if key not in self.anchor_cache_:
+            centers, strides = [], []
+            for stride in self.STRIDES:
+                h, w = in_h // stride, in_w // stride
+                grid = np.stack(np.mgrid[:h, :w][::-1], axis=-1).astype(np.float32)
+                grid = (grid * stride).reshape(-1, 2)
+                grid = np.repeat(grid, self.NUM_ANCHORS, axis=0) # same order as np.stack([grid] * 2, axis=1)
+                centers.append(grid)
+                strides.append(np.full(len(grid), stride, dtype=np.float32))
+            self.anchor_cache_[key] = (np.concatenate(centers), np.concatenate(strides))
+        return self.anchor_cache_[key]
+
+    def _letterbox(self, frame):
+        """ Resizes into the top-left of the preallocated canvas, fills the preallocated blob """
+        if frame.shape[:2] != self.frame_shape_:
+            in_w, in_h = self.input_size_
+            h, w = frame.shape[:2]
+            im_ratio = h / w # same rounding as insightface so boxes match
+            if im_ratio > in_h / in_w:
+                new_h = in_h
+                new_w = int(new_h / im_ratio)
+            else:
+                new_w = in_w
+                new_h = int(new_w * im_ratio)
+            self.new_size_ = (new_w, new_h)
+            self.det_scale_ = new_h / h
+            self.canvas_[:] = 0
+            self.frame_shape_ = frame.shape[:2]
+
+        new_w, new_h = self.new_size_
+        self.canvas_[:new_h, :new_w] = cv2.resize(frame, (new_w, new_h))
+
+        # BGR HWC uint8 -> RGB CHW float, (x - 127.5) / 128, written in place
+        np.subtract(self.canvas_.transpose(2, 0, 1)[::-1], 127.5, out=self.blob_[0], casting="unsafe")
+        self.blob_ *= 1.0 / 128.0
+
+    def _decode(self, net_outs):
+        """ All strides at once -> (N, 5) [x1, y1, x2, y2, score] and (N, 5, 2) keypoints, NMS applied """
+        fmc = len(self.STRIDES)
+        scores = np.concatenate([net_outs[i].reshape(-1) for i in range(fmc)])
+        pos = np.flatnonzero(scores >= self.threshold_)
+        if len(pos) == 0:
+            return np.empty((0, 5), dtype=np.float32), np.empty((0, 5, 2), dtype=np.float32)
+
+        centers, strides = self._anchors(self.blob_.shape[2], self.blob_.shape[3])
+        bbox_preds = np.concatenate([net_outs[i + fmc].reshape(-1, 4) for i in range(fmc)])[pos]
+        kps_preds = np.concatenate([net_outs[i + 2 * fmc].reshape(-1, 10) for i in range(fmc)])[pos]
+
+        c, s = centers[pos], strides[pos, None]
+        bboxes = np.hstack([c - bbox_preds[:, :2] * s, c + bbox_preds[:, 2:] * s]) / self.det_scale_
+        kpss = (np.tile(c, 5) + kps_preds * s).reshape(-1, 5, 2) / self.det_scale_
+
+        dets = np.hstack([bboxes, scores[pos, None]]).astype(np.float32, copy=False)
+        keep = nms(dets, self.NMS_THRESH)
+        return dets[keep], kpss[keep].astype(np.float32, copy=False)
+
+    def detect(self, frame):
+        """
+        Returns: 
+        1. boxes: Nx6 numpy array
+        2. landmarks: Nx5x2 numpy array
+        3. distances
+        """
+        self._letterbox(frame)
+        net_outs = self.session.run(self.output_names_, {self.input_name_: self.blob_})
+        bboxes, kpss = self._decode(net_outs)
+
+        if len(bboxes) == 0:
+            return np.empty((0, 6)), np.empty((0, 5, 2)), []
+
+        # Format for Tracker (BoxMOT needs Nx6)
+        detections = np.zeros((bboxes.shape[0], 6))
+        detections[:, :5] = bboxes
+
+        # Calculate distance for every detected face
+        distances = [self.calculate_distance(k) for k in kpss]
+        
+        return detections, kpss, distances
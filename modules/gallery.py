@@ -0,0 +1,234 @@
+# modules/gallery.py
+
+##################################### Imports #####################################
+# Libraries
+import numpy as np
+
+###################################################################################
+
+STORAGES = ("float32", "float16", "pq")
+PQ_MIN_ROWS = 256 # one row per centroid of an 8-bit codebook at least, smaller galleries stay float16
+
+##################################################################################
+#                               Compaction
+##################################################################################
+
+def prune_identity(embeddings, max_similarity):
+    """
+    Indices of the samples worth keeping for one identity. Most central sample first, then every sample
+    whose cosine similarity to all kept ones stays below max_similarity; near-duplicate shots are dropped.
+    """
+    if len(embeddings) <= 1:
+        return np.arange(len(embeddings))
+
+    sims = embeddings @ embeddings.T
+    order = np.argsort(-sims.sum(axis=1)) # centrality: representative samples get kept first
+
+    keep = [order[0]]
+    for idx in order[1:]:
+        if sims[idx, keep].max() < max_similarity:
+            keep.append(idx)
+    return np.sort(np.array(keep))
+
+
+def compact_entries(names, embeddings, max_similarity):
+    """ Prunes every identity separately, returns the global indices that survive """
+    names = np.asarray(names)
+    keep = [np.flatnonzero(names == name)[prune_identity(embeddings[names == name], max_similarity)]
+            for name in dict.fromkeys(names.tolist())]
+    return np.sort(np.concatenate(keep)) if keep else np.empty(0, dtype=np.intp)
+
+
+##################################################################################
+#                               Product Quantization
+##################################################################################
+
+def _kmeans(x, k, iterations=25, seed=0):
+    """ Plain Lloyd k-means, (n, d) -> (k, d) centroids. k is capped at n """
+    rng = np.random.default_rng(seed)
+    k = min(k, len(x))
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+
+    for _ in range(iterations):
+        d = (x * x).sum(1)[:, None] - 2 * x @ centroids.T + (centroids * centroids).sum(1)[None]
+        assign = d.argmin(axis=1)
+
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        counts = np.bincount(assign, minlength=k)
+        filled = counts > 0 # empty clusters keep their old centroid
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+class ProductQuantizer:
+    """
+    Splits the 512-d embedding into `subspaces` chunks and stores each chunk as a uint8 index into
+    its own codebook (64 bytes per face instead of 2048). Queries are scored with asymmetric distance:
+    the query stays exact, one (subspaces, 256) inner-product table per query, then table lookups.
+    """
+
+    def __init__(self, subspaces=64, bits=8):
+        self.subspaces_ = subspaces
+        self.k_ = 1 << bits
+        self.codebooks_ = None # (subspaces, k, sub_dim)
+
+    def fit(self, x):
+        n, dim = x.shape
+        if dim % self.subspaces_:
+            raise ValueError(f"{dim}-d vectors do not split into {self.subspaces_} subspaces")
+        if n < self.k_:
+            # Fewer rows than centroids: codebooks outweigh the float32 data and only reproduce the rows they saw
+            raise ValueError(f"PQ needs at least {self.k_} rows to fit its codebooks, got {n}")
+        sub = x.reshape(n, self.subspaces_, -1)
+
+        self.codebooks_ = np.stack([_kmeans(sub[:, m], self.k_) for m in range(self.subspaces_)]).astype(np.float32)
+        return self
+
+    def encode(self, x):
+        sub = x.reshape(len(x), self.subspaces_, -1)
+        codes = np.empty((len(x), self.subspaces_), dtype=np.uint8)
+        for m, book in enumerate(self.codebooks_):
+            # Nearest centroid, ||x||^2 is the same for every centroid so it is left out
+            d = (book * book).sum(axis=1)[None] - 2.0 * sub[:, m] @ book.T
+            codes[:, m] = d.argmin(axis=1)
+        return codes
+
+    def inner_products(self, queries, codes):
+        """ (Q, dim) exact queries x (M, subspaces) codes -> (Q, M) approximate inner products """
+        sub_q = queries.reshape(len(queries), self.subspaces_, -1)
+        tables = np.einsum("qmd,mkd->qmk", sub_q, self.codebooks_).reshape(len(queries), -1) # (Q, subspaces * k)
+
+        # Code of subspace m points into the m-th block of the flattened table
+        lookup = codes.astype(np.intp) + np.arange(self.subspaces_) * self.codebooks_.shape[1]
+        return np.take(tables, lookup, axis=1).sum(axis=2)
+
+
+##################################################################################
+#                               Gallery
+##################################################################################
+
+class Gallery:
+    """
+    Enrolled identities as one searchable matrix. distances() returns cosine distances (1 - similarity)
+    for a whole query batch at once, whatever the storage:
+      float32: exact, 2048 bytes per face
+      float16: half the memory / disk, upcast on the fly
+      pq     : ProductQuantizer codes, 64 bytes per face, approximate
+    sources: every enrollment origin the gallery accounts for. A compacted gallery keeps fewer rows than
+    it was built from, sources tells the pruned shots apart from enrollments it has never seen.
+    """
+
+    def __init__(self, names, origins, embeddings, storage="float32", pq_subspaces=64, sources=None):
+        if storage not in STORAGES:
+            raise ValueError(f"Unknown gallery storage '{storage}', use one of {STORAGES}")
+
+        self.names = list(names)
+        self.origins = list(origins)
+        self.sources = list(self.origins if sources is None else sources)
+        self.storage = storage
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2: # (0, 512) of an empty gallery cannot be reshaped with -1
+            embeddings = embeddings.reshape(len(self.names), -1)
+
+        self.pq_ = None
+        if storage == "pq" and len(embeddings):
+            self.pq_ = ProductQuantizer(pq_subspaces).fit(embeddings)
+            self.data_ = self.pq_.encode(embeddings)
+        elif storage == "float16":
+            self.data_ = embeddings.astype(np.float16)
+        else:
+            self.data_ = embeddings
+
+    @classmethod
+    def from_entries(cls, entries, storage="float32", **kwargs):
+        """ face_embeddings.py pickle entries ({"name", "embedding", "origin"}) -> Gallery """
+        embeddings = np.stack([e["embedding"].flatten() for e in entries]) if entries else np.empty((0, 512))
+        return cls([e["name"] for e in entries], [e["origin"] for e in entries], embeddings, storage, **kwargs)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def nbytes(self):
+        extra = self.pq_.codebooks_.nbytes if self.pq_ is not None else 0
+        return self.data_.nbytes + extra
+
+    def distances(self, queries):
+        """ (Q, 512) unit queries -> (Q, M) cosine distances """
+        queries = np.asarray(queries, dtype=np.float32)
+        if len(self) == 0:
+            return np.empty((len(queries), 0), dtype=np.float32)
+        if self.pq_ is not None:
+            return 1.0 - self.pq_.inner_products(queries, self.data_)
+        return 1.0 - queries @ self.data_.T.astype(np.float32, copy=False)
+
+    def save(self, path):
+        """ Compact on-disk form (.npz), what compact_gallery.py writes and the recognizer prefers over the pickle """
+        codebooks = self.pq_.codebooks_ if self.pq_ is not None else np.empty(0, dtype=np.float32)
+        np.savez(path, names=np.array(self.names), origins=np.array(self.origins), sources=np.array(self.sources),
+                 storage=self.storage, data=self.data_, codebooks=codebooks)
+
+    @classmethod
+    def load(cls, path):
+        """ sources is None for files written before it was recorded """
+        with np.load(path) as f:
+            out = cls.__new__(cls)
+            out.names, out.origins = f["names"].tolist(), f["origins"].tolist()
+            out.sources = f["sources"].tolist() if "sources" in f.files else None
+            out.storage, out.data_ = str(f["storage"]), f["data"]
+            out.pq_ = None
+            if out.storage == "pq":
+                out.pq_ = ProductQuantizer(subspaces=f["codebooks"].shape[0])
+                out.pq_.codebooks_ = f["codebooks"]
+        return out
+
+    def extended(self, other):
+        """ New Gallery with other's float32 rows appended in self's storage (copy-on-write, self is left untouched) """
+        if self.pq_ is not None:
+            raise ValueError("PQ galleries are rebuilt, not extended: codebooks fit without the new rows encode them too coarsely")
+        out = Gallery.__new__(Gallery)
+        out.names, out.origins = self.names + other.names, self.origins + other.origins
+        out.sources = self.sources + other.origins
+        out.storage, out.pq_ = self.storage, None
+        out.data_ = np.concatenate([self.data_, other.data_.astype(self.data_.dtype)])
+        return out
+
+    def subset(self, indices):
+        """ Gallery of the given rows, same storage (PQ keeps the codebooks, codes are just sliced) """
+        out = Gallery.__new__(Gallery)
+        out.names = [self.names[i] for i in indices]
+        out.origins = [self.origins[i] for i in indices]
+        out.sources = self.sources
+        out.storage, out.pq_, out.data_ = self.storage, self.pq_, self.data_[indices]
+        return out
+
+    def same_content(self, other):
+        """ Same rows in the same storage, a reload that changes nothing is not a new gallery """
+        return (self.origins == other.origins and self.storage == other.storage
+                and self.data_.shape == other.data_.shape and np.array_equal(self.data_, other.data_))
+
+
+def merge_compact(compact, entries):
+    """
+    The compact gallery brought up to date with the enrollment pickle entries: rows whose enrollment was deleted
+    are dropped, enrollments made after compaction are appended. PQ is refit over the merged rows (the pickle
+    keeps every float32 embedding); below PQ_MIN_ROWS the merged gallery is float16
+    """
+    present = {entry["origin"] for entry in entries}
+    if not present.issuperset(compact.origins):
+        compact = compact.subset([i for i, origin in enumerate(compact.origins) if origin in present])
+
+    known = set(compact.sources)
+    new_entries = [entry for entry in entries if entry["origin"] not in known]
+    if not new_entries:
+        return compact
+    if compact.storage != "pq":
+        return compact.extended(Gallery.from_entries(new_entries))
+
+    by_origin = {entry["origin"]: entry for entry in entries}
+    merged = [by_origin[origin] for origin in compact.origins] + new_entries
+    storage = "pq" if len(merged) >= PQ_MIN_ROWS else "float16"
+    subspaces = compact.pq_.subspaces_ if compact.pq_ is not None else 64
+    return Gallery.from_entries(merged, storage, pq_subspaces=subspaces,
+                                sources=compact.sources + [entry["origin"] for entry in new_entries])
@@ -0,0 +1,83 @@
+# modules/identity_memory.py
+
+##################################### Imports #####################################
+# Libraries
+import numpy as np
+
+# Modules
+import config
+
+###################################################################################
+
+class IdentityMemory:
+    """
+    Short-lived memory of recently purged tracks (name, last recognition time, position, embedding).
+    When the tracker drops a face for a moment and hands out a new track_id, the new track can
+    inherit the old identity here instead of paying for alignment + ArcFace + gallery search again.
+    Fixed-size ring of rows, oldest entries get overwritten.
+    """
+
+    def __init__(self, capacity=config.ID_MEMORY_SIZE, ttl=config.ID_MEMORY_TTL,
+                 radius=config.ID_MEMORY_RADIUS, max_emb_dist=config.ID_MEMORY_MAX_EMB_DIST, dim=512):
+        self.ttl_ = ttl                     # seconds an entry stays claimable
+        self.radius_ = radius               # pixels between the lost center and the new center
+        self.max_emb_dist_ = max_emb_dist   # cosine distance gate when both sides have an embedding
+
+        self.names = np.full(capacity, None, dtype=object)
+        self.last_auth = np.zeros(capacity, dtype=float)
+        self.centers = np.zeros((capacity, 2), dtype=float)
+        self.embeddings = np.zeros((capacity, dim), dtype=np.float32)
+        self.has_embedding = np.zeros(capacity, dtype=bool)
+        self.lost_at = np.full(capacity, -np.inf)   # -inf = empty row
+        self.head_ = 0
+
+    def remember(self, name, last_auth, center, embedding, timestamp):
+        """ Stores a purged track, embedding may be None """
+        row = self.head_
+        self.head_ = (self.head_ + 1) % len(self.names)
+
+        self.names[row] = name
+        self.last_auth[row] = last_auth
+        self.centers[row] = center
+        self.has_embedding[row] = embedding is not None
+        if embedding is not None:
+            self.embeddings[row] = embedding
+        self.lost_at[row] = timestamp
+
+    def recall(self, center, embedding, timestamp):
+        """
+        Looks for a recently lost identity near center. Returns (name, last_auth, embedding or None) and
+        consumes the entry so two new tracks can never inherit the same identity, or None if nothing matches.
+        """
+        candidates = (timestamp - self.lost_at) <= self.ttl_
+        if not candidates.any():
+            return None
+
+        spatial = np.linalg.norm(self.centers - np.asarray(center, dtype=float), axis=1)
+        candidates &= spatial <= self.radius_
+
+        if embedding is not None:
+            # Appearance available: an entry with an embedding must also look like this face
+            emb_dist = 1.0 - self.embeddings @ np.asarray(embedding, dtype=np.float32)
+            candidates &= ~self.has_embedding | (emb_dist <= self.max_emb_dist_)
+            score = np.where(self.has_embedding, emb_dist, 1.0) + spatial / max(self.radius_, 1.0)
+        else:
+            # Position only: refuse to guess when two lost faces are equally plausible
+            if candidates.sum() > 1:
+                return None
+            score = spatial
+
+        if not candidates.any():
+            return None
+
+        row = int(np.argmin(np.where(candidates, score, np.inf)))
+        hit = (self.names[row], float(self.last_auth[row]),
+               self.embeddings[row].copy() if self.has_embedding[row] else None)
+
+        self.lost_at[row] = -np.inf
+        return hit
+
+    def clear(self):
+        self.names[:] = None
+        self.has_embedding[:] = False
+        self.lost_at[:] = -np.inf
@@ -0,0 +1,293 @@
+# modules/inference_pool.py
+
+##################################### Imports #####################################
+# Libraries
+import os
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from collections import deque
+import numpy as np
+
+# Modules
+import config
+from modules.utils import log
+from modules.detector import BaseDetector, ONNXSCRFDDetector
+
+###################################################################################
+
+# Task kinds
+DETECT = 0
+EMBED = 1
+
+READY = -1 # job id of the worker start-up handshake
+
+##################################################################################
+#                               Shared-Memory Ring
+##################################################################################
+
+class SharedRing:
+    """
+    Fixed number of equally sized slots in one multiprocessing.shared_memory block.
+    Frames / face batches are copied in once by the parent and read in place by the workers,
+    only (slot, shape) crosses the queue instead of a pickled ndarray.
+    """
+
+    def __init__(self, slots, slot_shape, dtype=np.uint8, name=None):
+        self.slots_ = slots
+        self.dtype_ = np.dtype(dtype)
+        self.slot_size_ = int(np.prod(slot_shape))
+        nbytes = slots * self.slot_size_ * self.dtype_.itemsize
+
+        self.owner_ = name is None
+        self.shm_ = shared_memory.SharedMemory(name=name, create=self.owner_, size=nbytes)
+        self.buffer_ = np.ndarray((slots, self.slot_size_), dtype=self.dtype_, buffer=self.shm_.buf)
+
+    @property
+    def spec(self):
+        """ What a worker needs to attach: (slots, slot_shape, dtype, name) """
+        return self.slots_, (self.slot_size_,), self.dtype_.str, self.shm_.name
+
+    @classmethod
+    def attach(cls, slots, slot_shape, dtype, name):
+        return cls(slots, slot_shape, dtype, name)
+
+    def view(self, slot, shape):
+        """ Slot contents as an array of the given shape (must fit in the slot) """
+        return self.buffer_[slot, :int(np.prod(shape))].reshape(shape)
+
+    def write(self, slot, array):
+        if array.size > self.slot_size_:
+            raise ValueError(f"Array of {array.size} elements does not fit a {self.slot_size_} element slot")
+        self.view(slot, array.shape)[...] = array
+
+    def close(self):
+        self.buffer_ = None
+        self.shm_.close()
+        if self.owner_:
+            self.shm_.unlink()
+
+
+##################################################################################
+#                               Compact Results
+##################################################################################
+
+def pack_detections(detections, landmarks, distances):
+    """ SCRFD outputs -> one (N, 16) float32 array: x1, y1, x2, y2, score, 10 landmark coords, distance (NaN = None) """
+    packed = np.empty((len(detections), 16), dtype=np.float32)
+    packed[:, :5] = detections[:, :5]
+    packed[:, 5:15] = np.asarray(landmarks).reshape(-1, 10)
+    packed[:, 15] = [np.nan if d is None else d for d in distances]
+    return packed
+
+
+def unpack_detections(packed):
+    """ Inverse of pack_detections, same (Nx6, Nx5x2, distances) shapes as the detectors return """
+    detections = np.zeros((len(packed), 6))
+    detections[:, :5] = packed[:, :5]
+    landmarks = packed[:, 5:15].reshape(-1, 5, 2)
+    distances = [None if np.isnan(d) else float(d) for d in packed[:, 15]]
+    return detections, landmarks, distances
+
+
+##################################################################################
+#                               Worker Process
+##################################################################################
+
+def _worker_main(frame_spec, face_spec, tasks, results, detector_cls, threads):
+    """ Owns one detector + one ArcFace session, serves tasks until it gets None """
+    config.ORT_INTRA_OP_THREADS = threads # set before any session exists in this process
+    config.GALLERY_WATCH_INTERVAL = 0     # workers only embed, the parent owns the gallery
+    from modules.recognizer import TurretRecognizer
+
+    try:
+        rings = {DETECT: SharedRing.attach(*frame_spec), EMBED: SharedRing.attach(*face_spec)}
+        detector = detector_cls()
+    except Exception as e:
+        results.put((READY, RuntimeError(f"worker {os.getpid()}: {e}")))
+        return
+    recognizer = None # loaded on the first EMBED task, detection-only pools never pay for it
+
+    results.put((READY, os.getpid()))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        job_id, kind, slot, shape, spec = task
+        try:
+            # The parent reallocated this ring (bigger frames), switch over
+            if rings[kind].shm_.name != spec[3]:
+                rings[kind].close()
+                rings[kind] = SharedRing.attach(*spec)
+
+            if kind == DETECT:
+                out = pack_detections(*detector.detect(rings[kind].view(slot, shape)))
+            else:
+                if recognizer is None:
+                    recognizer = TurretRecognizer()
+                out = recognizer.embed_aligned(rings[kind].view(slot, shape)).astype(np.float32, copy=False)
+            results.put((job_id, out))
+        except Exception as e:
+            results.put((job_id, RuntimeError(f"worker {os.getpid()}: {e}")))
+
+    for ring in rings.values():
+        ring.close()
+
+
+##################################################################################
+#                               Pool
+##################################################################################
+
+class InferencePool:
+    """
+    Process-pool backend for CPU-only nodes. Each worker runs its own detector and ArcFace session,
+    so the Python pre/post-processing around ONNX runs in parallel instead of behind one GIL.
+    Frames and aligned-face batches travel through SharedRing slots, results come back as small arrays.
+
+    submit_detect / submit_embed + result() pipeline several jobs (throughput),
+    detect / embed are the blocking drop-in versions. embed splits batches bigger than max_faces,
+    a frame bigger than the frame slots (camera ignored the configured size) reallocates the frame ring.
+    """
+
+    def __init__(self, workers=config.INFERENCE_WORKERS, frame_shape=(config.FRAME_HEIGHT, config.FRAME_WIDTH, 3),
+                 max_faces=16, slots=None, detector_cls=ONNXSCRFDDetector):
+        self.workers_ = max(1, workers)
+        slots = slots or 2 * self.workers_
+        self.slots_ = slots
+        self.max_faces_ = max_faces
+
+        self.frames_ = SharedRing(slots, frame_shape)
+        self.faces_ = SharedRing(slots, (max_faces, 112, 112, 3))
+        self.free_ = {DETECT: deque(range(slots)), EMBED: deque(range(slots))}
+
+        self.jobs_ = {}   # job id -> (kind, slot) while in flight
+        self.done_ = {}   # job id -> (kind, result), finished but not collected yet
+        self.next_job_ = 0
+
+        # spawn: workers must not inherit the parent's Qt / CUDA / camera state
+        ctx = mp.get_context("spawn")
+        self.tasks_ = ctx.Queue()
+        self.results_ = ctx.Queue()
+
+        # Split the cores between workers instead of every session grabbing all of them
+        threads = max(1, (os.cpu_count() or 1) // self.workers_)
+        self.procs_ = [ctx.Process(target=_worker_main, daemon=True,
+                                   args=(self.frames_.spec, self.faces_.spec, self.tasks_, self.results_, detector_cls, threads))
+                       for _ in range(self.workers_)]
+        for proc in self.procs_:
+            proc.start()
+
+        for _ in self.procs_:
+            _, payload = self._next_result()
+            if isinstance(payload, Exception):
+                self.close()
+                raise payload
+
+        log(f"InferencePool ready: {self.workers_} workers x {threads} threads, {slots} slots", "INFO")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _next_result(self):
+        """ Blocking results_.get() that notices a dead worker instead of waiting forever """
+        while True:
+            try:
+                return self.results_.get(timeout=1.0)
+            except queue.Empty:
+                dead = [proc.exitcode for proc in self.procs_ if not proc.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Inference worker exited (code {dead[0]})")
+
+    def _collect_one(self):
+        """ Blocks for the next finished job and gives its slot back """
+        job_id, payload = self._next_result()
+        kind, slot = self.jobs_.pop(job_id)
+        self.free_[kind].append(slot)
+        self.done_[job_id] = (kind, payload)
+
+    def _submit(self, kind, ring, array):
+        # Every slot in flight: wait for a result to free one
+        while not self.free_[kind]:
+            self._collect_one()
+
+        slot = self.free_[kind].popleft()
+        ring.write(slot, array)
+
+        job_id = self.next_job_
+        self.next_job_ += 1
+        self.jobs_[job_id] = (kind, slot)
+        self.tasks_.put((job_id, kind, slot, array.shape, ring.spec))
+        return job_id
+
+    def _grow_frames(self, shape):
+        """ New frame ring sized for shape, once no detection reads the old one any more """
+        while len(self.free_[DETECT]) < self.slots_:
+            self._collect_one()
+
+        log(f"InferencePool: {shape[1]}x{shape[0]} frames do not fit the frame slots, reallocating", "WARNING")
+        self.frames_.close()
+        self.frames_ = SharedRing(self.slots_, shape)
+
+    def submit_detect(self, frame):
+        """ Queues one frame for detection, returns a job id for result() """
+        if frame.size > self.frames_.slot_size_:
+            self._grow_frames(frame.shape)
+        return self._submit(DETECT, self.frames_, frame)
+
+    def submit_embed(self, faces):
+        """ Queues an (N <= max_faces, 112, 112, 3) aligned-face batch for ArcFace, returns a job id for result() """
+        return self._submit(EMBED, self.faces_, faces)
+
+    def result(self, job_id):
+        """ Blocks until job_id is done. Detection -> (Nx6, Nx5x2, distances), embedding -> (N, 512) """
+        while job_id not in self.done_:
+            self._collect_one()
+
+        kind, payload = self.done_.pop(job_id)
+        if isinstance(payload, Exception):
+            raise payload
+        return unpack_detections(payload) if kind == DETECT else payload
+
+    def detect(self, frame):
+        return self.result(self.submit_detect(frame))
+
+    def embed(self, faces):
+        """ Any batch size: chunks of max_faces, spread over the workers and joined in order """
+        if len(faces) == 0:
+            return np.empty((0, 512), dtype=np.float32)
+        jobs = [self.submit_embed(faces[i:i + self.max_faces_]) for i in range(0, len(faces), self.max_faces_)]
+        return np.concatenate([self.result(job) for job in jobs])
+
+    def close(self):
+        if self.procs_ is None:
+            return
+
+        for _ in self.procs_:
+            self.tasks_.put(None)
+        for proc in self.procs_:
+            proc.join(timeout=5.0)
+            if proc.is_alive():
+                proc.terminate()
+
+        self.frames_.close()
+        self.faces_.close()
+        self.procs_ = None
+        log("InferencePool closed", "INFO")
+
+
+class PooledDetector(BaseDetector):
+    """ BaseDetector facade over an InferencePool, so the VisionWorker loop does not change """
+
+    def __init__(self, pool):
+        self.pool_ = pool
+
+    def __str__(self):
+        return f"PooledDetector({self.pool_.workers_} workers)"
+
+    def detect(self, frame):
+        return self.pool_.detect(frame)
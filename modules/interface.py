@@ -13,10 +13,28 @@ import cv2
 
 # Modules
 import config
-from modules.utils import log, opencv_to_qpixmap
+from modules.utils import log
 
 ###################################################################################
 
+def opencv_to_qpixmap(frame, width, height):
+    """
+    Utility to convert CV2 BGR images to QPixmap.
+    """
+    if frame is None or frame.size == 0:
+        return QPixmap()
+
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    h, w, ch = rgb.shape
+    
+    qt_img = QImage(rgb.data, w, h, ch * w, QImage.Format.Format_RGB888).copy()
+    
+    return QPixmap.fromImage(qt_img).scaled(
+        width, height, 
+        Qt.AspectRatioMode.KeepAspectRatio,
+        Qt.TransformationMode.SmoothTransformation
+    )
+
 
 class SentryHUD(QMainWindow):
     def __init__(self, worker_ref):
@@ -58,6 +76,7 @@ class SentryHUD(QMainWindow):
         self.history_list = QTextEdit()
         self.history_list.setReadOnly(True)
         self.history_list.setStyleSheet("background-color: #111; color: #00FF00; font-family: Consolas;")
+        self.history_list.document().setMaximumBlockCount(config.HUD_HISTORY_MAX_LINES) # oldest lines drop, no growth over long runs
         
         self.left_col.addWidget(self.history_label)
         self.left_col.addWidget(self.history_list)
@@ -90,13 +109,16 @@ class SentryHUD(QMainWindow):
         self.nav_btn_layout = QHBoxLayout()
         self.back_btn = QPushButton("<<")
         self.next_btn = QPushButton(">>")
+        self.profile_btn = QPushButton("PROFILE") # Switch between PROFILE and STOP PROFILE
         
         self.back_btn.setFixedSize(60, 40)
         self.next_btn.setFixedSize(60, 40)
+        self.profile_btn.setFixedHeight(40)
         self.nav_btn_layout.addStretch()
         self.nav_btn_layout.addWidget(self.back_btn)
         self.nav_btn_layout.addWidget(self.next_btn)
         self.nav_btn_layout.addStretch()
+        self.nav_btn_layout.addWidget(self.profile_btn)
 
         # Combine Rows into the Wrapper
         self.controls_wrapper.addLayout(self.primary_btn_layout)
@@ -129,6 +151,7 @@ class SentryHUD(QMainWindow):
         self.back_btn.clicked.connect(self.handle_prev_target)
         self.release_btn.clicked.connect(self.handle_lock_toggle)
         self.fire_btn.clicked.connect(self.handle_fire)
+        self.profile_btn.clicked.connect(self.handle_profile)
 
     def handle_stop(self):
         """ Stops the AI part, enabling us to see the camera unaltered (mostly for fps comparison) """
@@ -188,6 +211,17 @@ class SentryHUD(QMainWindow):
         else:
             self.history_list.append("<b style='color:red;'>[ACTION REJECTED] WEAPON SYSTEMS OFFLINE </b>")
     
+    def handle_profile(self):
+        """ Samples the worker for config.PROFILE_SECONDS (flame graph + per-stage counts), a second press ends it early """
+        is_profiling = self.worker.toggle_profiler() # Worker logic
+
+        if is_profiling:
+            self.profile_btn.setText("STOP PROFILE")
+            self.history_list.append(f"<font color='magenta'>[PROFILER] Sampling for {config.PROFILE_SECONDS:.0f}s -> {config.PROFILE_DIR}/</font>")
+        else:
+            self.profile_btn.setText("PROFILE")
+            self.history_list.append("<font color='magenta'>[PROFILER] Capture written</font>")
+
     ###################################################################################
     #                                 UI UPDATES
     ###################################################################################
@@ -204,18 +238,24 @@ class SentryHUD(QMainWindow):
     def update_displays(self, main_frame, image_package, data_package):
         """
         The main function, changes the screen depending on the incoming data
-        main_frame : CameraStream frame with cv2 drawings
+        main_frame : CameraStream frame, never drawn on
         image_package : two np.arrays representing the crop and alignment
-        data_package: a dictionary and a float, representing events and fps
+        data_package: events, fps and the frame's Overlay display list
         """ 
 
         # 0. Extract data
         detection_crop, retina_align = image_package[0], image_package[1]
-        logs, fps_val = data_package[0], data_package[1]
+        logs, fps_val, overlay = data_package[0], data_package[1], data_package[2]
+
+        # Timed profiler capture ran out on its own
+        if self.profile_btn.text() != "PROFILE" and not self.worker.profiling:
+            self.profile_btn.setText("PROFILE")
+            self.history_list.append("<font color='magenta'>[PROFILER] Capture written</font>")
 
-        # 1. Update the Live Main Feed
-        cv2.putText(main_frame, f"FPS: {fps_val}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 2)
-        self.video_label.setPixmap(opencv_to_qpixmap(main_frame, self.video_label.width(), self.video_label.height())) 
+        # 1. Update the Live Main Feed, HUD composited onto the display-sized copy
+        overlay.text(f"FPS: {fps_val}", (10, 40), (0, 255, 0), 1.2, 2)
+        width, height = self.video_label.width(), self.video_label.height()
+        self.video_label.setPixmap(opencv_to_qpixmap(overlay.render(main_frame, width, height), width, height))
 
         # 2. Event Parsing
         for event in logs:
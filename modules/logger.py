@@ -0,0 +1,139 @@
+# modules/logger.py
+
+##################################### Imports #####################################
+# Libraries
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+
+# Modules
+import config
+
+###################################################################################
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+class AsyncLogger:
+    """
+    Queue-backed logger. The calling thread checks the level and enqueues one tuple,
+    a background thread does the formatting (including lazy %-args), rate limiting and all I/O.
+
+    Rate limiting is per (level, message template): at most `burst` lines per `window` seconds,
+    the rest are counted and summarized once the window rolls over. Use lazy args
+    (log("ID %s lost", "DEBUG", tid)) so repeats share a template and never get formatted when filtered.
+    """
+
+    def __init__(self, level=config.LOG_LEVEL, jsonl_path=config.LOG_JSONL, burst=config.LOG_RATE_BURST,
+                 window=config.LOG_RATE_WINDOW, stream=None):
+        self.min_level_ = LEVELS.get(level, 20)
+        self.burst_ = burst
+        self.window_ = window
+        self.stream_ = stream # None: whatever sys.stdout is at write time, like print()
+        self.jsonl_ = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+
+        self.queue_ = queue.SimpleQueue()
+        self.windows_ = {} # (level, template) -> [window start, count]
+        self.closed_ = False
+
+        self.thread_ = threading.Thread(target=self._run, name="AsyncLogger", daemon=True)
+        self.thread_.start()
+        atexit.register(self.close)
+
+    def set_level(self, level):
+        self.min_level_ = LEVELS[level]
+
+    def enabled(self, level):
+        return LEVELS.get(level, 20) >= self.min_level_
+
+    ###################################################################################
+    #                                 HOT PATH
+    ###################################################################################
+
+    def log(self, message, level="INFO", args=()):
+        if LEVELS.get(level, 20) < self.min_level_:
+            return
+        if self.closed_:
+            self._emit(time.time(), level, message, args, threading.current_thread().name) # late messages, write inline
+            return
+        self.queue_.put((time.time(), level, message, args, threading.current_thread().name))
+
+    ###################################################################################
+    #                                 BACKGROUND THREAD
+    ###################################################################################
+
+    def _allow(self, stamp, level, template):
+        """ Rate limit check, returns (allowed, suppressed count to report) """
+        key = (level, template)
+        window = self.windows_.get(key)
+
+        # f-string messages make a new template every time, forget the expired ones now and then
+        if window is None and len(self.windows_) > 1024:
+            self.windows_ = {k: w for k, w in self.windows_.items() if stamp - w[0] < self.window_}
+
+        if window is None or stamp - window[0] >= self.window_:
+            suppressed = window[1] - self.burst_ if window is not None and window[1] > self.burst_ else 0
+            self.windows_[key] = [stamp, 1]
+            return True, suppressed
+
+        window[1] += 1
+        return window[1] <= self.burst_, 0
+
+    def _stream(self):
+        return self.stream_ if self.stream_ is not None else sys.stdout
+
+    def _emit(self, stamp, level, message, args, thread):
+        try:
+            text = message % args if args else str(message)
+        except (TypeError, ValueError):
+            text = f"{message} {args}"
+
+        timestamp = datetime.fromtimestamp(stamp).strftime("%H:%M:%S.%f")[:-3]
+        self._stream().write(f"[{timestamp}] [{level}] {text}\n")
+
+        if self.jsonl_ is not None:
+            self.jsonl_.write(json.dumps({"t": stamp, "level": level, "thread": thread, "msg": text}) + "\n")
+
+    def _run(self):
+        while True:
+            record = self.queue_.get()
+            if record is None:
+                break
+
+            stamp, level, message, args, thread = record
+            allowed, suppressed = self._allow(stamp, level, message)
+            if suppressed:
+                self._emit(stamp, level, f"(suppressed {suppressed} repeats of: {message})", (), thread)
+            if allowed:
+                self._emit(stamp, level, message, args, thread)
+
+            # Only pay for a flush once the backlog is drained
+            if self.queue_.empty():
+                self._stream().flush()
+                if self.jsonl_ is not None:
+                    self.jsonl_.flush()
+
+    def _flush_suppressed(self):
+        """ Shutdown: report repeats still sitting in an open window """
+        for (level, template), (stamp, count) in self.windows_.items():
+            if count > self.burst_:
+                self._emit(stamp, level, f"(suppressed {count - self.burst_} repeats of: {template})", (), "AsyncLogger")
+
+    def close(self):
+        """ Drains everything queued so far (runs at interpreter exit) """
+        if self.closed_:
+            return
+        self.closed_ = True
+        self.queue_.put(None)
+        self.thread_.join(timeout=5.0)
+        self._flush_suppressed()
+        self._stream().flush()
+        if self.jsonl_ is not None:
+            self.jsonl_.close()
+            self.jsonl_ = None
+
+
+LOGGER = AsyncLogger()
@@ -0,0 +1,155 @@
+# modules/motion.py
+
+##################################### Imports #####################################
+# Libraries
+import cv2
+import numpy as np
+from abc import ABC, abstractmethod
+
+# Modules
+import config
+
+###################################################################################
+
+##################################################################################
+#                               CMC Blueprint
+##################################################################################
+
+class BaseCMC(ABC):
+    """
+    Camera motion compensation with BoxMOT's interface: apply(img, dets) -> 2x3 affine warp from the
+    previous frame to this one, in full-resolution pixels. BoTSORTTracker puts it in place of BoxMOT's own cmc.
+
+    Unlike the stock modes, estimation runs on a downscaled grayscale frame with the detections (faces move
+    on their own, they are not camera motion) masked out, and it is skipped entirely while our own motion
+    signal (TurretController.is_still) says the mount is not moving.
+    """
+
+    def __init__(self, scale=config.CMC_SCALE, still_signal=None):
+        self.scale_ = scale
+        self.still_signal_ = still_signal # callable -> True while the camera is known to be static
+        self.skipped = 0    # frames answered with the identity because the mount was still
+        self.estimated = 0
+
+    def _prepare(self, img, dets):
+        """ Downscaled gray frame and a mask that hides the detections and a thin border """
+        small = cv2.resize(img, None, fx=self.scale_, fy=self.scale_, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+        h, w = gray.shape
+        mask = np.zeros((h, w), dtype=np.uint8)
+        border = max(2, int(0.02 * max(h, w)))
+        mask[border:h - border, border:w - border] = 255
+        if dets is not None and len(dets):
+            for x1, y1, x2, y2 in (np.asarray(dets)[:, :4] * self.scale_).astype(int):
+                mask[max(0, y1):max(0, y2), max(0, x1):max(0, x2)] = 0
+        return gray, mask
+
+    def apply(self, img, dets=None):
+        if self.still_signal_ is not None and self.still_signal_():
+            self.reset() # the previous frame is stale once the mount moves again
+            self.skipped += 1
+            return np.eye(2, 3, dtype=np.float32)
+
+        gray, mask = self._prepare(img, dets)
+        warp = self._estimate(gray, mask)
+        self.estimated += 1
+        if warp is None:
+            return np.eye(2, 3, dtype=np.float32)
+
+        # Estimated on the downscaled frame, only the translation scales back
+        warp = warp.astype(np.float32)
+        warp[:, 2] /= self.scale_
+        return warp
+
+    @staticmethod
+    def _fit(prev_pts, curr_pts):
+        """ RANSAC partial affine (rotation, uniform scale, translation) between matched points, None if it fails """
+        if len(prev_pts) < 4:
+            return None
+        warp, _ = cv2.estimateAffinePartial2D(prev_pts, curr_pts, method=cv2.RANSAC, ransacReprojThreshold=1.0)
+        return warp
+
+    @abstractmethod
+    def reset(self):
+        """ Forgets the previous frame """
+        pass
+
+    @abstractmethod
+    def _estimate(self, gray, mask):
+        """ Previous frame vs this one -> 2x3 warp in downscaled pixels or None, then keeps this frame as the previous """
+        pass
+
+
+##################################################################################
+#                               Downscaled ORB
+##################################################################################
+
+class DownscaledORBCMC(BaseCMC):
+    """ BoxMOT's ORB recipe (keypoints, descriptor matching, RANSAC partial affine) on the small masked frame """
+
+    def __init__(self, scale=config.CMC_SCALE, still_signal=None, max_features=config.CMC_MAX_FEATURES):
+        super().__init__(scale, still_signal)
+        self.orb_ = cv2.ORB_create(nfeatures=max_features, edgeThreshold=15, patchSize=15, fastThreshold=10)
+        self.matcher_ = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
+        self.reset()
+
+    def reset(self):
+        self.prev_kp_, self.prev_desc_ = None, None
+
+    def _estimate(self, gray, mask):
+        kp, desc = self.orb_.detectAndCompute(gray, mask)
+        prev_kp, prev_desc = self.prev_kp_, self.prev_desc_
+        self.prev_kp_, self.prev_desc_ = kp, desc
+
+        if prev_desc is None or desc is None:
+            return None
+
+        matches = self.matcher_.match(prev_desc, desc)
+        prev_pts = np.float32([prev_kp[m.queryIdx].pt for m in matches])
+        curr_pts = np.float32([kp[m.trainIdx].pt for m in matches])
+        return self._fit(prev_pts, curr_pts)
+
+
+##################################################################################
+#                               Sparse Optical Flow
+##################################################################################
+
+class SparseFlowCMC(BaseCMC):
+    """ Shi-Tomasi corners of the previous frame followed into this one with pyramidal Lucas-Kanade, no descriptors at all """
+
+    def __init__(self, scale=config.CMC_SCALE, still_signal=None, max_features=config.CMC_MAX_FEATURES):
+        super().__init__(scale, still_signal)
+        self.max_features_ = max_features
+        self.reset()
+
+    def reset(self):
+        self.prev_gray_, self.prev_pts_ = None, None
+
+    def _estimate(self, gray, mask):
+        prev_gray, prev_pts = self.prev_gray_, self.prev_pts_
+        self.prev_gray_ = gray
+        self.prev_pts_ = cv2.goodFeaturesToTrack(gray, self.max_features_, qualityLevel=0.01, minDistance=5, mask=mask)
+
+        if prev_gray is None or prev_pts is None:
+            return None
+
+        curr_pts, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, prev_pts, None, winSize=(15, 15), maxLevel=2)
+        tracked = status.reshape(-1) == 1
+        return self._fit(prev_pts.reshape(-1, 2)[tracked], curr_pts.reshape(-1, 2)[tracked])
+
+
+##################################################################################
+#                               Factory
+##################################################################################
+
+CMC_METHODS = {"fast_orb": DownscaledORBCMC, "flow": SparseFlowCMC}
+
+def create_cmc(method, still_signal=None, scale=config.CMC_SCALE):
+    """
+    Our CMC for "fast_orb" / "flow", None for BoxMOT's own modes ("orb", "sof", "ecc", "sift").
+    scale is relative to the frame apply() gets, pass CMC_SCALE / DETECT_SCALE when that is already downscaled
+    """
+    if method not in CMC_METHODS:
+        return None
+    return CMC_METHODS[method](scale=scale, still_signal=still_signal)
@@ -0,0 +1,57 @@
+# modules/overlay.py
+
+##################################### Imports #####################################
+# Libraries
+import cv2
+
+###################################################################################
+
+class Overlay:
+    """
+    Per-frame display list of HUD primitives (boxes, bars, labels, crosshairs) in camera-frame pixels.
+    The pipeline only describes what to draw, the camera frame itself is never written: inference, recorder
+    and display all share the captured frame without a copy. render() composites onto the display-sized
+    copy the screen needs anyway, so drawing cost follows the widget size instead of the capture size.
+    """
+
+    def __init__(self):
+        self.items_ = []
+
+    def __len__(self):
+        return len(self.items_)
+
+    def rect(self, pt1, pt2, color, thickness=2):
+        """ thickness -1 fills """
+        self.items_.append(("rect", pt1, pt2, color, thickness))
+
+    def line(self, pt1, pt2, color, thickness=2):
+        self.items_.append(("line", pt1, pt2, color, thickness))
+
+    def text(self, text, org, color, scale=0.5, thickness=1):
+        self.items_.append(("text", text, org, color, scale, thickness))
+
+    def render(self, frame, width, height):
+        """ New image of frame fitted into width x height (aspect kept) with every primitive drawn, scaled along """
+        h, w = frame.shape[:2]
+        s = min(width / w, height / h)
+        size = (max(1, int(w * s)), max(1, int(h * s)))
+        canvas = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR) # bilinear, what Qt's SmoothTransformation did before
+
+        def pt(p):
+            return int(p[0] * s), int(p[1] * s)
+
+        def thick(t):
+            return t if t < 0 else max(1, int(round(t * s)))
+
+        for kind, *args in self.items_:
+            if kind == "rect":
+                pt1, pt2, color, thickness = args
+                cv2.rectangle(canvas, pt(pt1), pt(pt2), color, thick(thickness))
+            elif kind == "line":
+                pt1, pt2, color, thickness = args
+                cv2.line(canvas, pt(pt1), pt(pt2), color, thick(thickness))
+            else:
+                text, org, color, scale, thickness = args
+                cv2.putText(canvas, text, pt(org), cv2.FONT_HERSHEY_SIMPLEX, scale * s, color, thick(thickness), cv2.LINE_AA)
+
+        return canvas
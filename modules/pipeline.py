@@ -0,0 +1,696 @@
+# modules/pipeline.py
+
+##################################### Imports #####################################
+# Standart Libraries
+import time
+import os
+
+# Third Party Libraries
+import numpy as np
+
+# Modules
+import config
+from modules.utils import log, create_event
+from modules.association import associate, gather_by_index
+from modules.tracktable import TrackTable
+from modules.smoothing import create_smoother
+from modules.detector import YOLODetector, RetinaDetector, SCRFDDetector, ONNXSCRFDDetector, ONNXYOLODetector
+from modules.tracker import BoTSORTTracker, ByteTrackTracker, empty_tracks
+from modules.appearance import ArcFaceEmbeddingProvider
+from modules.identity_memory import IdentityMemory
+from modules.quality import FaceQualityScorer
+from modules.recognizer import TurretRecognizer
+from modules.inference_pool import InferencePool, PooledDetector
+from modules.autoscale import AutoScaleDetector
+from modules.controller import TurretController
+from modules.motion import create_cmc
+from modules.resolution import DualResolution
+from modules.overlay import Overlay
+from modules.scheduler import FrameScheduler
+from modules.telemetry import StageTimer
+from modules.recorder import SessionRecorder
+
+###################################################################################
+
+class SentryPipeline:
+    """
+    The whole sentry stack without any UI: detect -> track -> recognize -> lock -> controller, one frame per process() call.
+    Knows nothing about Qt or where frames come from, VisionWorker (GUI) and headless.py (service / benchmark) both drive it.
+    """
+
+    def __init__(self):
+        self.recognizer = TurretRecognizer()
+
+        # CPU-only nodes: detection + ArcFace in worker processes, frames / faces over shared memory
+        self.pool = None
+        if config.INFERENCE_WORKERS > 0:
+            self.pool = InferencePool(config.INFERENCE_WORKERS)
+            self.detector = PooledDetector(self.pool)
+            self.recognizer.attach_pool(self.pool)
+        else:
+            self.detector = ONNXSCRFDDetector() # RetinaDetector, SCRFDDetector, ONNXSCRFDDetector, YOLODetector, ONNXYOLODetector
+
+        # Input resolution follows the smallest tracked face, within the latency budget
+        self.autoscale = None
+        if config.DET_AUTOTUNE:
+            if self.pool is None:
+                self.autoscale = self.detector = AutoScaleDetector(self.detector)
+            else:
+                log("DET_AUTOTUNE is ignored with INFERENCE_WORKERS, pool workers keep a fixed input size", "WARNING")
+
+        self.controller = TurretController(simulation=True)
+
+        # BoT-SORT appearance: OSNet (torch) or the ArcFace embeddings the recognizer already computes
+        provider = ArcFaceEmbeddingProvider(self.recognizer) if config.REID_SOURCE == "arcface" else None
+        # Camera motion: BoxMOT's full-frame mode, or ours (downscaled, faces masked, skipped while the mount is still)
+        still_signal = (lambda: self.controller.is_still) if config.CMC_SKIP_WHEN_STILL else None
+        # The tracker sees the DETECT_SCALE copy, CMC_SCALE is meant relative to the full frame
+        cmc = create_cmc(config.CMC_METHOD, still_signal, scale=min(1.0, config.CMC_SCALE / config.DETECT_SCALE))
+        self.tracker = BoTSORTTracker(embedding_provider=provider, cmc=cmc) # ByteTrackTracker
+
+        smoother = create_smoother(config.BOX_SMOOTHER, config.TRACK_CAPACITY) # Tuning lives in config
+        self.tracks = TrackTable(smoother, capacity=config.TRACK_CAPACITY) # identity, distance and box filter state per track
+        self.identity_memory = IdentityMemory() # recently lost identities, survives tracker ID switches
+        self.quality = FaceQualityScorer() # size / score / pose / blur gate in front of recognition
+        self.quality_deferred = 0 # recognitions the quality gate held back for a better face
+        self.shed_deferred = 0 # recognitions load shedding pushed to a later frame
+        self.gallery_version = self.recognizer.gallery_version # last gallery hot-reload the tracks have seen
+        self.timer = StageTimer() # per-stage ms of the current frame
+        self.resolution = DualResolution() # detection / tracking on a downscaled copy, coordinates mapped back here only
+        self.frame_seq = 0
+        self.overlay = Overlay() # HUD display list of the last processed frame
+        # Frame budget, degrades (and recovers) under overload. lower_resolution needs a detector that can resize
+        policy = config.SHED_POLICY
+        if "lower_resolution" in policy and self.autoscale is None and not hasattr(self.detector, "set_input_size"):
+            log(f"{self.detector} keeps a fixed input size, load shedding runs without lower_resolution", "WARNING")
+            policy = tuple(step for step in policy if step != "lower_resolution")
+        self.scheduler = FrameScheduler(policy=policy)
+        self.det_input_size = getattr(self.detector, "input_size_", (640, 640)) # restored when lower_resolution is undone
+        self.last_tracks = None # tracker output of the last detection frame, reused while skip_detection holds
+
+        # Optional session capture (clean frames + reports), written off-thread
+        self.recorder = None
+        if config.RECORD_DIR:
+            self.attach_recorder(SessionRecorder(os.path.join(config.RECORD_DIR, time.strftime("%Y%m%d_%H%M%S"))))
+
+        self.is_frozen = False
+        self.is_locking = False
+        self.locked_target_id = None  # ID of the current "Enemy"
+        self.is_firing = False
+
+        log("SentryPipeline initialized", "INFO")
+
+    def attach_recorder(self, recorder):
+        """ Every processed frame (before HUD drawing) and its report go to the recorder from now on, a previous one is closed """
+        if self.recorder is not None and self.recorder is not recorder:
+            self.recorder.close()
+        self.recorder = recorder
+
+    def close(self):
+        """ Stops the turret and releases worker processes and the recorder """
+        self.transmit_to_controller(0, 0, False)
+        if self.pool is not None:
+            self.pool.close()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    ###################################################################################
+    #                                 HELPER METHODS
+    ###################################################################################
+
+    def _purge_stale_targets(self, current_ids):
+        """
+        Cleans up memory for targets no longer detected in the current frame.
+        Ensures Weapon Safety by revoking locks on lost targets.
+        """
+        stale_slots = self.tracks.stale_slots(current_ids)
+        now = time.time()
+
+        # 1. Hand identified faces over to the short-term memory before forgetting them
+        for slot in stale_slots:
+            if self.tracks.names[slot] is not None:
+                self.identity_memory.remember(self.tracks.names[slot], self.tracks.last_auth[slot],
+                                              self.tracks.centers[slot], self.tracks.embedding(slot), now)
+
+        # 2. Clear Identity, Distance and Smoothing memory in one vectorized pass
+        removed_ids = self.tracks.release(stale_slots)
+
+        for tid in removed_ids:
+            # 3. If locked, release the system
+            if tid == self.locked_target_id:
+                self.locked_target_id = None
+                self.is_firing = False
+                log(f"TARGET LOST: ID {tid} removed. System returning to Overwatch.", "INFO")
+            else:
+                log("Memory Cleared: ID %s (Stale)", "DEBUG", tid)
+
+
+    def _apply_temporal_smoothing(self, detections):
+        """
+        Filters high-frequency jitter with the configured box smoother, all tracks at once.
+        Overwrites every track's box and center in the record array, returns their TrackTable slots.
+        """
+        slots = self.tracks.acquire(detections["id"].tolist())
+        if len(slots) == 0:
+            return slots
+
+        # O(1) incremental filter update per track
+        smoothed = self.tracks.smooth(slots, detections["box"].astype(float), time.time()).astype(int)
+        centers = (smoothed[:, :2] + smoothed[:, 2:]) // 2
+        self.tracks.centers[slots] = centers
+
+        detections["box"] = smoothed
+        detections["center"] = centers
+
+        return slots
+        
+
+    def _sync_sensors_to_targets(self, detections, raw_boxes, landmarks, raw_distances):
+        """
+        Finds the raw detection landmarks for every tracked ID in one vectorized step.
+        I did this because detector -> tracker pass sometimes messes with the ordering.
+        Must run on the raw tracker boxes, before smoothing shifts them.
+        Returns (T, 5, 2) landmarks, (T,) distances and (T,) detector scores, NaN where a track has no detection this frame.
+        """
+        det_idx = associate(detections["box"].astype(float), raw_boxes[:, :4])
+
+        track_landmarks, track_distances = gather_by_index(det_idx, landmarks, raw_distances)
+        track_scores = np.where(det_idx >= 0, raw_boxes[det_idx, 4], np.nan) if len(raw_boxes) else np.full(len(det_idx), np.nan)
+
+        return track_landmarks, track_distances, track_scores
+    
+
+    def _recall_identity(self, slot, track_id, center, current_time):
+        """
+        A brand new track ID right where an identified face was just lost is most likely the same person
+        after a tracker ID switch. Inherit the identity instead of running alignment + ArcFace + gallery again.
+        Only an appearance match (tracker embedding in ArcFace ReID mode) is inherited outright; a position-only
+        match is provisional, shown but never locked or fired on, and recognized on the next good face.
+        Returns the inherited name or None.
+        """
+        embedding = self.tracker.embedding_for(track_id)
+        hit = self.identity_memory.recall(center, embedding, current_time)
+        if hit is None:
+            return None
+
+        name, last_auth, old_embedding = hit
+        provisional = embedding is None or old_embedding is None
+        self.tracks.set_identity(slot, name, last_auth, self.tracks.distance[slot], old_embedding, provisional)
+        log("IDENTITY MEMORY: ID %s inherits '%s'%s", "DEBUG", track_id, name, " (provisional)" if provisional else "")
+
+        return name
+
+    def _identify_pending(self, frame, detections, slots, track_landmarks, track_scores, frame_events):
+        """
+        Collects every track that needs recognition this frame and runs them through the recognizer as one batch
+        (one alignment pass, one ArcFace run, one gallery matmul). Returns {detection index: identify result}.
+        """
+        current_time = time.time()
+        pending = []
+
+        # New enrollments were hot-loaded: every Unknown on screen gets a fresh attempt right away
+        if self.recognizer.gallery_version != self.gallery_version:
+            self.gallery_version = self.recognizer.gallery_version
+            retried = self.tracks.retry_unknown()
+            if retried:
+                frame_events.append(create_event("LOG", message=f"[GALLERY] Updated, re-identifying {retried} Unknown target(s)", color="cyan"))
+
+        ids, boxes, centers = detections["id"].tolist(), detections["box"].tolist(), detections["center"].tolist()
+        for i, slot in enumerate(slots):
+            # New ID where a face was just lost (tracker ID switch), inherit its identity
+            if self.tracks.names[slot] is None:
+                inherited = self._recall_identity(slot, ids[i], centers[i], current_time)
+                if inherited is not None:
+                    status = "unconfirmed" if self.tracks.provisional[slot] else "re-acquired"
+                    frame_events.append(create_event("LOG", message=f"[MEMORY] ID {ids[i]}: {inherited} ({status})", color="cyan"))
+
+            # Track coasting without a detection has no landmarks to align
+            if np.isnan(track_landmarks[i, 0, 0]):
+                continue
+
+            # Only once the face is good enough
+            if self._should_identify(slot) and self._passes_quality(frame, boxes[i], track_scores[i], track_landmarks[i]):
+                pending.append(i)
+
+        if not pending:
+            return {}
+
+        # Load shedding: a few faces per frame, never-identified ones first, the rest stay pending for later frames
+        if self.scheduler.active("defer_recognition") and len(pending) > config.SHED_MAX_RECOGNITIONS:
+            pending.sort(key=lambda i: self.tracks.names[slots[i]] is not None and not self.tracks.provisional[slots[i]])
+            self.shed_deferred += len(pending) - config.SHED_MAX_RECOGNITIONS
+            pending = pending[:config.SHED_MAX_RECOGNITIONS]
+
+        results = self.recognizer.identify_batch(frame, track_landmarks[pending])
+        return dict(zip(pending, results))
+
+    def _should_identify(self, slot):
+        """
+        Determines if a specific target requires a fresh recognition attempt.
+        Currently triggers if the target is 'Unknown' and 5 seconds have passed.
+        """
+        current_time = time.time()
+        name = self.tracks.names[slot]
+
+        # 1. If we never identified this ID, it's a 'New' target. Same for a name only guessed from position
+        if name is None or self.tracks.provisional[slot]:
+            return True
+
+        # 2. Logic for 'Unknown' targets
+        if name == "Unknown":
+            last_attempt = self.tracks.last_auth[slot]
+            
+            # 5-second cooldown to prevent spamming the Embedding model
+            if (current_time - last_attempt) > 5.0:
+                return True
+
+        # 3. Future Expansion: Add rules for 'Low Confidence' or 'Distance Changes'
+        return False
+    
+    def _passes_quality(self, frame, box, det_score, landmarks):
+        """
+        Quality gate in front of recognition. A rejected face does not touch last_auth,
+        so the track simply retries on its next (hopefully better) frame instead of sitting on a 5s Unknown cooldown.
+        """
+        passed, _ = self.quality.check(frame, box, det_score, landmarks)
+        if not passed:
+            self.quality_deferred += 1
+        return passed
+
+    def _arbitrate_target_lock(self, potential_enemies):
+        """
+        Decides which target (track ids of the enemies on screen) to lock onto if no lock currently exists.
+        Can be expanded to include distance or priority-based sorting.
+        """
+
+        # 1. Early exit: If we aren't in locking mode or already have a lock
+        if not self.is_locking or self.locked_target_id is not None:
+            return None
+
+        # 2. Early exit: No enemies present
+        if not potential_enemies:
+            return None
+
+        # 3. SORTING LOGIC (The 'Doctrine')
+        potential_enemies.sort(key=self.tracks.distance_of)
+
+        # 4. SELECT AND LOCK
+        self.locked_target_id = potential_enemies[0]
+        
+        log(f"TACTICAL ARBITRATOR: Locked onto ID {self.locked_target_id} (Closest Enemy)", "WARNING")
+        
+        # Return an event to be added to the UI logs
+        return create_event("LOCK", track_id=self.locked_target_id, status="LOCKED")
+    
+    def _draw_target_hud(self, overlay, track_id, box, center, name, affiliation, color, distance):
+        """
+        Adds all visual overlays for a single target to the frame's display list.
+        Logic:
+        1. Draw the bounding box and header bar.
+        2. Overlay telemetry (Name, ID, Distance).
+        3. If currently firing at THIS target, draw the red engagement crosshair.
+        """
+        sx1, sy1, sx2, sy2 = box
+        
+        # 1. Determine if this is the ACTIVE engagement target
+        is_locked_target = (track_id == self.locked_target_id)
+        is_actively_firing = (is_locked_target and self.is_firing)
+        
+        # Visual thickness increases when firing for 'recoil' effect
+        thickness = 4 if is_actively_firing else 2
+
+        # 2. Draw Bounding Box & Identity Header
+        overlay.rect((sx1, sy1), (sx2, sy2), color, 2)
+        overlay.rect((sx1, sy1 - 22), (sx2, sy1), color, -1)
+
+        # 3. Telemetry String
+        # Format: ENEMY: Kerem (ID:5)(DIST: 150.2cm)
+        display_text = f"{affiliation}: {name} (ID:{track_id})(DIST: {distance:.1f}cm)"
+        
+        overlay.text(display_text, (sx1 + 5, sy1 - 7), (255, 255, 255), 0.45, 1)
+
+        # 4. Engagement Crosshair (Only if firing)
+        if is_actively_firing:
+            cx, cy = center
+            # Red crosshair centered on the smoothed face center
+            overlay.line((cx - 25, cy), (cx + 25, cy), (0, 0, 255), thickness)
+            overlay.line((cx, cy - 25), (cx, cy + 25), (0, 0, 255), thickness)
+            # Optional: Add a 'FIRE' alert next to the box
+            overlay.text("ENGAGING", (sx1, sy2 + 20), (0, 0, 255), 0.6, 2)
+
+    def _apply_shedding(self, event):
+        """ Carries out a scheduler decision. Only lower_resolution has state to change, the other steps are checked per frame """
+        if event["step"] == "lower_resolution":
+            capped = event["action"] == "shed"
+            if self.autoscale is not None:
+                self.autoscale.cap_input_size(config.SHED_DET_INPUT_SIZE if capped else None)
+            elif hasattr(self.detector, "set_input_size"):
+                self.detector.set_input_size((config.SHED_DET_INPUT_SIZE,) * 2 if capped else self.det_input_size)
+
+        elif event["step"] == "skip_detection" and event["action"] == "restore":
+            self.last_tracks = None
+
+        color = "orange" if event["action"] == "shed" else "cyan"
+        return create_event("LOG", message=f"[LOAD] {event['action'].upper()} {event['step']} (level {event['level']}, {event['reason']})", color=color)
+
+    ###################################################################################
+    #                                 FRAME CYCLE
+    ###################################################################################
+
+    def process(self, frame, draw=True):
+        """
+        Runs one full cycle on a frame, frame itself is never written.
+        With draw the HUD is described in self.overlay (a fresh modules.overlay.Overlay per frame), composited at display time.
+        Returns:
+        1. image_package: [detector crop, aligned face] of a fresh recognition, empty arrays otherwise
+        2. frame_events: UI log events (create_event)
+        3. report: plain-python per-frame summary (tracks, identities, lock state, stage timings) for publishers
+        """
+        self.timer.start()
+        self.frame_seq += 1
+        if self.recorder is not None:
+            self.recorder.submit_frame(self.frame_seq, frame)
+
+        # POSSIBILITY 1: No Face Detected (Just send the frame) 
+        empty_img = np.array([], dtype=np.uint8)
+        image_package = [empty_img, empty_img] # [YOLO_CROP, ALIGN_CROP]
+        frame_events = [] # logging purposes
+        detections, potential_enemies, track_reports = empty_tracks(), [], []
+        overlay = self.overlay = Overlay()
+    
+        # 2. Scan for detection
+        if not self.is_frozen:
+
+            # Load shedding: detection + tracking on every N-th frame only, the last tracks (boxes, identities) hold in between
+            if self.scheduler.skips_detection(self.frame_seq) and self.last_tracks is not None:
+                detections = self.last_tracks
+                slots = self.tracks.acquire(detections["id"].tolist())
+                track_distances = np.full(len(detections), np.nan)
+                recognitions = {}
+
+            else:
+                # Step A: Get raw [x1, y1, x2, y2, conf], and facial landmarks from detector, on the downscaled working copy
+                small_frame = self.resolution.downscale(frame)
+                raw_boxes, landmarks, raw_distances = self.detector.detect(small_frame)
+                self.timer.lap("detect")
+            
+                # Step B: Get the TRACK_DTYPE record array (id, box, center, score, det_index) from tracker, same working copy (ReID crops, CMC)
+                detections = self.tracker.update(raw_boxes, small_frame, landmarks)
+
+                # Step B.0.: Back to full-resolution pixels, recognition aligns from the full frame
+                raw_boxes, landmarks, raw_distances = self.resolution.to_full(raw_boxes, landmarks, raw_distances)
+                detections = self.resolution.tracks_to_full(detections)
+            
+                # Step B.1.: Purge ids that are absent from the frame
+                self._purge_stale_targets(detections["id"])
+
+                # Step B.2.: One-to-one track <-> detection matching, returns correct landmarks per track
+                track_landmarks, track_distances, track_scores = self._sync_sensors_to_targets(detections, raw_boxes, landmarks, raw_distances)
+
+                # Step B.3.: Smoothens every box, returns the TrackTable slot of each target
+                slots = self._apply_temporal_smoothing(detections)
+                if self.autoscale is not None:
+                    self.autoscale.observe(detections["box"], track_distances, frame.shape)
+                self.timer.lap("track")
+
+                # Step B.4.: Every track that needs recognition this frame, identified as one batch
+                recognitions = self._identify_pending(frame, detections, slots, track_landmarks, track_scores, frame_events)
+                self.timer.lap("recognize")
+                self.last_tracks = detections
+
+# --------------------------------- Step C (Starts): Start loop for one target ----------------------------------------
+
+            # Plain python views of the smoothed rows for drawing and reports
+            ids, boxes, centers = detections["id"].tolist(), detections["box"].tolist(), detections["center"].tolist()
+
+            for i, slot in enumerate(slots):
+                # ------------------- PREPROCESSING (START) ---------------
+
+                current_dist = None if np.isnan(track_distances[i]) else float(track_distances[i])
+
+                track_id = ids[i]
+                sx1, sy1, sx2, sy2 = boxes[i]
+
+                # ------------------- PREPROCESSING (END) ---------------
+
+                # -------------- RECOGNITION (START) -----------------------
+
+                current_time = time.time()
+
+                # POSSIBILITY 2: Brand New Target (Send frame, [crop, aligned]), recognized in Step B.4
+                if i in recognitions:
+
+                    # C.1. Crop the correct frame
+                    h, w = frame.shape[:2]
+                    x1c, y1c, x2c, y2c = max(0, sx1), max(0, sy1), min(w, sx2), min(h, sy2)
+                    detector_crop = frame[y1c:y2c, x1c:x2c].copy()
+                    
+                    # C.2. Recognition result: a name, scores dict, aligned_face image for debug
+                    name, distances, aligned_face, embedding = recognitions[i]
+                    if aligned_face is None or aligned_face.size == 0: continue
+
+                    # C.3. Update emittion data
+                    image_package = [detector_crop, aligned_face]
+                    
+                    self.tracks.set_identity(slot, name, current_time, current_dist or 200.0, embedding)
+
+                    # Empty gallery (nothing enrolled yet): no scores, no reference image
+                    ref_path = None
+                    if distances:
+                        best_filename = min(distances, key=distances.get)
+                        person_dir = best_filename.rsplit("_", 1)[0]
+                        ref_path = os.path.join("assets", "faces", "debug_aligned", person_dir, f"aligned_{best_filename}")
+                        if self.scheduler.active("skip_candidates"):
+                            distances = {best_filename: distances[best_filename]} # HUD lists the best match only, not the ranking
+                    frame_events.append(create_event("RECOGNITION", track_id=track_id, name=name, distances=distances, ref_path=ref_path))
+
+                # POSSIBILITY 3: Already Tracking (Send frame, [crop, empty])
+                else:
+                    # We still need to draw the box, but we don't update the snaps, image_package remains [empty_img, empty_img], we pass the stuff as it is
+                    name = self.tracks.names[slot]
+                    if current_dist is not None and name is not None:
+                        self.tracks.distance[slot] = current_dist
+
+                    name = name or "Unknown"
+
+                # C.4. Determine Affiliation (a provisional name is shown, but acted upon only once recognition confirms it)
+                confirmed = not self.tracks.provisional[slot]
+                if name in config.ENEMIES and confirmed:
+                    affiliation = "ENEMY"
+                    color = config.COLOR_ENEMY
+                    potential_enemies.append(track_id)
+
+                elif name in config.FRIENDS and confirmed:
+                    affiliation = "FRIEND"
+                    color = config.COLOR_FRIEND
+                else:
+                    affiliation = "STRANGER"
+                    color = config.COLOR_STRANGER
+
+                # -------------- RECOGNITION (END) -----------------------
+
+                # -------------- VISUALIZATION (START) ----------------------- 
+                if draw:
+                    self._draw_target_hud(overlay, track_id, boxes[i], centers[i], name, affiliation, color, current_dist or 200.0)
+
+                track_reports.append({"id": track_id, "box": boxes[i], "name": name,
+                                      "affiliation": affiliation, "distance": float(self.tracks.distance[slot])})
+
+                # -------------- VISUALIZATION (END) ----------------------- 
+
+# --------------------------------- Step C (Ends): End loop for one target ----------------------------------------
+            self.timer.lap("annotate")
+
+        # 3. TELEMETRY & CONTROL
+
+        # A. Check if locking is going on
+        lock_event = self._arbitrate_target_lock(potential_enemies)
+        if lock_event:
+            frame_events.append(lock_event)
+
+        # B. Send data to the PLC
+        if self.locked_target_id is not None:
+            # 1. Find the target row in the CURRENT detections
+            # We need the current frame's center (scx, scy)
+            locked_rows = np.flatnonzero(detections["id"] == self.locked_target_id)
+            
+            if len(locked_rows):
+                # 2. Calculate vector (Using our Parallax math)
+                pan_err, tilt_err = self._calculate_targeting_vector(detections[locked_rows[0]])
+                
+                # 3. Fire Command (Only fire if they are an ENEMY and we are in firing mode)
+                # Note: We already checked they were an enemy to lock them
+                self.transmit_to_controller(pan_err, tilt_err, self.is_firing)
+            else:
+                # Target is gone (or AI frozen)! Purge will handle memory, but we must stop motors now.
+                self.transmit_to_controller(0, 0, False)
+        else:
+            # No lock? Standby.
+            self.transmit_to_controller(0, 0, False)
+        self.timer.lap("control")
+
+        timings = self.timer.timings()
+        shed_event = self.scheduler.end_frame(timings)
+        if shed_event is not None:
+            frame_events.append(self._apply_shedding(shed_event))
+
+        report = {
+            "seq": self.frame_seq,
+            "time": time.time(),
+            "frozen": self.is_frozen,
+            "locked_id": self.locked_target_id,
+            "firing": self.is_firing,
+            "tracks": track_reports,
+            "timings": timings,
+            "shedding": self.scheduler.active_steps(),
+            "deferred": {"quality": self.quality_deferred, "shed": self.shed_deferred}, # running totals
+        }
+        if shed_event is not None:
+            report["shed_event"] = shed_event
+        if self.recorder is not None:
+            self.recorder.submit_report(report)
+        return image_package, frame_events, report
+
+    ###################################################################################
+    #                                 BUTTON LOGIC
+    ###################################################################################
+
+    def toggle_freeze(self):
+        """ Stop the AI """
+        self.is_frozen = not self.is_frozen
+
+        if not self.is_frozen:
+            log("AI RESUMED", "INFO")
+        return self.is_frozen
+
+    def reset_tracking_data(self):
+        """ Clears all identified targets and active memory """
+        self.tracks.clear_identities()
+        self.identity_memory.clear()
+        self.last_tracks = None
+        self.locked_target_id = None
+        self.is_firing = False
+        log("SYSTEM REBOOT: Tracking memory cleared.", "INFO")
+
+    def switch_target(self, step=1):
+        """Cycles the locked_target_id only through ENEMY targets"""
+        # 1. Filter active IDs to find only confirmed ENEMIES
+        enemy_ids = self.tracks.ids_named(config.ENEMIES)
+
+        if not enemy_ids:
+            log("SWITCH REJECTED: No enemy targets in memory.", "WARNING")
+            self.locked_target_id = None
+            return None
+
+        try:
+            # 2. If already locked on an enemy, find the next one in the list
+            if self.locked_target_id in enemy_ids:
+                current_idx = enemy_ids.index(self.locked_target_id)
+                next_idx = (current_idx + step) % len(enemy_ids)
+                self.locked_target_id = enemy_ids[next_idx]
+            else:
+                # 3. If lock was lost or on a non-enemy, grab the first available enemy
+                self.locked_target_id = enemy_ids[0]
+
+            log(f"SWITCHED: Locked onto ENEMY ID {self.locked_target_id}", "WARNING")
+
+        except Exception as e:
+            log(f"Switch Error: {e}", "ERROR")
+            return None
+
+        return self.locked_target_id
+    
+    def toggle_lock(self):
+        """Toggle Active Tracking (Latches ONLY onto Enemies)"""
+        self.is_locking = not self.is_locking
+
+        if not self.is_locking:
+            self.locked_target_id = None
+            self.is_firing = False
+            log("TURRET: Lock Revoked. Returning to Overwatch.", "INFO")
+        else:
+            # Filter for enemies only
+            enemy_ids = self.tracks.ids_named(config.ENEMIES)
+            
+            if enemy_ids:
+                self.locked_target_id = enemy_ids[0]
+                log(f"TURRET: Lock Requested. Latching to ENEMY ID {self.locked_target_id}", "WARNING")
+            else:
+                self.locked_target_id = None
+                log("TURRET: Lock Requested. No ENEMIES in sight, standing by...", "WARNING")
+        
+        return self.is_locking
+
+    def trigger_fire(self):
+        """Master trigger: Only works if locked target is an ENEMY"""
+        if self.locked_target_id is not None:
+            # Double-check affiliation before pulling the trigger
+            if self.tracks.name_of(self.locked_target_id) in config.ENEMIES:
+                self.is_firing = not self.is_firing
+                status = "FIRE" if self.is_firing else "CEASE FIRE"
+                log(f"WEAPON SYSTEM: {status}", "WARNING")
+            else:
+                self.is_firing = False
+                log("FIRE REJECTED: Current lock is NOT an enemy!", "ERROR")
+        else:
+            self.is_firing = False
+            log("FIRE REJECTED: System requires active lock.", "ERROR")
+            
+        return self.is_firing
+    
+    ###################################################################################
+    #                              CONTROLLER EMIT
+    ###################################################################################
+
+    def _calculate_targeting_vector(self, target):
+        """
+        Translates pixel coordinates and distance into physical angles.
+        Includes Parallax Correction for the camera-to-barrel offset.
+        """
+        cx, cy = target["center"]
+        dist_cm = self.tracks.distance_of(target["id"])
+
+        # 1. Get Pixel Error from Screen Center (640, 360)
+        dx = cx - 640
+        dy = cy - 360 # Note: In pixels, Y increases downwards
+
+        # 2. Convert Pixels to Radians (using our Focal Length)
+        # Formula: theta = arctan(pixels / focal_length)
+        yaw_rad = np.arctan2(dx, config.FOCAL_LENGTH)
+        pitch_rad = np.arctan2(dy, config.FOCAL_LENGTH)
+
+        # 3. PARALLAX CORRECTION (Vertical Offset)
+        # Assume camera is 10cm ABOVE the barrel
+        camera_offset_y = 10.0 
+        # At 'dist_cm', the barrel needs to tilt UP slightly more than the camera sees
+        # correction_angle = arctan(offset / distance)
+        parallax_correction = np.arctan2(camera_offset_y, dist_cm)
+        
+        # Final Pitch = Visual Pitch + Parallax Correction
+        corrected_pitch_rad = pitch_rad + parallax_correction
+
+        # 4. Convert to normalized units (-1.0 to 1.0) for the Comms module
+        # We assume our "Field of View" is the limit
+        pan_error = np.degrees(yaw_rad) / 30.0   # Normalized to a 60deg total span
+        tilt_error = np.degrees(corrected_pitch_rad) / 20.0 
+
+        return np.clip(pan_error, -1.0, 1.0), np.clip(tilt_error, -1.0, 1.0)
+
+
+    def transmit_to_controller(self, pan_error, tilt_error, fire_command):
+        """
+        Placeholder for PLC/Microcontroller communication.
+        pan_error: float (-1.0 to 1.0)
+        tilt_error: float (-1.0 to 1.0)
+        fire_command: bool
+        """
+
+        # We pass the normalized floats (-1.0 to 1.0) to the controller.
+        # The controller will handle the integer conversion for the Omron registers.
+        self.controller.update_turret(pan_error, tilt_error, fire_command)
+
+        pass
+
+
+
+    
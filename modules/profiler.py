@@ -0,0 +1,179 @@
+# modules/profiler.py
+
+##################################### Imports #####################################
+# Libraries
+import os
+import sys
+import json
+import time
+import signal
+import threading
+from collections import Counter
+
+# Modules
+import config
+from modules.utils import log
+
+###################################################################################
+
+# Sample -> stage: first rule matching a frame, walking from the innermost frame outwards.
+# (stage, path fragment, function names or None for any function in that file)
+STAGE_RULES = (
+    ("qt_convert", "interface.py", None),
+    ("cmc", os.sep + "cmc" + os.sep, None),               # BoxMOT camera motion compensation (boxmot/motion/cmc)
+    ("alignment", "alignment.py", None),
+    ("gallery", "gallery.py", None),
+    ("embed", "recognizer.py", None),
+    ("quality", "quality.py", None),
+    ("detect", "detector.py", None),
+    ("detect", "inference_pool.py", None),
+    ("detect", "resolution.py", None),
+    ("detect", "autoscale.py", None),
+    ("cmc", "motion.py", None),                           # our own global motion estimate ahead of association
+    ("track", os.sep + "boxmot" + os.sep, None),
+    ("track", "tracker.py", None),
+    ("track", "association.py", None),
+    ("track", "tracktable.py", None),
+    ("annotate", "pipeline.py", ("_draw_target_hud",)),
+    ("annotate", "overlay.py", None),
+    ("control", "controller.py", None),
+    ("pipeline", "pipeline.py", None),                     # bookkeeping between the stages above
+    ("pipeline", "scheduler.py", None),
+    ("publish", "publisher.py", None),
+    ("record", "recorder.py", None),
+    ("capture", "camera.py", None),
+    ("capture", "sources.py", None),
+    ("idle", "visionworker.py", ("_finalize_cycle",)),      # FPS governor sleep
+    ("idle", "headless.py", ("main",)),                     # rate pacing sleep, only when nothing deeper matched
+)
+
+
+def classify_stack(frames):
+    """ [(filename, function), ...] innermost first -> stage name, "other" when no rule matches """
+    for filename, function in frames:
+        for stage, fragment, functions in STAGE_RULES:
+            if fragment in filename and (functions is None or function in functions):
+                return stage
+    return "other"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for the live system. While a capture runs, a daemon thread reads every watched
+    thread's Python stack (sys._current_frames) each `interval` seconds. Nothing is hooked into the frame loop,
+    so when no capture runs the cost is exactly zero, and while one runs the sampled threads are never paused
+    longer than one stack walk.
+
+    A capture of `duration` seconds writes into `directory`:
+      <stamp>.collapsed  : "thread;file:func;file:func count" lines, flamegraph.pl / speedscope input
+      <stamp>.stages.json: sample counts per pipeline stage (detect, cmc, alignment, gallery, qt_convert, ...)
+    """
+
+    def __init__(self, directory=config.PROFILE_DIR, interval=config.PROFILE_INTERVAL_MS / 1000.0):
+        self.directory_ = directory
+        self.interval_ = interval
+        self.thread_ = None
+        self.stop_event_ = threading.Event()
+        self.last_result = None # (collapsed path, stage counts) of the last finished capture
+
+    @property
+    def running(self):
+        return self.thread_ is not None and self.thread_.is_alive()
+
+    def start(self, duration=config.PROFILE_SECONDS, threads=None):
+        """ Starts a capture of duration seconds over the given thread idents (None = every thread). False if one is running """
+        if self.running:
+            return False
+
+        self.stop_event_.clear()
+        self.thread_ = threading.Thread(target=self._run, args=(duration, threads), name="SamplingProfiler", daemon=True)
+        self.thread_.start()
+        log(f"Profiler: sampling {'all threads' if threads is None else len(threads)} for {duration:.0f}s "
+            f"every {self.interval_ * 1000:.0f} ms", "INFO")
+        return True
+
+    def stop(self):
+        """ Ends the running capture early, the samples so far are still written """
+        self.stop_event_.set()
+        if self.thread_ is not None:
+            self.thread_.join()
+
+    def toggle(self, duration=config.PROFILE_SECONDS, threads=None):
+        """ HUD button / signal: starts a capture, or cuts the running one short. Returns True if now running """
+        if self.running:
+            self.stop()
+            return False
+        return self.start(duration, threads)
+
+    ###################################################################################
+    #                                 SAMPLER THREAD
+    ###################################################################################
+
+    def _sample(self, threads, names, stacks, stages):
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own or (threads is not None and ident not in threads):
+                continue
+
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append((code.co_filename, code.co_name))
+                frame = frame.f_back
+
+            thread_name = names.get(ident, f"thread-{ident}")
+            stage = classify_stack(frames)
+            stacks[(thread_name,) + tuple(f"{os.path.basename(f)}:{fn}" for f, fn in reversed(frames))] += 1
+            stages[(thread_name, stage)] += 1
+
+    def _run(self, duration, threads):
+        stacks, stages = Counter(), Counter()
+        started = time.perf_counter()
+        samples = 0
+
+        while not self.stop_event_.is_set() and time.perf_counter() - started < duration:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            self._sample(threads, names, stacks, stages)
+            samples += 1
+            self.stop_event_.wait(self.interval_)
+
+        try:
+            self.last_result = self._write(stacks, stages, samples, time.perf_counter() - started)
+        except OSError as e:
+            log(f"Profiler: could not write the capture: {e}", "ERROR")
+
+    def _write(self, stacks, stages, samples, elapsed):
+        os.makedirs(self.directory_, exist_ok=True)
+        base = os.path.join(self.directory_, time.strftime("%Y%m%d_%H%M%S"))
+
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+        per_thread = {}
+        for (thread_name, stage), count in stages.items():
+            per_thread.setdefault(thread_name, {})[stage] = count
+        summary = {"samples": samples, "seconds": round(elapsed, 3), "interval_ms": self.interval_ * 1000, "stages": per_thread}
+        with open(f"{base}.stages.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+        busiest = max(per_thread.items(), key=lambda item: sum(c for s, c in item[1].items() if s != "idle"), default=None)
+        if busiest is not None:
+            total = sum(busiest[1].values())
+            top = ", ".join(f"{s} {100 * c / total:.0f}%" for s, c in sorted(busiest[1].items(), key=lambda x: -x[1])[:5])
+            log(f"Profiler: {samples} samples -> {base}.collapsed ({busiest[0]}: {top})", "INFO")
+        return f"{base}.collapsed", per_thread
+
+
+def install_signal_toggle(profiler, threads=None):
+    """
+    SIGUSR1 (POSIX only) toggles a capture: `kill -USR1 <pid>`. Python runs the handler on the main thread
+    between bytecodes, so under Qt it fires on the next event loop wake-up. Returns False where unsupported.
+    """
+    if not hasattr(signal, "SIGUSR1"):
+        return False
+    signal.signal(signal.SIGUSR1, lambda signum, frame: profiler.toggle(threads=threads))
+    return True
+
+
+PROFILER = SamplingProfiler()
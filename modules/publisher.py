@@ -0,0 +1,121 @@
+# modules/publisher.py
+
+##################################### Imports #####################################
+# Libraries
+import json
+import socket
+import struct
+from multiprocessing import shared_memory
+from abc import ABC, abstractmethod
+
+# Modules
+from modules.utils import log
+
+###################################################################################
+
+##################################################################################
+#                               Publisher Blueprint
+##################################################################################
+
+class BasePublisher(ABC):
+    """ Hands per-frame pipeline reports to other processes. publish() never blocks the frame loop """
+
+    @abstractmethod
+    def publish(self, report):
+        pass
+
+    def close(self):
+        pass
+
+
+def encode_report(report):
+    return json.dumps(report, separators=(",", ":")).encode("utf-8")
+
+
+##################################################################################
+#                               UDP (local socket)
+##################################################################################
+
+class UDPPublisher(BasePublisher):
+    """
+    One JSON datagram per frame. Fire-and-forget: nobody listening or a full socket buffer just drops
+    the report, the sentry loop never waits on a consumer.
+    """
+
+    def __init__(self, host="127.0.0.1", port=5555):
+        self.address_ = (host, port)
+        self.sock_ = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock_.setblocking(False)
+        self.dropped = 0
+
+    def publish(self, report):
+        try:
+            self.sock_.sendto(encode_report(report), self.address_)
+        except OSError:
+            self.dropped += 1
+
+    def close(self):
+        self.sock_.close()
+
+
+##################################################################################
+#                               Shared Memory (latest report)
+##################################################################################
+
+class SharedMemoryPublisher(BasePublisher):
+    """
+    Latest report in a named shared-memory block, readers poll it with read_latest().
+    Layout: [uint64 sequence][uint32 length][JSON bytes]. The sequence is odd while a write is in progress
+    (seqlock), so a reader retries instead of parsing a half-written report. Writer never waits on readers.
+    """
+
+    HEADER = struct.Struct("<QI")
+
+    def __init__(self, name="sentry", size=1 << 16):
+        self.shm_ = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.sequence_ = 0
+        self.HEADER.pack_into(self.shm_.buf, 0, 0, 0)
+        log(f"Publishing reports to shared memory '{name}' ({size} bytes)", "INFO")
+
+    def publish(self, report):
+        payload = encode_report(report)
+        if self.HEADER.size + len(payload) > self.shm_.size:
+            log(f"Report of {len(payload)} bytes does not fit the shared memory block", "WARNING")
+            return
+
+        buf = self.shm_.buf
+        self.sequence_ += 1
+        struct.pack_into("<Q", buf, 0, 2 * self.sequence_ - 1) # odd: writing
+        buf[self.HEADER.size:self.HEADER.size + len(payload)] = payload
+        self.HEADER.pack_into(buf, 0, 2 * self.sequence_, len(payload)) # even: consistent
+
+    def close(self):
+        self.shm_.close()
+        self.shm_.unlink()
+
+    @classmethod
+    def read_latest(cls, shm, retries=100):
+        """ Reader side: (sequence, report) from an attached SharedMemory block, None if nothing consistent yet """
+        for _ in range(retries):
+            seq, length = cls.HEADER.unpack_from(shm.buf, 0)
+            if seq == 0 or seq % 2:
+                continue
+            payload = bytes(shm.buf[cls.HEADER.size:cls.HEADER.size + length])
+            if cls.HEADER.unpack_from(shm.buf, 0)[0] == seq:
+                return seq // 2, json.loads(payload)
+        return None
+
+
+def create_publisher(spec):
+    """ "udp://host:port" or "shm://name" -> publisher, None/"" -> no publishing """
+    if not spec:
+        return None
+
+    scheme, _, target = spec.partition("://")
+    if scheme == "udp":
+        host, _, port = target.rpartition(":")
+        return UDPPublisher(host or "127.0.0.1", int(port))
+    if scheme == "shm":
+        return SharedMemoryPublisher(target or "sentry")
+
+    raise ValueError(f"Unknown publisher '{spec}', use udp://host:port or shm://name")
@@ -0,0 +1,78 @@
+# modules/quality.py
+
+##################################### Imports #####################################
+# Libraries
+import cv2
+import numpy as np
+
+# Modules
+import config
+
+###################################################################################
+
+class FaceQualityScorer:
+    """
+    Cheap pre-recognition check built from things we already have: box size, SCRFD score,
+    the 5 keypoints (yaw / roll) and a Laplacian-variance blur estimate on a tiny crop.
+    Tiny, blurred or profile faces are rejected before they burn an ArcFace pass and come back Unknown.
+    Checks run cheapest first and stop at the first failure.
+    """
+
+    def __init__(self, min_face_px=config.QUALITY_MIN_FACE_PX, min_det_score=config.QUALITY_MIN_DET_SCORE,
+                 max_yaw=config.QUALITY_MAX_YAW, max_roll=config.QUALITY_MAX_ROLL,
+                 min_sharpness=config.QUALITY_MIN_SHARPNESS, blur_size=64):
+        self.min_face_px_ = min_face_px
+        self.min_det_score_ = min_det_score
+        self.max_yaw_ = max_yaw             # |nose offset from the eye midpoint| / eye distance
+        self.max_roll_ = max_roll           # degrees of eye-line tilt
+        self.min_sharpness_ = min_sharpness # Laplacian variance on the blur_size x blur_size gray crop
+        self.blur_size_ = blur_size
+
+    @staticmethod
+    def pose(landmarks):
+        """ 5 keypoints (L eye, R eye, nose, L mouth, R mouth) -> (yaw ratio, roll degrees) """
+        left_eye, right_eye, nose = landmarks[0], landmarks[1], landmarks[2]
+        eye_vec = right_eye - left_eye
+        ipd = np.hypot(eye_vec[0], eye_vec[1])
+        if ipd < 1.0:
+            return np.inf, np.inf
+
+        roll = np.degrees(np.arctan2(eye_vec[1], eye_vec[0]))
+
+        # Nose offset along the eye line: ~0 frontal, grows towards +-0.5 in profile
+        eye_mid = (left_eye + right_eye) / 2.0
+        yaw = np.dot(nose - eye_mid, eye_vec) / (ipd * ipd)
+
+        return float(yaw), float(roll)
+
+    def sharpness(self, frame, box):
+        """ Laplacian variance of the downscaled gray face crop, higher = sharper """
+        h, w = frame.shape[:2]
+        x1, y1, x2, y2 = int(max(0, box[0])), int(max(0, box[1])), int(min(w, box[2])), int(min(h, box[3]))
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            return 0.0
+
+        crop = cv2.resize(frame[y1:y2, x1:x2], (self.blur_size_, self.blur_size_), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        return float(cv2.Laplacian(gray, cv2.CV_32F).var())
+
+    def check(self, frame, box, det_score, landmarks):
+        """ Returns (passed, reason). reason names the first failed check, "" when passed """
+        if det_score < self.min_det_score_:
+            return False, f"score {det_score:.2f}"
+
+        face_px = min(box[2] - box[0], box[3] - box[1])
+        if face_px < self.min_face_px_:
+            return False, f"size {face_px:.0f}px"
+
+        yaw, roll = self.pose(landmarks)
+        if abs(yaw) > self.max_yaw_:
+            return False, f"yaw {yaw:.2f}"
+        if abs(roll) > self.max_roll_:
+            return False, f"roll {roll:.0f}deg"
+
+        sharp = self.sharpness(frame, box)
+        if sharp < self.min_sharpness_:
+            return False, f"blur {sharp:.0f}"
+
+        return True, ""
@@ -3,18 +3,21 @@
 ##################################### Imports #####################################
 # Libraries
 import os
+import time
 import pickle
+import threading
 import numpy as np
 import cv2
 
 import onnxruntime as ort
 
 from insightface.model_zoo import get_model
-from insightface.utils import face_align
 
 # Modules
 import config
 from modules.utils import log
+from modules.alignment import FaceAligner
+from modules.gallery import Gallery, merge_compact
 
 ###################################################################################
 
@@ -37,57 +40,172 @@ class TurretRecognizer:
             log(f"Failed to load ArcFace: {e}", "ERROR")
             raise
 
-        self.db_ = []
+        self.aligner = FaceAligner()
+        self.blob_ = np.zeros((8, 3, 112, 112), dtype=np.float32) # reusable ArcFace input batch
+        self.pool_ = None # optional InferencePool, ArcFace batches then run in its worker processes
+
+        # Gallery snapshot, replaced as a whole (never mutated) so identify never sees a half-updated one
+        self.gallery = Gallery.from_entries([])
+        self.gallery_version = 0 # bumped on every hot-reload swap
+        self.gallery_mtimes_ = {}
         self.load_database(model_name)
 
-    def load_database(self, model_name):
-        db_path = os.path.join("assets/faces/embeddings", f"{model_name}_encodings.pkl")
+        self.watcher_ = None
+        if config.GALLERY_WATCH_INTERVAL > 0:
+            self.start_watching(config.GALLERY_WATCH_INTERVAL)
+
+    def _gallery_paths(self):
+        """ (compact .npz, enrollment pickle). The compacted gallery (compact_gallery.py) is a cache of the pickle """
+        base = os.path.join("assets", "faces", "embeddings", self.model_name_)
+        return f"{base}_gallery.npz", f"{base}_encodings.pkl"
+
+    def _read_mtimes(self):
+        return {path: os.path.getmtime(path) for path in self._gallery_paths() if os.path.exists(path)}
+
+    def _build_gallery(self, current):
+        """
+        Builds the gallery the files on disk describe, without touching self.
+        Pickle rows already in `current` are reused, only new enrollments get stacked (incremental);
+        anything else (removed rows) is a full load. With a compact .npz, see _merge_compact.
+        """
+        gallery_path, db_path = self._gallery_paths()
+        entries = None
         if os.path.exists(db_path):
             with open(db_path, "rb") as f:
-                self.db_ = pickle.load(f)
-            log(f"Loaded {len(self.db_)} embeddings for {model_name}", "INFO")
-        else:
+                entries = pickle.load(f)
+
+        if os.path.exists(gallery_path):
+            return self._merge_compact(Gallery.load(gallery_path), entries, gallery_path, db_path)
+
+        if entries is None:
             log(f"No database found at {db_path}", "WARNING")
+            return Gallery.from_entries([])
 
-    def identify(self, full_frame, landmarks):
+        known = set(current.origins)
+        disk_origins = {entry["origin"] for entry in entries}
+        if current.storage == "float32" and known and known <= disk_origins:
+            new_entries = [entry for entry in entries if entry["origin"] not in known]
+            return current.extended(Gallery.from_entries(new_entries)) if new_entries else current
+
+        return Gallery.from_entries(entries)
+
+    def _merge_compact(self, compact, entries, gallery_path, db_path):
+        """ The compact gallery brought up to date with the pickle, see gallery.merge_compact """
+        if entries is None:
+            return compact
+
+        if compact.sources is None:
+            # Written before sources were recorded: a pickle older than the npz is fully covered by it
+            covered = os.path.getmtime(db_path) <= os.path.getmtime(gallery_path)
+            compact.sources = compact.origins + ([entry["origin"] for entry in entries] if covered else [])
+
+        return merge_compact(compact, entries)
+
+    def load_database(self, model_name):
+        self.model_name_ = model_name
+        self.gallery_mtimes_ = self._read_mtimes()
+        self.gallery = self._build_gallery(Gallery.from_entries([]))
+        log(f"Loaded {len(self.gallery)} embeddings ({self.gallery.storage}) for {model_name}", "INFO")
+
+    ###################################################################################
+    #                                 HOT RELOAD
+    ###################################################################################
+
+    def start_watching(self, interval):
+        """ Polls the embedding store from a daemon thread and swaps in new galleries as they appear """
+        self.watcher_ = threading.Thread(target=self._watch, args=(interval,), name="GalleryWatcher", daemon=True)
+        self.watcher_.start()
+
+    def _watch(self, interval):
+        failed = None # mtimes of a store that would not load, retried only once it changes again
+        while True:
+            time.sleep(interval)
+            mtimes = self._read_mtimes()
+            if mtimes == self.gallery_mtimes_ or mtimes == failed:
+                continue
+
+            try:
+                gallery = self._build_gallery(self.gallery)
+            except Exception as e:
+                log(f"Gallery reload failed, keeping the current one: {e}", "WARNING")
+                failed = mtimes
+                continue
+
+            self.gallery_mtimes_ = mtimes
+            if gallery is self.gallery or gallery.same_content(self.gallery):
+                continue
+
+            added = len(gallery) - len(self.gallery)
+            self.gallery = gallery # single reference swap, in-flight identify calls keep their snapshot
+            self.gallery_version += 1
+            log(f"Gallery hot-reloaded (v{self.gallery_version}): {len(gallery)} faces ({added:+d})", "INFO")
+
+    def _arcface(self, faces):
+        """ (N, 112, 112, 3) aligned BGR faces -> (N, 512) unit embeddings, one session run """
+        n = len(faces)
+        if n > len(self.blob_):
+            self.blob_ = np.zeros((max(n, 2 * len(self.blob_)),) + self.blob_.shape[1:], dtype=np.float32)
+
+        # Same preprocessing as ArcFaceONNX.get_feat: RGB, (x - mean) / std, NCHW, into the reused blob
+        blob = self.blob_[:n]
+        np.subtract(faces.transpose(0, 3, 1, 2)[:, ::-1], self.rec_model.input_mean, out=blob, casting="unsafe")
+        blob *= 1.0 / self.rec_model.input_std
+
+        raw_embeddings = self.rec_model.session.run(self.rec_model.output_names, {self.rec_model.input_name: blob})[0]
+        return raw_embeddings / np.linalg.norm(raw_embeddings, axis=1, keepdims=True)
+
+    def attach_pool(self, pool):
+        """ Routes ArcFace through an InferencePool (aligned faces go over shared memory) """
+        self.pool_ = pool
+
+    def embed_aligned(self, faces):
+        """ (N, 112, 112, 3) aligned faces -> (N, 512) unit embeddings, in the pool's workers when one is attached """
+        if self.pool_ is not None:
+            return self.pool_.embed(faces)
+        return self._arcface(faces)
+
+    def embed(self, full_frame, landmarks):
+        """ (N, 5, 2) landmarks -> (N, 512) unit embeddings, one ArcFace batch. Used as tracker appearance features """
+        if len(landmarks) == 0:
+            return np.empty((0, 512), dtype=np.float32)
+        return self.embed_aligned(self.aligner.align(full_frame, landmarks))
+
+    def identify_batch(self, full_frame, landmarks):
+        """
+        (N, 5, 2) landmarks -> list of N (name, {origin: distance} debug scores, aligned face, unit embedding).
+        Alignment, ArcFace and the gallery search each run once for the whole batch.
+        """
         empty_img = np.array([], dtype=np.uint8) # no image placeholder
+        gallery = self.gallery # one snapshot for the whole batch, a hot-reload swap can happen any time
 
-        # 1. Alignment
+        # 1. Alignment (vectorized transform estimate, warped into the aligner's batch buffer)
         try:
-            aligned_face = face_align.norm_crop(full_frame, landmark=landmarks)
+            aligned_faces = self.aligner.align(full_frame, landmarks)
         except Exception as e:
             log(f"Alignment failed: {e}", "WARNING")
-            return "Unknown", {}, empty_img
+            return [("Unknown", {}, empty_img, None)] * len(landmarks)
 
-        # 2. ArcFace Feature Extraction
-        raw_embedding = self.rec_model.get_feat(aligned_face)
-        
-        # 3. Normalization (Unit Vector for Cosine Similarity)
-        norm = np.linalg.norm(raw_embedding)
-        current_embedding = raw_embedding / norm
-
-        # 4. Database Comparison (Cosine Similarity)
-        best_name = "Unknown"
-        min_dist = 1.0
-        debug_distances = {}
-
-        for entry in self.db_:
-            # Dot product of normalized vectors = Cosine Similarity
-            curr_vec = current_embedding.flatten()
-            db_vec = entry["embedding"].flatten()
-
-            similarity = np.dot(curr_vec, db_vec)
-            dist = float(1.0 - similarity.item())
-            
-            origin_key = entry["origin"] 
-            debug_distances[origin_key] = round(dist, 4)
-            
-            if dist < min_dist:
-                min_dist = dist
-                best_name = entry["name"]
+        # 2. ArcFace Feature Extraction + Normalization (Unit Vector for Cosine Similarity)
+        embeddings = self.embed_aligned(aligned_faces)
 
-        # 5. Threshold Verification
-        if min_dist > self.threshold_:
-            return "Unknown", debug_distances, aligned_face
-        
-        return best_name, debug_distances, aligned_face
\ No newline at end of file
+        # 3. Database Comparison (Cosine Similarity), dot product of normalized vectors for all pairs
+        all_distances = gallery.distances(embeddings)
+
+        results = []
+        for aligned_face, embedding, distances in zip(aligned_faces, embeddings, all_distances):
+            debug_distances = {origin: round(float(d), 4) for origin, d in zip(gallery.origins, distances)}
+
+            best_idx = int(np.argmin(distances)) if len(distances) else -1
+            min_dist = float(distances[best_idx]) if best_idx >= 0 else 1.0
+
+            # 4. Threshold Verification
+            name = gallery.names[best_idx] if best_idx >= 0 and min_dist <= self.threshold_ else "Unknown"
+
+            # aligned_face is a view into the aligner buffer, the UI keeps it so copy
+            results.append((name, debug_distances, aligned_face.copy(), embedding))
+
+        return results
+
+    def identify(self, full_frame, landmarks):
+        """ Returns name, {origin: distance} debug scores, aligned face and the unit embedding (None on failure) """
+        return self.identify_batch(full_frame, np.asarray(landmarks)[None])[0]
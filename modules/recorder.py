@@ -0,0 +1,247 @@
+# modules/recorder.py
+
+##################################### Imports #####################################
+# Libraries
+import os
+import json
+import time
+import queue
+import threading
+from collections import deque
+import cv2
+import numpy as np
+
+# Modules
+import config
+from modules.utils import log
+
+###################################################################################
+
+# Append-only tables, one file per column (<table>.<column>.bin), every row keyed by the frame sequence number
+TABLES = {
+    "frames": {"seq": "<i8", "time": "<f8", "tracks": "<i4", "locked_id": "<i4", "firing": "|u1", "frozen": "|u1"},
+    "tracks": {"seq": "<i8", "id": "<i4", "x1": "<i4", "y1": "<i4", "x2": "<i4", "y2": "<i4",
+               "distance": "<f4", "name": "<i4", "affiliation": "<i4"},
+    "timings": {"seq": "<i8", "stage": "<i4", "ms": "<f4"},
+    "video": {"seq": "<i8", "index": "<i4"},    # only the frames that made it into video.avi
+}
+
+VIDEO_FILE = "video.avi"
+META_FILE = "session.json"
+STRINGS_FILE = "strings.txt"
+
+##################################################################################
+#                               Columnar Storage
+##################################################################################
+
+class ColumnTable:
+    """ Append-only table stored column by column, so one column loads with a single np.fromfile """
+
+    def __init__(self, directory, table, columns):
+        self.dtype_ = np.dtype(list(columns.items()))
+        self.files_ = {col: open(os.path.join(directory, f"{table}.{col}.bin"), "wb") for col in columns}
+
+    def append(self, rows):
+        if not rows:
+            return
+        records = np.array(rows, dtype=self.dtype_)
+        for col, f in self.files_.items():
+            np.ascontiguousarray(records[col]).tofile(f)
+
+    def flush(self):
+        for f in self.files_.values():
+            f.flush()
+
+    def close(self):
+        for f in self.files_.values():
+            f.close()
+
+
+class StringTable:
+    """ Names / stage labels stored once as int codes, code = line number of strings.txt (append-only) """
+
+    def __init__(self, directory):
+        self.codes_ = {}
+        self.file_ = open(os.path.join(directory, STRINGS_FILE), "w", encoding="utf-8")
+
+    def code(self, text):
+        if text is None:
+            return -1
+        code = self.codes_.get(text)
+        if code is None:
+            code = self.codes_[text] = len(self.codes_)
+            self.file_.write(text.replace("\n", " ") + "\n")
+        return code
+
+    def close(self):
+        self.file_.close()
+
+
+def load_table(directory, table):
+    """ {column: array} of a recorded table. Columns are cut to the shortest one (a crash can leave a partial row) """
+    columns = {col: np.fromfile(os.path.join(directory, f"{table}.{col}.bin"), dtype=dtype)
+               for col, dtype in TABLES[table].items()}
+    rows = min(len(values) for values in columns.values())
+    return {col: values[:rows] for col, values in columns.items()}
+
+
+def load_session(directory):
+    """ Everything a recorded session holds except the video: meta, strings and all tables """
+    with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    with open(os.path.join(directory, STRINGS_FILE), encoding="utf-8") as f:
+        strings = f.read().splitlines()
+    return {"meta": meta, "strings": strings, "tables": {table: load_table(directory, table) for table in TABLES}}
+
+
+##################################################################################
+#                               Recorder
+##################################################################################
+
+class SessionRecorder:
+    """
+    Records a running session without ever stalling the frame loop.
+    The loop only copies an accepted frame into a bounded queue and appends its report to a deque,
+    a background thread does the video encoding and the column writes.
+    When the disk falls behind and the queue is full, frames are dropped (counted) while reports are always kept:
+      "drop_new": the incoming frame is skipped, the queued backlog is written as is
+      "drop_old": the oldest queued frame is evicted, the video stays as recent as possible
+    """
+
+    FOURCC = "MJPG" # cheap to encode, every OpenCV build can write and read it
+
+    def __init__(self, directory, fps=config.FPS, queue_size=config.RECORD_QUEUE_SIZE, drop_policy=config.RECORD_DROP_POLICY):
+        if drop_policy not in ("drop_new", "drop_old"):
+            raise ValueError(f"Unknown drop policy '{drop_policy}'")
+
+        # One session per folder: codes, seq and video all restart, appending to an old session would corrupt it
+        if os.path.isdir(directory) and os.listdir(directory):
+            raise FileExistsError(f"Session folder {directory} is not empty, record into a new one")
+        os.makedirs(directory, exist_ok=True)
+        self.directory_ = directory
+        self.fps_ = fps
+        self.drop_policy_ = drop_policy
+
+        self.frames_ = queue.Queue(maxsize=queue_size)
+        self.reports_ = deque()
+        self.writer_ = None
+        self.tables_ = {table: ColumnTable(directory, table, columns) for table, columns in TABLES.items()}
+        self.strings_ = StringTable(directory)
+
+        self.counters = {"frames_submitted": 0, "frames_written": 0, "frames_dropped": 0,
+                         "reports_written": 0, "queue_high_water": 0}
+        self.meta_ = {"started": time.time(), "fps": fps, "fourcc": self.FOURCC, "video": VIDEO_FILE,
+                      "drop_policy": drop_policy, "queue_size": queue_size, "tables": TABLES}
+        self._write_meta()
+
+        self.stopped_ = threading.Event()
+        self.thread_ = threading.Thread(target=self._run, name="SessionRecorder", daemon=True)
+        self.thread_.start()
+
+        log(f"Recording session to {directory} ({drop_policy}, queue {queue_size})", "INFO")
+
+    def _write_meta(self):
+        with open(os.path.join(self.directory_, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({**self.meta_, "counters": self.counters}, f, indent=2)
+
+    ###################################################################################
+    #                                 PRODUCER SIDE (frame loop)
+    ###################################################################################
+
+    def submit_frame(self, seq, frame):
+        """ Queues a clean (undrawn) frame. Never blocks, copies only when the frame is accepted """
+        self.counters["frames_submitted"] += 1
+
+        if self.frames_.full():
+            if self.drop_policy_ == "drop_new":
+                self.counters["frames_dropped"] += 1
+                return False
+            try:
+                self.frames_.get_nowait()
+                self.counters["frames_dropped"] += 1
+            except queue.Empty:
+                pass
+
+        try:
+            self.frames_.put_nowait((seq, frame.copy()))
+        except queue.Full:
+            self.counters["frames_dropped"] += 1
+            return False
+
+        self.counters["queue_high_water"] = max(self.counters["queue_high_water"], self.frames_.qsize())
+        return True
+
+    def submit_report(self, report):
+        """ Per-frame pipeline report, tiny, so it is always kept """
+        self.reports_.append(report)
+
+    def stats(self):
+        return dict(self.counters, queued=self.frames_.qsize())
+
+    ###################################################################################
+    #                                 CONSUMER SIDE (writer thread)
+    ###################################################################################
+
+    def _write_frame(self, seq, frame):
+        if self.writer_ is None:
+            h, w = frame.shape[:2]
+            path = os.path.join(self.directory_, VIDEO_FILE)
+            self.writer_ = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.FOURCC), self.fps_, (w, h))
+            self.meta_["frame_size"] = [w, h]
+
+        self.writer_.write(frame)
+        self.tables_["video"].append([(seq, self.counters["frames_written"])])
+        self.counters["frames_written"] += 1
+
+    def _write_reports(self):
+        frames, tracks, timings = [], [], []
+        while self.reports_:
+            r = self.reports_.popleft()
+            seq = r["seq"]
+            locked = -1 if r["locked_id"] is None else r["locked_id"]
+            frames.append((seq, r["time"], len(r["tracks"]), locked, r["firing"], r["frozen"]))
+            tracks.extend((seq, t["id"], *t["box"], t["distance"], self.strings_.code(t["name"]),
+                           self.strings_.code(t["affiliation"])) for t in r["tracks"])
+            timings.extend((seq, self.strings_.code(stage), ms) for stage, ms in r["timings"].items())
+
+        self.tables_["frames"].append(frames)
+        self.tables_["tracks"].append(tracks)
+        self.tables_["timings"].append(timings)
+        self.counters["reports_written"] += len(frames)
+
+    def _run(self):
+        last_flush = time.time()
+        while not (self.stopped_.is_set() and self.frames_.empty()):
+            try:
+                self._write_frame(*self.frames_.get(timeout=0.1))
+            except queue.Empty:
+                pass
+
+            if self.reports_:
+                self._write_reports()
+
+            # Flush about once a second, a crash loses at most that much
+            if time.time() - last_flush > 1.0:
+                for table in self.tables_.values():
+                    table.flush()
+                last_flush = time.time()
+
+        self._write_reports()
+
+    def close(self):
+        """ Drains the queue, finalizes the video and writes the counters into session.json """
+        self.stopped_.set()
+        self.thread_.join()
+
+        if self.writer_ is not None:
+            self.writer_.release()
+        for table in self.tables_.values():
+            table.close()
+        self.strings_.close()
+
+        self.meta_["stopped"] = time.time()
+        self._write_meta()
+
+        c = self.counters
+        log(f"Session recorded: {c['frames_written']} frames written, {c['frames_dropped']} dropped, "
+            f"{c['reports_written']} reports", "INFO")
@@ -0,0 +1,68 @@
+# modules/resolution.py
+
+##################################### Imports #####################################
+# Libraries
+import cv2
+import numpy as np
+
+# Modules
+import config
+
+###################################################################################
+
+class DualResolution:
+    """
+    One frame at two resolutions: the full camera frame (recognition samples its aligned crops from it)
+    and a downscaled working copy for detection and tracking (incl. BoT-SORT's ReID crops and CMC).
+    SCRFD letterboxes to 640 anyway, so at scale 0.5 a 1280x720 frame gives the detector the exact same input.
+
+    Every coordinate crossing between the two lives here: detector output and tracker output
+    go through to_full() / tracks_to_full() once, everything after the tracker works in full-resolution pixels.
+    """
+
+    def __init__(self, scale=config.DETECT_SCALE):
+        self.scale_ = float(scale)
+        self.small_ = None # preallocated working copy, reused while the frame size stays the same
+
+    @property
+    def enabled(self):
+        return self.scale_ < 1.0
+
+    def downscale(self, frame):
+        """ Working copy for detection / tracking, frame itself at scale 1 """
+        if not self.enabled:
+            return frame
+
+        h, w = frame.shape[:2]
+        size = (max(1, int(round(w * self.scale_))), max(1, int(round(h * self.scale_))))
+        if self.small_ is None or self.small_.shape[1::-1] != size:
+            self.small_ = np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+        cv2.resize(frame, size, dst=self.small_, interpolation=cv2.INTER_AREA)
+
+        # Exact per-axis factors of the rounded size, used for the mapping back
+        self.fx_, self.fy_ = w / size[0], h / size[1]
+        return self.small_
+
+    def to_full(self, boxes, landmarks, distances):
+        """
+        Detector output on the working copy -> full-resolution (N, 6) boxes and (N, 5, 2) landmarks.
+        IPD distances scale too: they are inversely proportional to the eye distance in pixels
+        """
+        if not self.enabled or len(boxes) == 0:
+            return boxes, landmarks, distances
+
+        boxes = np.array(boxes, dtype=float)
+        boxes[:, [0, 2]] *= self.fx_
+        boxes[:, [1, 3]] *= self.fy_
+        landmarks = np.asarray(landmarks, dtype=float) * (self.fx_, self.fy_)
+        distances = [None if d is None else round(d / self.fx_, 1) for d in distances]
+        return boxes, landmarks, distances
+
+    def tracks_to_full(self, tracks):
+        """ Tracker record array (modules.tracker.TRACK_DTYPE) on the working copy -> full-resolution pixels, in place """
+        if not self.enabled or len(tracks) == 0:
+            return tracks
+
+        tracks["box"] = tracks["box"] * (self.fx_, self.fy_, self.fx_, self.fy_)
+        tracks["center"] = tracks["center"] * (self.fx_, self.fy_)
+        return tracks
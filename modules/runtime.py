@@ -0,0 +1,67 @@
+# modules/runtime.py
+
+##################################### Imports #####################################
+# Libraries
+import numpy as np
+import onnxruntime as ort
+
+# Modules
+import config
+from modules.utils import log
+
+###################################################################################
+
+##################################################################################
+#                               ONNX Sessions
+##################################################################################
+
+def create_session(model_path):
+    """
+    Shared onnxruntime session factory so every model we own directly (detectors, recognizer paths)
+    runs with the same providers and threading setup.
+    """
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if config.ORT_INTRA_OP_THREADS > 0:
+        options.intra_op_num_threads = config.ORT_INTRA_OP_THREADS
+
+    providers = ['CUDAExecutionProvider', 'CPUExecutionProvider'] if config.RUN_ON_GPU else ['CPUExecutionProvider']
+    session = ort.InferenceSession(model_path, sess_options=options, providers=providers)
+
+    log(f"ONNX session ready: {model_path} ({session.get_providers()[0]})", "INFO")
+    return session
+
+
+##################################################################################
+#                               Post-processing
+##################################################################################
+
+def nms(dets, thresh, offset=1.0):
+    """
+    Greedy NMS over (N, 5+) [x1, y1, x2, y2, score, ...] rows, returns kept row indices (score order).
+    offset=1 is insightface's +1 area convention (SCRFD outputs match box for box), 0 is torchvision's (YOLO).
+    The IoU matrix is built once, the greedy pass only flips a boolean mask.
+    """
+    if len(dets) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    x1, y1, x2, y2 = dets[:, 0], dets[:, 1], dets[:, 2], dets[:, 3]
+    areas = (x2 - x1 + offset) * (y2 - y1 + offset)
+    order = dets[:, 4].argsort()[::-1]
+
+    xx1 = np.maximum(x1[order, None], x1[None, order])
+    yy1 = np.maximum(y1[order, None], y1[None, order])
+    xx2 = np.minimum(x2[order, None], x2[None, order])
+    yy2 = np.minimum(y2[order, None], y2[None, order])
+    inter = np.maximum(0.0, xx2 - xx1 + offset) * np.maximum(0.0, yy2 - yy1 + offset)
+    iou = inter / (areas[order, None] + areas[None, order] - inter)
+
+    suppressed = np.zeros(len(order), dtype=bool)
+    keep = []
+    for i in range(len(order)):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        suppressed |= iou[i] > thresh
+
+    return order[keep]
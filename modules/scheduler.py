@@ -0,0 +1,156 @@
+# modules/scheduler.py
+
+##################################### Imports #####################################
+# Libraries
+import time
+from collections import deque
+
+# Modules
+import config
+from modules.utils import log
+
+###################################################################################
+
+# Pipeline stages (StageTimer laps) each shedding step saves on, used to predict the cost of undoing it
+STEP_STAGES = {
+    "defer_recognition": ("recognize",),
+    "lower_resolution": ("detect",),
+    "skip_candidates": ("annotate",),
+    "skip_detection": ("detect", "track"),
+}
+
+
+class FrameScheduler:
+    """
+    Frame-budget load shedding. Fed the StageTimer laps of every frame, it keeps an EMA of each stage and of the whole frame.
+
+    Overload (the frame EMA above budget for SHED_OVERLOAD_FRAMES frames in a row) activates the next step of the
+    policy, one at a time, until the frame fits again or every step is active. The last active step is undone once
+    the frame would fit without it for SHED_RECOVER_FRAMES frames (below SHED_HEADROOM of the budget). What its
+    stages would cost without it = their cost now / the reduction measured SHED_OVERLOAD_FRAMES frames after it
+    took effect, so a load that dropped while shedding is seen as dropped. Steps come back in reverse order.
+
+    The scheduler only decides, SentryPipeline applies the steps. Every change is kept in events (and logged).
+    """
+
+    def __init__(self, budget_ms=None, policy=config.SHED_POLICY, overload_frames=config.SHED_OVERLOAD_FRAMES,
+                 recover_frames=config.SHED_RECOVER_FRAMES, headroom=config.SHED_HEADROOM, alpha=0.2):
+        unknown = set(policy) - set(STEP_STAGES)
+        if unknown:
+            raise ValueError(f"Unknown shedding steps {sorted(unknown)}, options: {list(STEP_STAGES)}")
+
+        self.policy_ = tuple(policy)
+        self.overload_frames_ = overload_frames
+        self.recover_frames_ = recover_frames
+        self.headroom_ = headroom
+        self.alpha_ = alpha
+
+        self.stage_ms_ = {}     # {stage: EMA ms}, 0 on frames that skip the stage
+        self.frame_ms_ = 0.0    # EMA of the whole frame
+        self.shed_ = {}         # {step: [cost of its stages before, measured cost ratio after (None until known), frames active]}
+        self.level = 0          # active steps = policy[:level]
+        self.over_ = 0          # consecutive frames over budget
+        self.under_ = 0         # consecutive frames that would fit without the last step
+        self.events = deque(maxlen=256) # every shed / restore, newest last
+        self.set_budget(budget_ms if budget_ms is not None else config.SHED_BUDGET_MS or 1000.0 / config.FPS)
+
+    def set_budget(self, budget_ms):
+        """ Frame budget in ms, 0 turns shedding off (flat-out runs have no deadline). Returns the steps that got undone """
+        self.budget_ms_ = float(budget_ms)
+        restored = []
+        if not self.enabled:
+            while self.level:
+                restored.append(self._step(-1, "shedding off")["step"])
+        return restored
+
+    @property
+    def enabled(self):
+        return self.budget_ms_ > 0 and len(self.policy_) > 0
+
+    def active(self, step):
+        return step in self.policy_[:self.level]
+
+    def active_steps(self):
+        return list(self.policy_[:self.level])
+
+    def skips_detection(self, frame_seq):
+        """ skip_detection: detect on every SHED_DETECT_EVERY-th frame only """
+        return self.active("skip_detection") and frame_seq % config.SHED_DETECT_EVERY != 0
+
+    ###################################################################################
+    #                                 MAIN LOGIC
+    ###################################################################################
+
+    def _ema(self, old, new):
+        return old + self.alpha_ * (new - old)
+
+    def _stage_cost(self, step):
+        return sum(self.stage_ms_.get(s, 0.0) for s in STEP_STAGES[step])
+
+    def _predicted_without(self, step):
+        """ Frame EMA with the step's stages back at full cost """
+        before, ratio, _ = self.shed_[step]
+        now = self._stage_cost(step)
+        full = before if ratio is None else now / ratio
+        return self.frame_ms_ - now + full
+
+    def _step(self, direction, reason):
+        if direction > 0:
+            step = self.policy_[self.level]
+            self.shed_[step] = [self._stage_cost(step), None, 0]
+            self.level += 1
+        else:
+            self.level -= 1
+            step = self.policy_[self.level]
+            self.shed_.pop(step, None)
+        self.over_ = self.under_ = 0 # the next decision waits for the EMA to reflect this one
+
+        event = {
+            "time": time.time(),
+            "action": "shed" if direction > 0 else "restore",
+            "step": step,
+            "level": self.level,
+            "reason": reason,
+            "frame_ms": round(self.frame_ms_, 2),
+            "budget_ms": round(self.budget_ms_, 2),
+            "stages": {stage: round(ms, 2) for stage, ms in self.stage_ms_.items()},
+        }
+        self.events.append(event)
+        log(f"LOAD SHEDDING: {event['action']} {step} (level {self.level}/{len(self.policy_)}, {reason})",
+            "WARNING" if direction > 0 else "INFO")
+        return event
+
+    def end_frame(self, timings):
+        """ {stage: ms} of the finished frame. Returns the shed / restore event when the level changed, None otherwise """
+        for stage in set(self.stage_ms_) | set(timings):
+            self.stage_ms_[stage] = self._ema(self.stage_ms_.get(stage, 0.0), timings.get(stage, 0.0))
+        self.frame_ms_ = self._ema(self.frame_ms_, sum(timings.values()))
+
+        # Reduction each step brought, measured once the EMA has settled after it took effect
+        for step, entry in self.shed_.items():
+            entry[2] += 1
+            if entry[2] == self.overload_frames_ and entry[0] > 0:
+                entry[1] = min(1.0, max(self._stage_cost(step), 1e-3) / entry[0])
+
+        if not self.enabled:
+            return None
+
+        if self.frame_ms_ > self.budget_ms_:
+            self.over_ += 1
+            self.under_ = 0
+            if self.over_ >= self.overload_frames_ and self.level < len(self.policy_):
+                return self._step(+1, f"{self.frame_ms_:.1f} ms > {self.budget_ms_:.1f} ms budget")
+            return None
+
+        self.over_ = 0
+        if self.level == 0:
+            return None
+
+        predicted = self._predicted_without(self.policy_[self.level - 1])
+        if predicted < self.headroom_ * self.budget_ms_:
+            self.under_ += 1
+            if self.under_ >= self.recover_frames_:
+                return self._step(-1, f"~{predicted:.1f} ms without it")
+        else:
+            self.under_ = 0
+        return None
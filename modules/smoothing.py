@@ -0,0 +1,209 @@
+# modules/smoothing.py
+
+##################################### Imports #####################################
+# Libraries
+import numpy as np
+from abc import ABC, abstractmethod
+
+# Modules
+import config
+
+###################################################################################
+
+##################################################################################
+#                               Smoother Blueprint
+##################################################################################
+
+class BaseSmoother(ABC):
+    """
+    Box filters keep their state in (capacity, ...) arrays indexed by TrackTable slot,
+    so one update() call filters every track of the frame with O(1) work per track.
+    """
+
+    def __init__(self, capacity):
+        self.capacity_ = 0
+        self.resize(capacity)
+
+    @abstractmethod
+    def resize(self, capacity):
+        """ Grows the state arrays, existing rows must be kept """
+        pass
+
+    @abstractmethod
+    def reset(self, slots):
+        """ Forgets the state of freed slots """
+        pass
+
+    @abstractmethod
+    def update(self, slots, boxes, timestamp):
+        """ Feeds one raw (N, 4) box per slot, returns the (N, 4) smoothed boxes """
+        pass
+
+    @staticmethod
+    def _grow(arr, capacity, fill=0.0):
+        """ Copies arr into a bigger array along axis 0 """
+        new = np.full((capacity,) + arr.shape[1:], fill, dtype=arr.dtype)
+        new[:len(arr)] = arr
+        return new
+
+
+##################################################################################
+#                               Moving Average (running sum)
+##################################################################################
+
+class MovingAverageSmoother(BaseSmoother):
+    """ Windowed mean, kept as a running sum: add the newest box, subtract the one falling out """
+
+    def __init__(self, capacity, window=config.BOX_WINDOW_SIZE):
+        self.window_ = window
+        super().__init__(capacity)
+
+    def resize(self, capacity):
+        if self.capacity_ == 0:
+            self.ring = np.zeros((capacity, self.window_, 4), dtype=float)
+            self.sum = np.zeros((capacity, 4), dtype=float)
+            self.head = np.zeros(capacity, dtype=np.intp)
+            self.count = np.zeros(capacity, dtype=np.intp)
+        else:
+            self.ring = self._grow(self.ring, capacity)
+            self.sum = self._grow(self.sum, capacity)
+            self.head = self._grow(self.head, capacity, 0)
+            self.count = self._grow(self.count, capacity, 0)
+        self.capacity_ = capacity
+
+    def reset(self, slots):
+        self.ring[slots] = 0.0
+        self.sum[slots] = 0.0
+        self.head[slots] = 0
+        self.count[slots] = 0
+
+    def update(self, slots, boxes, timestamp):
+        head = self.head[slots]
+
+        # Oldest entry is zero until the ring is full, so the subtraction is always valid
+        self.sum[slots] += boxes - self.ring[slots, head]
+        self.ring[slots, head] = boxes
+
+        self.head[slots] = (head + 1) % self.window_
+        self.count[slots] = np.minimum(self.count[slots] + 1, self.window_)
+
+        return self.sum[slots] / self.count[slots, None]
+
+
+##################################################################################
+#                               Exponential Moving Average
+##################################################################################
+
+class EMASmoother(BaseSmoother):
+    """ Same filter the legacy main.py loop uses (0.1 = very smooth/slow, 0.9 = jerky/fast) """
+
+    def __init__(self, capacity, alpha=config.BOX_EMA_ALPHA):
+        self.alpha_ = alpha
+        super().__init__(capacity)
+
+    def resize(self, capacity):
+        if self.capacity_ == 0:
+            self.state = np.zeros((capacity, 4), dtype=float)
+            self.primed = np.zeros(capacity, dtype=bool)
+        else:
+            self.state = self._grow(self.state, capacity)
+            self.primed = self._grow(self.primed, capacity, False)
+        self.capacity_ = capacity
+
+    def reset(self, slots):
+        self.state[slots] = 0.0
+        self.primed[slots] = False
+
+    def update(self, slots, boxes, timestamp):
+        # First sample of a track initializes the filter instead of dragging it from zero
+        primed = self.primed[slots, None]
+        prev = np.where(primed, self.state[slots], boxes)
+
+        smoothed = prev + self.alpha_ * (boxes - prev)
+        self.state[slots] = smoothed
+        self.primed[slots] = True
+
+        return smoothed
+
+
+##################################################################################
+#                               One-Euro Filter
+##################################################################################
+
+class OneEuroSmoother(BaseSmoother):
+    """
+    Adaptive low-pass (Casiez et al. 2012): heavy smoothing while a face is still,
+    cutoff rises with speed so moving faces are followed with little lag.
+    """
+
+    def __init__(self, capacity, min_cutoff=config.ONE_EURO_MIN_CUTOFF,
+                 beta=config.ONE_EURO_BETA, d_cutoff=config.ONE_EURO_D_CUTOFF):
+        self.min_cutoff_ = min_cutoff
+        self.beta_ = beta
+        self.d_cutoff_ = d_cutoff
+        super().__init__(capacity)
+
+    def resize(self, capacity):
+        if self.capacity_ == 0:
+            self.x_prev = np.zeros((capacity, 4), dtype=float)
+            self.dx_prev = np.zeros((capacity, 4), dtype=float)
+            self.t_prev = np.zeros(capacity, dtype=float)
+            self.primed = np.zeros(capacity, dtype=bool)
+        else:
+            self.x_prev = self._grow(self.x_prev, capacity)
+            self.dx_prev = self._grow(self.dx_prev, capacity)
+            self.t_prev = self._grow(self.t_prev, capacity)
+            self.primed = self._grow(self.primed, capacity, False)
+        self.capacity_ = capacity
+
+    def reset(self, slots):
+        self.x_prev[slots] = 0.0
+        self.dx_prev[slots] = 0.0
+        self.t_prev[slots] = 0.0
+        self.primed[slots] = False
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2.0 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, slots, boxes, timestamp):
+        primed = self.primed[slots, None]
+        x_prev = np.where(primed, self.x_prev[slots], boxes)
+
+        # Guard against a zero/negative step (same timestamp twice, first sample)
+        dt = np.maximum(timestamp - self.t_prev[slots], 1e-3)[:, None]
+
+        # 1. Smoothed derivative
+        dx = np.where(primed, (boxes - x_prev) / dt, 0.0)
+        a_d = self._alpha(self.d_cutoff_, dt)
+        dx_hat = a_d * dx + (1.0 - a_d) * self.dx_prev[slots]
+
+        # 2. Speed-dependent cutoff, then the actual low-pass
+        cutoff = self.min_cutoff_ + self.beta_ * np.abs(dx_hat)
+        a = self._alpha(cutoff, dt)
+        smoothed = a * boxes + (1.0 - a) * x_prev
+
+        self.x_prev[slots] = smoothed
+        self.dx_prev[slots] = dx_hat
+        self.t_prev[slots] = timestamp
+        self.primed[slots] = True
+
+        return smoothed
+
+
+##################################################################################
+#                               Factory
+##################################################################################
+
+SMOOTHERS = {
+    "moving_average": MovingAverageSmoother,
+    "ema": EMASmoother,
+    "one_euro": OneEuroSmoother,
+}
+
+def create_smoother(name, capacity):
+    """ config.BOX_SMOOTHER -> smoother instance """
+    if name not in SMOOTHERS:
+        raise ValueError(f"Unknown smoother '{name}', pick one of {list(SMOOTHERS)}")
+    return SMOOTHERS[name](capacity)
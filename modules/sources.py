@@ -0,0 +1,155 @@
+# modules/sources.py
+
+##################################### Imports #####################################
+# Libraries
+import os
+import time
+import cv2
+from abc import ABC, abstractmethod
+
+# Modules
+from modules.utils import log
+from modules.recorder import VIDEO_FILE, META_FILE, load_table
+
+###################################################################################
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+##################################################################################
+#                               Source Blueprint
+##################################################################################
+
+class FrameSource(ABC):
+    """ Anything the pipeline can pull frames from. read() returns a BGR frame, or None once a finite source is exhausted """
+
+    @abstractmethod
+    def read(self):
+        pass
+
+    def release(self):
+        pass
+
+
+##################################################################################
+#                               Sources
+##################################################################################
+
+class CameraSource(FrameSource):
+    """ Live webcam through the threaded CameraStream, read() always hands out the newest frame """
+
+    def __init__(self, index):
+        from modules.camera import CameraStream
+        self.stream_ = CameraStream(src=index).start()
+
+    def read(self):
+        return self.stream_.read()
+
+    def release(self):
+        self.stream_.stop()
+
+
+class VideoSource(FrameSource):
+    """ Video file decoded frame by frame, so every frame is processed (no drops like the live camera) """
+
+    def __init__(self, path, loop=False):
+        self.path_ = path
+        self.loop_ = loop
+        self.capture_ = cv2.VideoCapture(path)
+        if not self.capture_.isOpened():
+            raise FileNotFoundError(path)
+
+    def read(self):
+        ok, frame = self.capture_.read()
+        if not ok and self.loop_:
+            self.capture_.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture_.read()
+        return frame if ok else None
+
+    def release(self):
+        self.capture_.release()
+
+
+class ImageFolderSource(FrameSource):
+    """ Sorted still images of a directory, one per read() """
+
+    def __init__(self, path, loop=False):
+        self.files_ = sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        self.loop_ = loop
+        self.index_ = 0
+        if not self.files_:
+            raise FileNotFoundError(f"No images in {path}")
+
+    def read(self):
+        if self.index_ >= len(self.files_):
+            if not self.loop_:
+                return None
+            self.index_ = 0
+
+        frame = cv2.imread(self.files_[self.index_])
+        self.index_ += 1
+        return frame
+
+
+class ReplaySource(FrameSource):
+    """
+    Plays back a SessionRecorder folder. seq is the recorded frame sequence number of the last read() frame,
+    so results can be compared against the recorded tables. realtime replays at the recorded pace instead of flat out.
+    """
+
+    def __init__(self, directory, realtime=False, loop=False):
+        self.capture_ = cv2.VideoCapture(os.path.join(directory, VIDEO_FILE))
+        if not self.capture_.isOpened():
+            raise FileNotFoundError(os.path.join(directory, VIDEO_FILE))
+
+        video = load_table(directory, "video")
+        frames = load_table(directory, "frames")
+        self.seqs_ = video["seq"]
+        times = dict(zip(frames["seq"].tolist(), frames["time"].tolist()))
+        self.times_ = [times.get(seq) for seq in self.seqs_.tolist()]
+
+        self.realtime_ = realtime
+        self.loop_ = loop
+        self.index_ = 0
+        self.seq = None
+        self.clock_ = None # (wall clock, recorded time) of the first replayed frame
+
+    def read(self):
+        ok, frame = self.capture_.read()
+        if not ok and self.loop_:
+            self.capture_.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self.index_, self.clock_ = 0, None
+            ok, frame = self.capture_.read()
+        if not ok or self.index_ >= len(self.seqs_):
+            return None
+
+        self.seq = int(self.seqs_[self.index_])
+        recorded = self.times_[self.index_]
+        self.index_ += 1
+
+        # Sleep until this frame is due relative to the first one
+        if self.realtime_ and recorded is not None:
+            if self.clock_ is None:
+                self.clock_ = (time.perf_counter(), recorded)
+            wait = (recorded - self.clock_[1]) - (time.perf_counter() - self.clock_[0])
+            if wait > 0:
+                time.sleep(wait)
+
+        return frame
+
+    def release(self):
+        self.capture_.release()
+
+
+def open_source(spec, loop=False):
+    """ "0" (camera index), a video file, an image directory or a recorded session -> FrameSource """
+    if spec.isdigit():
+        source = CameraSource(int(spec))
+    elif os.path.isfile(os.path.join(spec, META_FILE)):
+        source = ReplaySource(spec, loop=loop)
+    elif os.path.isdir(spec):
+        source = ImageFolderSource(spec, loop)
+    else:
+        source = VideoSource(spec, loop)
+
+    log(f"Frame source: {type(source).__name__}({spec})", "INFO")
+    return source
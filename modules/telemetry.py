@@ -0,0 +1,42 @@
+# modules/telemetry.py
+
+##################################### Imports #####################################
+# Libraries
+import time
+import numpy as np
+
+###################################################################################
+
+class StageTimer:
+    """
+    Per-frame stage timings: start() at the top of the frame, lap(stage) after each stage.
+    Each lap records the ms since the previous mark, so stages add up to the frame time.
+    """
+
+    def __init__(self):
+        self.laps_ = {}
+        self.last_ = time.perf_counter()
+
+    def start(self):
+        self.laps_ = {}
+        self.last_ = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.laps_[stage] = self.laps_.get(stage, 0.0) + (now - self.last_) * 1000.0
+        self.last_ = now
+
+    def timings(self):
+        """ {stage: ms} of the current frame, rounded for publishing """
+        return {stage: round(ms, 3) for stage, ms in self.laps_.items()}
+
+
+def summarize_timings(timings_list):
+    """ List of per-frame {stage: ms} -> {stage: (mean, p50, p95)} over the frames that ran the stage """
+    stages = {}
+    for timings in timings_list:
+        for stage, ms in timings.items():
+            stages.setdefault(stage, []).append(ms)
+
+    return {stage: (float(np.mean(values)), float(np.percentile(values, 50)), float(np.percentile(values, 95)))
+            for stage, values in stages.items()}
@@ -8,7 +8,6 @@ from abc import ABC, abstractmethod
 from pathlib import Path
 
 from boxmot import BotSort, ByteTrack
-import torch
 
 # Modules
 import config
@@ -16,18 +15,45 @@ from modules.utils import log
 
 ###################################################################################
 
+# One row per confirmed track. Boxes / centers are int pixels, det_index is the row of the
+# raw detection BoxMOT matched it to (-1 when unknown)
+TRACK_DTYPE = np.dtype([
+    ("id", np.int64),
+    ("box", np.int32, 4),
+    ("center", np.int32, 2),
+    ("score", np.float32),
+    ("det_index", np.int32),
+])
+
+def empty_tracks():
+    return np.empty(0, dtype=TRACK_DTYPE)
+
 ##################################################################################
 #                              Tracker Blueprint
 ##################################################################################
 
 class BaseTracker(ABC):
     @abstractmethod
-    def update(self, frame):
+    def update(self, raw_detections, frame, landmarks=None):
         pass
 
-    @abstractmethod
     def _format_output(self, tracks):
-        pass
+        """ BoxMOT's (N, 8) [x1, y1, x2, y2, id, conf, cls, ind] array -> TRACK_DTYPE record array, no per-track python objects """
+        tracks = np.asarray(tracks, dtype=float)
+        if tracks.size == 0:
+            return empty_tracks()
+
+        out = np.empty(len(tracks), dtype=TRACK_DTYPE)
+        out["id"] = tracks[:, 4]
+        out["box"] = tracks[:, :4]
+        out["center"] = (tracks[:, :2] + tracks[:, 2:4]) / 2
+        out["score"] = tracks[:, 5]
+        out["det_index"] = tracks[:, 7] if tracks.shape[1] > 7 else -1
+        return out
+
+    def embedding_for(self, track_id):
+        """ Appearance embedding the tracker holds for an id, None unless it exposes one """
+        return None
 
 
 ##################################################################################
@@ -35,14 +61,21 @@ class BaseTracker(ABC):
 ##################################################################################
 
 class BoTSORTTracker(BaseTracker):
-    def __init__(self):
+    def __init__(self, embedding_provider=None, cmc=None):
+        """
+        embedding_provider: None runs BoxMOT's own OSNet ReID on every detection,
+        an ArcFaceEmbeddingProvider feeds it our cached face embeddings instead.
+        cmc: None keeps BoxMOT's config.CMC_METHOD mode, a modules.motion CMC replaces it.
+        """
         self.device = 0 if config.RUN_ON_GPU else 'cpu'
         model_path = os.path.join("assets", "models", "osnet_x0_25_msmt17.pt")
+        self.embedding_provider = embedding_provider
 
         self.tracker = BotSort(
             reid_weights=model_path, 
             device=self.device, 
             half=False,
+            with_reid=embedding_provider is None, # False skips loading OSNet entirely
 
             # --- Tweakable Parameters ---
             track_high_thresh=0.45, # Lower slightly so it's easier to START a track
@@ -52,30 +85,41 @@ class BoTSORTTracker(BaseTracker):
             match_thresh=0.5,     # Increase Re-ID weight to favor "look" over "position"
             proximity_thresh=0.5,  # Spatial distance threshold
             appearance_thresh=0.25, # Feature distance threshold
-            cmc_method='orb'       # Compensates for the turret's own movements
+            cmc_method=config.CMC_METHOD if cmc is None else 'orb' # Compensates for the turret's own movements
         )
 
-        log("Tracker: BoT-SORT Block Initialized.", "INFO")
+        if cmc is not None:
+            self.tracker.cmc = cmc # same apply(img, dets) interface, downscaled / masked / skipped while still
 
-    def update(self, raw_detections, frame):
-        if raw_detections is None or len(raw_detections) == 0:
-            tracks = self.tracker.update(np.empty((0, 6)), frame)
+        if embedding_provider is not None:
+            # BotSort only uses appearance when with_reid is set; with the model never loaded,
+            # we must always pass embs so it never falls back to self.model.get_features
+            self.tracker.with_reid = True
+            embedding_provider.min_score_ = self.tracker.track_high_thresh
+            log("Tracker: BoT-SORT Block Initialized (ArcFace appearance).", "INFO")
         else:
-            tracks = self.tracker.update(raw_detections, frame)
+            log("Tracker: BoT-SORT Block Initialized.", "INFO")
+
+    def update(self, raw_detections, frame, landmarks=None):
+        if raw_detections is None or len(raw_detections) == 0:
+            raw_detections, landmarks = np.empty((0, 6)), np.empty((0, 5, 2))
+
+        # ArcFace mode: embs must always be passed (even empty), there is no OSNet to fall back on
+        embs = None
+        if self.embedding_provider is not None:
+            embs = self.embedding_provider.features(frame, raw_detections, landmarks)
+
+        tracks = self.tracker.update(raw_detections, frame, embs)
+
+        if self.embedding_provider is not None:
+            self.embedding_provider.observe(tracks)
             
         return self._format_output(tracks)
 
-    def _format_output(self, tracks):
-        detections = []
-        for t in tracks:
-            # BoxMOT Output: [x1, y1, x2, y2, id, conf, cls, ind]
-            x1, y1, x2, y2, track_id = t[:5]
-            detections.append({
-                "id": int(track_id),
-                "face_bbox": [int(x1), int(y1), int(x2), int(y2)],
-                "center": (int((x1+x2)/2), int((y1+y2)/2))
-            })
-        return detections
+    def embedding_for(self, track_id):
+        if self.embedding_provider is None:
+            return None
+        return self.embedding_provider.embedding_for(track_id)
 
 ##################################################################################
 #                                ByteTrack Tracker
@@ -90,23 +134,10 @@ class ByteTrackTracker(BaseTracker):
         )
         log("Tracker: ByteTrack Block Initialized.", "INFO")
 
-    def update(self, raw_detections, frame):
+    def update(self, raw_detections, frame, landmarks=None):
         if raw_detections is None or len(raw_detections) == 0:
             tracks = self.tracker.update(np.empty((0, 6)), frame)
         else:
             tracks = self.tracker.update(raw_detections, frame)
-            
-        # We reuse the same formatting logic (could be moved to BaseTracker)
-        return self._format_output(tracks)
 
-    def _format_output(self, tracks):
-        detections = []
-        for t in tracks:
-            # BoxMOT Output: [x1, y1, x2, y2, id, conf, cls, ind]
-            x1, y1, x2, y2, track_id = t[:5]
-            detections.append({
-                "id": int(track_id),
-                "face_bbox": [int(x1), int(y1), int(x2), int(y2)],
-                "center": (int((x1+x2)/2), int((y1+y2)/2))
-            })
-        return detections
\ No newline at end of file
+        return self._format_output(tracks)
@@ -0,0 +1,165 @@
+# modules/tracktable.py
+
+##################################### Imports #####################################
+# Libraries
+import numpy as np
+
+# Modules
+from modules.utils import log
+
+###################################################################################
+
+class TrackTable:
+    """
+    Struct-of-arrays store for everything VisionWorker remembers about a track.
+    Each live track_id owns one slot (row); all columns are preallocated so the
+    per-frame bookkeeping is a handful of fancy-indexing ops regardless of face count.
+    Box smoothing state lives in the smoother, indexed by the same slots.
+    """
+
+    def __init__(self, smoother, capacity=64, embedding_dim=512):
+        self.capacity_ = capacity
+        self.smoother = smoother    # modules.smoothing filter, sized to capacity
+        self.embedding_dim_ = embedding_dim
+
+        self.slot_of_ = {}      # {track_id: slot}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """ (Re)builds the columns, keeps old rows when growing """
+        old = self.ids if hasattr(self, "ids") else None
+
+        ids = np.full(capacity, -1, dtype=np.int64)             # -1 = free slot
+        names = np.full(capacity, None, dtype=object)           # None = never identified
+        last_auth = np.zeros(capacity, dtype=float)             # time of the last recognition attempt
+        distance = np.full(capacity, 200.0, dtype=float)        # latest IPD distance (cm)
+        centers = np.zeros((capacity, 2), dtype=float)          # latest smoothed center
+        embeddings = np.zeros((capacity, self.embedding_dim_), dtype=np.float32) # last recognition embedding
+        has_embedding = np.zeros(capacity, dtype=bool)
+        provisional = np.zeros(capacity, dtype=bool)            # name inherited on position only, not acted upon yet
+
+        if old is not None:
+            n = len(old)
+            ids[:n], names[:n], last_auth[:n], distance[:n] = self.ids, self.names, self.last_auth, self.distance
+            centers[:n], embeddings[:n], has_embedding[:n] = self.centers, self.embeddings, self.has_embedding
+            provisional[:n] = self.provisional
+
+        if self.smoother.capacity_ < capacity:
+            self.smoother.resize(capacity)
+
+        self.ids, self.names, self.last_auth, self.distance = ids, names, last_auth, distance
+        self.centers, self.embeddings, self.has_embedding = centers, embeddings, has_embedding
+        self.provisional = provisional
+        self.free_ = [s for s in range(capacity - 1, -1, -1) if ids[s] < 0]
+        self.capacity_ = capacity
+
+    def __len__(self):
+        return len(self.slot_of_)
+
+    ###################################################################################
+    #                                 SLOTS
+    ###################################################################################
+
+    def acquire(self, track_ids):
+        """ Returns the slot of every id, allocating fresh slots for unseen ids """
+        slots = np.empty(len(track_ids), dtype=np.intp)
+
+        for i, tid in enumerate(track_ids):
+            slot = self.slot_of_.get(tid)
+            if slot is None:
+                if not self.free_:
+                    # Rare: more faces than capacity, double it once instead of failing
+                    log(f"TrackTable full ({self.capacity_}), growing", "WARNING")
+                    self._allocate(self.capacity_ * 2)
+                slot = self.free_.pop()
+                self.ids[slot] = tid
+                self.slot_of_[tid] = slot
+            slots[i] = slot
+
+        return slots
+
+    def slot(self, track_id):
+        """ Slot for an id or None """
+        return self.slot_of_.get(track_id)
+
+    def stale_slots(self, current_ids):
+        """ Slots whose id is absent from current_ids (still readable until released) """
+        live = self.ids >= 0
+        stale = live & ~np.isin(self.ids, np.asarray(current_ids, dtype=np.int64))
+        return np.flatnonzero(stale)
+
+    def release(self, slots):
+        """ Frees the given slots, returns their ids """
+        if len(slots) == 0:
+            return []
+
+        removed = self.ids[slots].tolist()
+        self._reset_rows(slots)
+
+        for tid in removed:
+            self.free_.append(self.slot_of_.pop(tid))
+
+        return removed
+
+    def _reset_rows(self, rows):
+        self.ids[rows] = -1
+        self.names[rows] = None
+        self.last_auth[rows] = 0.0
+        self.distance[rows] = 200.0
+        self.centers[rows] = 0.0
+        self.has_embedding[rows] = False
+        self.provisional[rows] = False
+        self.smoother.reset(rows)
+
+    ###################################################################################
+    #                                 SMOOTHING
+    ###################################################################################
+
+    def smooth(self, slots, boxes, timestamp):
+        """ Feeds one raw box per slot to the smoother, returns the smoothed (N, 4) boxes """
+        return self.smoother.update(slots, boxes, timestamp)
+
+    ###################################################################################
+    #                                 IDENTITY
+    ###################################################################################
+
+    def set_identity(self, slot, name, auth_time, distance, embedding=None, provisional=False):
+        """ provisional: a guess to show, but not to act on, until a recognition confirms it """
+        self.names[slot] = name
+        self.provisional[slot] = provisional
+        self.last_auth[slot] = auth_time
+        self.distance[slot] = distance
+        if embedding is not None:
+            self.embeddings[slot] = embedding
+            self.has_embedding[slot] = True
+
+    def embedding(self, slot):
+        """ Last recognition embedding of a slot or None """
+        return self.embeddings[slot] if self.has_embedding[slot] else None
+
+    def name_of(self, track_id, default=None):
+        slot = self.slot_of_.get(track_id)
+        return default if slot is None or self.names[slot] is None else self.names[slot]
+
+    def distance_of(self, track_id, default=200.0):
+        slot = self.slot_of_.get(track_id)
+        return default if slot is None else float(self.distance[slot])
+
+    def ids_named(self, names):
+        """ Ascending ids of identified (not provisional) tracks whose name is in names """
+        live = (self.ids >= 0) & ~self.provisional
+        hit = live & np.isin(self.names, list(names))
+        return sorted(self.ids[hit].tolist())
+
+    def retry_unknown(self):
+        """ Puts every active 'Unknown' track past its retry cooldown, returns how many """
+        rows = np.flatnonzero((self.ids >= 0) & (self.names == "Unknown"))
+        self.last_auth[rows] = 0.0
+        return len(rows)
+
+    def clear_identities(self):
+        """ Forgets names (forces re-recognition) but keeps the smoothing buffers """
+        self.names[:] = None
+        self.last_auth[:] = 0.0
+        self.has_embedding[:] = False
+        self.provisional[:] = False
@@ -3,25 +3,23 @@
 ##################################### Imports #####################################
 
 # Standart Libraries
-from datetime import datetime
 
 # Third Party Libraries
-import cv2
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QImage, QPixmap
 
 # Modules
+from modules.logger import LOGGER
 
 ###################################################################################
 
 # Custom Logger
-def log(message, level="INFO"):
+def log(message, level="INFO", *args):
     """
     Better print for the project. Adds timestamps and eye-catcher stuff.
-    Levels: INFO for standart stuff, WARNING for weird occasions, ERROR for unwanted behaviour.
+    Levels: DEBUG for per-frame chatter, INFO for standart stuff, WARNING for weird occasions, ERROR for unwanted behaviour.
+    Only enqueues, formatting and printing happen on the logger thread (modules/logger.py).
+    Hot paths pass %-style args instead of an f-string: log("ID %s lost", "DEBUG", tid)
     """
-    timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-    print(f"[{timestamp}] [{level}] {message}")
+    LOGGER.log(message, level, args)
 
 
 # Event logger for Visionworker emitions
@@ -56,22 +54,3 @@ def create_event(event_type: str, **kwargs):
         event["html"] = f"<b style='color:{color};'>[SENTRY] {status}: ID {track_id}</b>"
 
     return event
-
-# Cleanup for interface.py 
-def opencv_to_qpixmap(frame, width, height):
-    """
-    Utility to convert CV2 BGR images to QPixmap.
-    """
-    if frame is None or frame.size == 0:
-        return QPixmap()
-
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    h, w, ch = rgb.shape
-    
-    qt_img = QImage(rgb.data, w, h, ch * w, QImage.Format.Format_RGB888).copy()
-    
-    return QPixmap.fromImage(qt_img).scaled(
-        width, height, 
-        Qt.AspectRatioMode.KeepAspectRatio,
-        Qt.TransformationMode.SmoothTransformation
-    )
\ No newline at end of file
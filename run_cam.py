@@ -9,18 +9,20 @@ def test_camera(index=1):
         print(f"Error: Could not open camera at index {index}")
         return
 
-    print(f"Camera {index} connected. Press 'q' to exit.")
+    print(f"Camera {index} connected. Press 'q' to exit. (Full throughput / latency sweep: diagnose_capture.py)")
     
-    prev_time = 0
+    prev_time = None
+    fps = 0.0
     while True:
         ret, frame = cap.read()
         if not ret:
             print("Error: Failed to grab frame.")
             break
 
-        # Calculate live FPS
-        curr_time = time.time()
-        fps = 1 / (curr_time - prev_time)
+        # Calculate live FPS (smoothed, no delta on the first frame, perf_counter never gives a zero delta)
+        curr_time = time.perf_counter()
+        if prev_time is not None and curr_time > prev_time:
+            fps = 0.9 * fps + 0.1 / (curr_time - prev_time) if fps else 1 / (curr_time - prev_time)
         prev_time = curr_time
 
         # Display info
@@ -0,0 +1,233 @@
+# soak.py
+"""
+Long-run soak test: drives the full SentryPipeline from a looping source (a recorded session or a clip),
+flat out by default, for hours, and watches for slow leaks the FPS counter never shows.
+
+Every --sample-every seconds it records:
+  rss_mb        : process resident memory
+  objects       : live Python objects per type (gc)
+  latency       : per-stage p50 / p95 ms over the frames since the previous sample
+  state sizes   : TrackTable rows / capacity, BoxMOT's internal track lists, ArcFace provider caches,
+                  and the line count the SentryHUD history would hold by now
+
+The summary flags every series that grows steadily after warm-up (each quarter above the previous one
+and the last quarter clearly above the first): memory / object growth and latency creep. Exit code 1 if anything is flagged.
+
+Usage:
+  python soak.py --source sessions/run1 --hours 4
+  python soak.py --source clip.mp4 --hours 0.1 --sample-every 10 --report soak.json
+"""
+import argparse
+import gc
+import json
+import time
+from collections import Counter
+
+import numpy as np
+import psutil
+
+import config
+from modules.utils import log
+from modules.pipeline import SentryPipeline
+from modules.sources import open_source
+
+CONTAINERS = (list, dict, set, tuple)
+
+# Series name prefix -> (relative growth, absolute growth) a steady rise must exceed to be flagged
+TOLERANCES = {
+    "rss_mb": (0.05, 20.0),
+    "objects.": (0.10, 2000),
+    "p95.": (0.20, 1.0),
+    "p50.": (0.20, 0.5),
+    "size.": (0.25, 10),
+}
+
+
+def hud_lines(events):
+    """ Lines SentryHUD.update_displays appends for these events (header, plus ranked candidates for recognitions) """
+    lines = 0
+    for event in events:
+        lines += 1
+        distances = event.get("metadata", {}).get("distances") if event["type"] == "RECOGNITION" else None
+        if distances:
+            lines += 1 + min(20, len(distances))
+    return lines
+
+
+def container_sizes(obj, prefix):
+    """ len() of every list / dict / set / array attribute of obj, e.g. BoxMOT's active_tracks / lost_stracks """
+    sizes = {}
+    for name, value in vars(obj).items():
+        if isinstance(value, CONTAINERS) or (isinstance(value, np.ndarray) and value.ndim):
+            sizes[f"size.{prefix}.{name}"] = len(value)
+    return sizes
+
+
+def state_sizes(pipeline, history_lines):
+    sizes = {"size.tracks": len(pipeline.tracks), "size.tracks.capacity": pipeline.tracks.capacity_,
+             "size.hud_history": min(history_lines, config.HUD_HISTORY_MAX_LINES) if config.HUD_HISTORY_MAX_LINES else history_lines}
+
+    inner = getattr(pipeline.tracker, "tracker", None) # BoxMOT object behind our wrapper
+    if inner is not None:
+        sizes.update(container_sizes(inner, "boxmot"))
+    provider = getattr(pipeline.tracker, "embedding_provider", None)
+    if provider is not None:
+        sizes.update(container_sizes(provider, "reid"))
+    return sizes
+
+
+def object_counts():
+    gc.collect()
+    return Counter(type(o).__name__ for o in gc.get_objects())
+
+
+def latency_percentiles(timings):
+    """ Per-frame {stage: ms} dicts -> {"p50.<stage>": ms, "p95.<stage>": ms}, "total" is the whole frame """
+    stages = {}
+    for frame in timings:
+        for stage, ms in frame.items():
+            stages.setdefault(stage, []).append(ms)
+        stages.setdefault("total", []).append(sum(frame.values()))
+
+    out = {}
+    for stage, values in stages.items():
+        out[f"p50.{stage}"] = float(np.percentile(values, 50))
+        out[f"p95.{stage}"] = float(np.percentile(values, 95))
+    return out
+
+
+def tolerance_for(series):
+    for prefix, tolerance in TOLERANCES.items():
+        if series.startswith(prefix):
+            return tolerance
+    return 0.10, 0.0
+
+
+def detect_drift(values, warmup):
+    """
+    Steady growth test on one series: drop the warm-up samples, average the rest in four quarters.
+    Returns (first quarter mean, last quarter mean, every quarter above the one before), None with too few samples.
+    """
+    values = [v for v in values[warmup:] if v is not None]
+    if len(values) < 4:
+        return None
+
+    quarters = [float(np.mean(chunk)) for chunk in np.array_split(np.asarray(values, dtype=float), 4)]
+    return quarters[0], quarters[-1], all(b > a for a, b in zip(quarters, quarters[1:]))
+
+
+def analyze(samples, warmup):
+    """ Flagged series: {name: (first quarter mean, last quarter mean)} """
+    series = {}
+    for i, sample in enumerate(samples):
+        for name, value in sample["values"].items():
+            series.setdefault(name, [None] * len(samples))[i] = value
+
+    flagged = {}
+    for name, values in series.items():
+        result = detect_drift(values, warmup)
+        if result is None:
+            continue
+        first, last, monotonic = result
+        relative, absolute = tolerance_for(name)
+        if monotonic and last - first > max(absolute, relative * abs(first)):
+            flagged[name] = (first, last)
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-run soak test of the headless pipeline")
+    parser.add_argument("--source", required=True, help="Recorded session, video file or image directory (looped)")
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--rate", type=float, default=0.0, help="Target FPS, 0 = as fast as possible (accelerated)")
+    parser.add_argument("--sample-every", type=float, default=60.0, help="Seconds between samples")
+    parser.add_argument("--warmup", type=int, default=2, help="Samples ignored by the drift analysis (first frame, model warm-up, caches)")
+    parser.add_argument("--top-objects", type=int, default=30, help="Object types tracked: the most numerous ones of any sample")
+    parser.add_argument("--lock", action="store_true", help="Run with target locking enabled")
+    parser.add_argument("--report", default="", help="Write every sample and the verdict to this JSON file")
+    args = parser.parse_args()
+
+    source = open_source(args.source, loop=True)
+    pipeline = SentryPipeline()
+    pipeline.scheduler.set_budget(1000.0 / args.rate if args.rate > 0 else 0) # flat out has no deadline to shed for
+    if args.lock:
+        pipeline.toggle_lock()
+
+    process = psutil.Process()
+    period = 1.0 / args.rate if args.rate > 0 else 0.0
+    deadline = time.perf_counter() + args.hours * 3600
+    tracked_types = set()
+    samples, window, frames, history_lines = [], [], 0, 0
+
+    start = next_sample = window_start = time.perf_counter()
+    try:
+        while time.perf_counter() < deadline:
+            loop_start = time.perf_counter()
+
+            frame = source.read()
+            if frame is None:
+                log("Source ended, a soak needs a looping source", "ERROR")
+                break
+
+            _, frame_events, report = pipeline.process(frame, draw=True)
+            window.append(report["timings"])
+            history_lines += hud_lines(frame_events)
+            frames += 1
+
+            now = time.perf_counter()
+            if now >= next_sample:
+                counts = object_counts()
+                tracked_types.update(name for name, _ in counts.most_common(args.top_objects)) # a leaking type climbs in later
+
+                values = {"rss_mb": process.memory_info().rss / 2**20, "fps": len(window) / max(now - window_start, 1e-9)}
+                values.update({f"objects.{name}": counts.get(name, 0) for name in tracked_types})
+                values.update(latency_percentiles(window))
+                values.update(state_sizes(pipeline, history_lines))
+                samples.append({"elapsed_s": round(now - start, 1), "frames": frames, "values": values})
+
+                log("Soak %.0fs: %d frames, RSS %.0f MB, p95 %.1f ms, %d tracks", "INFO",
+                    now - start, frames, values["rss_mb"], values.get("p95.total", 0.0), values["size.tracks"])
+                window, window_start = [], time.perf_counter() # gc + sampling time stays out of the next window
+                next_sample = now + args.sample_every
+
+            remaining = period - (time.perf_counter() - loop_start)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    except KeyboardInterrupt:
+        log("Interrupted", "INFO")
+
+    finally:
+        pipeline.close()
+        source.release()
+
+    flagged = analyze(samples, args.warmup)
+    elapsed = time.perf_counter() - start
+    print(f"\n{frames} frames in {elapsed / 60:.1f} min ({frames / max(elapsed, 1e-9):.1f} FPS), {len(samples)} samples")
+    if samples:
+        first, last = samples[min(args.warmup, len(samples) - 1)]["values"], samples[-1]["values"]
+        print(f"{'series':<40}{'after warm-up':>15}{'end':>12}")
+        for name in ("rss_mb", "p50.total", "p95.total", "size.tracks", "size.hud_history"):
+            if name in first and name in last:
+                print(f"{name:<40}{first[name]:>15.2f}{last[name]:>12.2f}")
+    deferred = {"quality": pipeline.quality_deferred, "shed": pipeline.shed_deferred} # running totals, not sampled (they always grow)
+    print(f"Recognitions deferred: {deferred['quality']} by the quality gate, {deferred['shed']} by load shedding")
+
+    if flagged:
+        print(f"\nSTEADY GROWTH in {len(flagged)} series (first -> last quarter mean):")
+        for name, (first_q, last_q) in sorted(flagged.items()):
+            print(f"  {name:<38}{first_q:>12.2f} -> {last_q:.2f}")
+    else:
+        print("\nNo steady growth detected")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "frames": frames, "samples": samples, "deferred": deferred,
+                       "flagged": {name: list(v) for name, v in flagged.items()}}, f, indent=1)
+        log(f"Soak report written: {args.report}", "INFO")
+
+    raise SystemExit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# Modules import config and each other from the repository root, the same way the entry scripts run
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
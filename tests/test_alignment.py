@@ -0,0 +1,49 @@
+# tests/test_alignment.py
+import numpy as np
+import pytest
+
+from modules.alignment import ARCFACE_DST, FaceAligner, estimate_similarity_batch
+
+
+def similarity(scale, angle, tx, ty):
+    c, s = scale * np.cos(angle), scale * np.sin(angle)
+    return np.array([[c, -s, tx], [s, c, ty]])
+
+
+def landmarks_for(M):
+    """ Landmarks a face would have so that M maps them exactly onto the ArcFace template """
+    A, t = M[:, :2], M[:, 2]
+    return (ARCFACE_DST - t) @ np.linalg.inv(A).T
+
+
+def test_recovers_known_similarity_for_every_face():
+    truths = [similarity(0.5, 0.2, 10, -4), similarity(1.7, -0.6, -30, 12), similarity(0.25, 0.0, 3, 3)]
+    estimates = estimate_similarity_batch(np.stack([landmarks_for(M) for M in truths]))
+    assert np.allclose(estimates, truths, atol=1e-6)
+
+
+def test_matches_skimage_reference_on_noisy_landmarks():
+    transform = pytest.importorskip("skimage.transform")
+    rng = np.random.default_rng(0)
+    landmarks = landmarks_for(similarity(0.4, 0.3, 5, 8))[None] + rng.normal(0, 2.0, (4, 5, 2))
+
+    for lms, M in zip(landmarks, estimate_similarity_batch(landmarks)):
+        if hasattr(transform.SimilarityTransform, "from_estimate"):
+            reference = transform.SimilarityTransform.from_estimate(lms, ARCFACE_DST)
+        else:
+            reference = transform.SimilarityTransform()
+            reference.estimate(lms, ARCFACE_DST)
+        assert np.allclose(M, reference.params[:2], atol=1e-6)
+
+
+def test_align_warps_onto_the_template():
+    # A bright dot on the left eye lands on the template's left eye
+    M = similarity(0.5, 0.1, 0, 0)
+    landmarks = landmarks_for(M)
+    frame = np.zeros((480, 640, 3), np.uint8)
+    x, y = np.round(landmarks[0]).astype(int)
+    frame[y - 3:y + 4, x - 3:x + 4] = 255
+
+    face = FaceAligner().align(frame, landmarks[None])[0]
+    ys, xs = np.nonzero(face[..., 0] > 128)
+    assert abs(xs.mean() - ARCFACE_DST[0, 0]) < 1.5 and abs(ys.mean() - ARCFACE_DST[0, 1]) < 1.5
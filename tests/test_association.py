@@ -0,0 +1,39 @@
+# tests/test_association.py
+import numpy as np
+
+import config
+from modules.association import associate, gather_by_index, iou_matrix
+
+
+TRACKS = np.array([[0, 0, 100, 100], [200, 0, 300, 100], [400, 400, 450, 450]], dtype=float)
+DETS = np.array([[205, 5, 305, 105, 0.9], [2, 3, 98, 102, 0.8]], dtype=float) # detector order differs from the tracker's
+
+
+def test_iou_matrix():
+    iou = iou_matrix([[0, 0, 10, 10]], [[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+    assert np.allclose(iou, [[1.0, 1 / 3, 0.0]])
+
+
+def test_iou_matching_follows_overlap_not_order():
+    assert associate(TRACKS, DETS, "iou").tolist() == [1, 0, -1]
+
+
+def test_center_matching_gates_by_distance():
+    assert associate(TRACKS, DETS, "center").tolist() == [1, 0, -1]
+
+    far = TRACKS + config.ASSOCIATION_MAX_CENTER_DIST + 1
+    assert associate(far[:1], DETS[:1], "center").tolist() == [-1]
+
+
+def test_every_detection_matches_at_most_once():
+    twins = np.array([[0, 0, 100, 100], [1, 1, 101, 101]], dtype=float)
+    det_idx = associate(twins, DETS[1:], "iou")
+    assert sorted(det_idx.tolist()) == [-1, 0]
+
+
+def test_gather_by_index_leaves_unmatched_tracks_nan():
+    landmarks = np.arange(2 * 5 * 2, dtype=np.float32).reshape(2, 5, 2)
+    track_landmarks, track_distances = gather_by_index(np.array([1, -1]), landmarks, [None, 150.0])
+
+    assert np.array_equal(track_landmarks[0], landmarks[1]) and np.isnan(track_landmarks[1]).all()
+    assert track_distances[0] == 150.0 and np.isnan(track_distances[1])
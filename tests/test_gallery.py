@@ -0,0 +1,108 @@
+# tests/test_gallery.py
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+import config
+from modules.gallery import Gallery, compact_entries, merge_compact
+
+
+def unit_rows(n, seed=0):
+    x = np.random.default_rng(seed).standard_normal((n, 512)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def make_entries(n, seed=0):
+    return [{"name": f"person{i // 10}", "embedding": e, "origin": f"img{i}.jpg"} for i, e in enumerate(unit_rows(n, seed))]
+
+
+def recapture(embedding, noise=0.3, seed=1):
+    """ The same face seen again: the enrolled embedding plus a small perturbation """
+    jitter = np.random.default_rng(seed).standard_normal(512).astype(np.float32)
+    probe = embedding + noise * jitter / np.linalg.norm(jitter)
+    return probe / np.linalg.norm(probe)
+
+
+def best_name(gallery, probe):
+    distances = gallery.distances(probe[None])[0]
+    best = int(np.argmin(distances))
+    return gallery.names[best] if distances[best] <= config.REG_CONF_THRESHOLD else "Unknown"
+
+
+def test_merge_compact_refits_pq_for_new_enrollments():
+    entries = make_entries(300)
+    compact = Gallery.from_entries(entries, "pq")
+    new_face = unit_rows(1, seed=7)[0]
+    entries = entries + [{"name": "dave", "embedding": new_face, "origin": "dave_1.jpg"}]
+
+    merged = merge_compact(compact, entries)
+
+    assert merged.storage == "pq" and len(merged) == 301 and "dave_1.jpg" in merged.sources
+    assert 1.0 - merged.distances(new_face[None])[0, -1] > 0.9 # old codebooks gave ~0.7, refit rows are near exact
+    assert best_name(merged, recapture(new_face)) == "dave"
+
+
+def test_merge_compact_drops_deleted_and_keeps_small_galleries_exact():
+    entries = make_entries(300)
+    compact = Gallery.from_entries(entries, "pq")
+    survivors = entries[:100] + [{"name": "dave", "embedding": unit_rows(1, seed=7)[0], "origin": "dave_1.jpg"}]
+
+    merged = merge_compact(compact, survivors)
+
+    assert merged.origins == [e["origin"] for e in survivors]
+    assert merged.storage == "float16" # 101 rows are too few for PQ codebooks
+    assert merge_compact(merged, survivors) is merged # nothing new: the same gallery
+
+
+def test_recognizer_identifies_face_enrolled_after_pq_compaction(tmp_path, monkeypatch):
+    pytest.importorskip("insightface")
+    pytest.importorskip("onnxruntime")
+    from modules.recognizer import TurretRecognizer
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(os.path.join("assets", "faces", "embeddings"))
+    entries = make_entries(300)
+    Gallery.from_entries(entries, "pq").save(os.path.join("assets", "faces", "embeddings", "w600k_r50_gallery.npz"))
+
+    new_face = unit_rows(1, seed=7)[0]
+    entries.append({"name": "dave", "embedding": new_face, "origin": "dave_1.jpg"})
+    with open(os.path.join("assets", "faces", "embeddings", "w600k_r50_encodings.pkl"), "wb") as f:
+        pickle.dump(entries, f)
+
+    # No ArcFace model: alignment and embedding are replaced, the gallery side is the real one
+    recognizer = TurretRecognizer.__new__(TurretRecognizer)
+    recognizer.model_name_, recognizer.threshold_, recognizer.pool_ = "w600k_r50", config.REG_CONF_THRESHOLD, None
+    recognizer.aligner = type("Aligner", (), {"align": lambda self, frame, lms: np.zeros((len(lms), 112, 112, 3), np.uint8)})()
+    recognizer.embed_aligned = lambda faces: recapture(new_face)[None]
+    recognizer.gallery = recognizer._build_gallery(Gallery.from_entries([]))
+
+    name, _, _, _ = recognizer.identify(np.zeros((480, 640, 3), np.uint8), np.zeros((5, 2), np.float32))
+    assert name == "dave"
+
+
+def test_pq_top1_agrees_with_exact_search():
+    entries = make_entries(512)
+    exact, pq = Gallery.from_entries(entries), Gallery.from_entries(entries, "pq")
+    probes = np.stack([recapture(e["embedding"], noise=0.5, seed=i) for i, e in enumerate(entries[:100])])
+
+    agree = (exact.distances(probes).argmin(axis=1) == pq.distances(probes).argmin(axis=1)).mean()
+    assert agree >= 0.95
+    assert pq.data_.nbytes == 64 * len(pq) # 64 bytes per face, codebooks aside
+
+
+def test_compaction_keeps_one_of_each_near_duplicate_and_every_identity_recalled():
+    base = make_entries(300)
+    duplicates = [{"name": e["name"], "embedding": recapture(e["embedding"], noise=0.05, seed=i), "origin": f"dup{i}.jpg"}
+                  for i, e in enumerate(base[:50])]
+    entries = base + duplicates
+    embeddings = np.stack([e["embedding"] for e in entries])
+
+    keep = compact_entries([e["name"] for e in entries], embeddings, max_similarity=0.9)
+    assert len(keep) == 300
+
+    compact = Gallery([entries[i]["name"] for i in keep], [entries[i]["origin"] for i in keep], embeddings[keep], "pq",
+                      sources=[e["origin"] for e in entries])
+    assert merge_compact(compact, entries) is compact # pruned shots are not new enrollments
+    assert all(best_name(compact, recapture(e["embedding"], seed=i)) == e["name"] for i, e in enumerate(entries))
@@ -0,0 +1,53 @@
+# tests/test_recorder.py
+import numpy as np
+import pytest
+
+from modules.recorder import SessionRecorder, load_session
+from modules.sources import ReplaySource
+
+
+def make_frame(seq):
+    """ Flat frame whose gray level encodes seq, survives MJPG compression """
+    return np.full((120, 160, 3), 20 * seq + 10, dtype=np.uint8)
+
+
+def make_report(seq):
+    names = ["alice", "bob", "carol"]
+    tracks = [{"id": 100 + seq, "box": (1, 2, 30, 40), "distance": 0.25, "name": names[seq % 3], "affiliation": "FRIEND"}]
+    return {"seq": seq, "time": 1000.0 + seq / 30, "tracks": tracks, "locked_id": None, "firing": False, "frozen": False,
+            "timings": {"detect": 5.0, "track": 1.0}}
+
+
+def record(directory, frames):
+    recorder = SessionRecorder(str(directory), fps=30, queue_size=64)
+    for seq in range(frames):
+        recorder.submit_frame(seq, make_frame(seq))
+        recorder.submit_report(make_report(seq))
+    recorder.close()
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    record(tmp_path / "session", 5)
+
+    source = ReplaySource(str(tmp_path / "session"))
+    replayed = []
+    while (frame := source.read()) is not None:
+        replayed.append((source.seq, frame))
+    source.release()
+
+    assert [seq for seq, _ in replayed] == list(range(5))
+    for seq, frame in replayed:
+        assert frame.shape == make_frame(seq).shape
+        assert np.abs(frame.astype(int) - make_frame(seq)).mean() < 3
+
+    session = load_session(str(tmp_path / "session"))
+    tracks = session["tables"]["tracks"]
+    assert session["tables"]["frames"]["seq"].tolist() == list(range(5))
+    assert [session["strings"][code] for code in tracks["name"]] == [make_report(seq)["tracks"][0]["name"] for seq in range(5)]
+    assert session["meta"]["counters"]["frames_written"] == 5
+
+
+def test_recording_refuses_existing_session(tmp_path):
+    record(tmp_path / "session", 3)
+    with pytest.raises(FileExistsError):
+        SessionRecorder(str(tmp_path / "session"))
@@ -0,0 +1,55 @@
+# tests/test_scheduler.py
+import pytest
+
+from modules.scheduler import FrameScheduler
+
+POLICY = ("defer_recognition", "lower_resolution", "skip_candidates", "skip_detection")
+
+
+def run(scheduler, timings, frames):
+    """ Feeds the same frame timings, returns the events that came out """
+    events = [scheduler.end_frame(timings) for _ in range(frames)]
+    return [e for e in events if e is not None]
+
+
+def test_sheds_one_step_at_a_time_in_policy_order():
+    scheduler = FrameScheduler(budget_ms=30, policy=POLICY, overload_frames=3, recover_frames=5, alpha=1.0)
+    events = run(scheduler, {"detect": 40.0, "recognize": 20.0}, 3 * len(POLICY) + 5)
+
+    assert [e["step"] for e in events] == list(POLICY)
+    assert all(e["action"] == "shed" for e in events)
+    assert scheduler.active_steps() == list(POLICY)
+
+
+def test_restores_in_reverse_order_once_the_frame_fits_without_the_step():
+    scheduler = FrameScheduler(budget_ms=30, policy=POLICY[:2], overload_frames=3, recover_frames=5, alpha=1.0)
+    run(scheduler, {"detect": 40.0, "recognize": 20.0}, 12) # long enough for each step's effect to be measured
+    assert scheduler.level == 2
+
+    events = run(scheduler, {"detect": 5.0, "recognize": 5.0}, 40)
+    assert [(e["action"], e["step"]) for e in events] == [("restore", POLICY[1]), ("restore", POLICY[0])]
+    assert scheduler.level == 0
+
+
+def test_stays_shed_while_undoing_the_step_would_overrun_again():
+    scheduler = FrameScheduler(budget_ms=30, policy=POLICY[:1], overload_frames=3, recover_frames=5, alpha=1.0)
+    run(scheduler, {"detect": 10.0, "recognize": 40.0}, 3)
+    assert scheduler.active("defer_recognition")
+
+    # Shedding halved recognition: 30 ms fits the budget, but 10 + 40 would not
+    assert run(scheduler, {"detect": 10.0, "recognize": 15.0}, 50) == []
+    assert scheduler.active("defer_recognition")
+
+
+def test_zero_budget_turns_shedding_off_and_undoes_active_steps():
+    scheduler = FrameScheduler(budget_ms=30, policy=POLICY, overload_frames=1, alpha=1.0)
+    run(scheduler, {"detect": 100.0}, 2)
+    assert scheduler.level == 2
+
+    assert scheduler.set_budget(0) == [POLICY[1], POLICY[0]]
+    assert run(scheduler, {"detect": 100.0}, 10) == [] and scheduler.level == 0
+
+
+def test_unknown_step_is_rejected():
+    with pytest.raises(ValueError):
+        FrameScheduler(budget_ms=30, policy=("defer_recognition", "panic"))
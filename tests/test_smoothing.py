@@ -0,0 +1,40 @@
+# tests/test_smoothing.py
+import numpy as np
+import pytest
+
+from modules.smoothing import SMOOTHERS, create_smoother
+
+BOX = np.array([[10, 20, 50, 80]], dtype=float)
+
+
+@pytest.mark.parametrize("name", sorted(SMOOTHERS))
+def test_jitter_is_damped(name):
+    smoother = create_smoother(name, 4)
+    for t in range(60):
+        out = smoother.update(np.array([1]), BOX + (t % 2) * 4.0, t / 30) # +-2 px around BOX + 2
+    assert np.abs(out - (BOX + 2.0)).max() < 1.0
+
+
+@pytest.mark.parametrize("name", sorted(SMOOTHERS))
+def test_reset_slot_starts_from_the_new_box(name):
+    smoother = create_smoother(name, 4)
+    for t in range(10):
+        smoother.update(np.array([0, 1]), np.vstack([BOX, BOX]), t / 30)
+
+    smoother.reset(np.array([1]))
+    out = smoother.update(np.array([0, 1]), np.vstack([BOX, BOX + 100]), 1.0)
+    assert np.allclose(out, np.vstack([BOX, BOX + 100])) # slot 0 untouched, slot 1 has no memory of BOX
+
+
+@pytest.mark.parametrize("name", sorted(SMOOTHERS))
+def test_grows_past_capacity_and_keeps_rows(name):
+    smoother = create_smoother(name, 2)
+    smoother.update(np.array([0]), BOX, 0.0)
+    smoother.resize(8)
+    out = smoother.update(np.array([0, 7]), np.vstack([BOX, BOX + 100]), 1 / 30)
+    assert np.allclose(out, np.vstack([BOX, BOX + 100]))
+
+
+def test_unknown_smoother_is_rejected():
+    with pytest.raises(ValueError):
+        create_smoother("kalman?", 4)